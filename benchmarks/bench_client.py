@@ -0,0 +1,282 @@
+"""Measures pvaw's throughput and latency against a local vPIC stand-in server.
+
+    python benchmarks/bench_client.py --latency 0.02 --error-rate 0.01 --output bench.json
+
+Starts benchmarks/vpic_server.py in-process and runs single decodes, batch
+decodes, WMI lookups, manufacturer pagination and get_df export at each of the
+given sizes and concurrency levels. Results are printed as a table and, with
+--output, written as JSON along with the settings and versions they were
+measured with, so runs can be compared between releases.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pvaw as pv  # noqa: E402
+from pvaw.results import ResultsList  # noqa: E402
+from vpic_server import VPICStandIn  # noqa: E402
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(scenario, params, units, seconds, latencies, errors, server):
+    latencies = sorted(latencies)
+    row = {
+        "scenario": scenario,
+        **params,
+        "units": units,
+        "errors": errors,
+        "seconds": seconds,
+        "units_per_second": units / seconds if seconds else None,
+        "latency_p50_ms": None,
+        "latency_p95_ms": None,
+        "latency_p99_ms": None,
+        "latency_mean_ms": None,
+        "server_requests": server.requests,
+        "server_errors": server.errors,
+    }
+    if latencies:
+        row["latency_p50_ms"] = percentile(latencies, 0.5) * 1000
+        row["latency_p95_ms"] = percentile(latencies, 0.95) * 1000
+        row["latency_p99_ms"] = percentile(latencies, 0.99) * 1000
+        row["latency_mean_ms"] = statistics.mean(latencies) * 1000
+    return row
+
+
+def timed_calls(func, args_list, concurrency):
+    latencies = []
+    errors = 0
+
+    def call(args):
+        start = time.perf_counter()
+        try:
+            func(*args)
+        except Exception:
+            return time.perf_counter() - start, False
+        return time.perf_counter() - start, True
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, ok in pool.map(call, args_list):
+            latencies.append(latency)
+            errors += not ok
+    return time.perf_counter() - start, latencies, errors
+
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.server = VPICStandIn(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            pages=args.pages,
+            seed=args.seed,
+        )
+
+    def client(self, concurrency=1):
+        return pv.Client(
+            base_url=self.server.url,
+            pool_maxsize=max(concurrency, 1),
+            retry=pv.RetryPolicy(retries=self.args.retries, backoff=0.01),
+            json_backend=self.args.json_backend,
+        )
+
+    def reset_server_counts(self):
+        self.server.requests = 0
+        self.server.errors = 0
+
+    def vins(self, count):
+        return [pv.Vin(f"5UXWX7C5{i:09d}") for i in range(count)]
+
+    def bench_decode(self, count, concurrency):
+        client = self.client(concurrency)
+        self.reset_server_counts()
+        seconds, latencies, errors = timed_calls(
+            lambda vin: vin.decode(client=client),
+            [(vin,) for vin in self.vins(count)],
+            concurrency,
+        )
+        return summarize(
+            "decode",
+            {"size": count, "concurrency": concurrency},
+            count,
+            seconds,
+            latencies,
+            errors,
+            self.server,
+        )
+
+    def bench_decode_vins(self, count, concurrency):
+        client = self.client(concurrency)
+        vins = self.vins(count)
+        self.reset_server_counts()
+        seconds, latencies, errors = timed_calls(
+            lambda: pv.decode_vins(vins, client=client, max_workers=concurrency),
+            [()],
+            1,
+        )
+        return summarize(
+            "decode_vins",
+            {"size": count, "concurrency": concurrency},
+            count,
+            seconds,
+            latencies,
+            errors,
+            self.server,
+        )
+
+    def bench_decode_wmi(self, count, concurrency):
+        client = self.client(concurrency)
+        alphabet = "0123456789ABCDEFGHJKLMNPRSTUVWXYZ"
+        wmis = [
+            alphabet[i // 33 % 33] + alphabet[i % 33] + alphabet[i // 1089 % 33]
+            for i in range(count)
+        ]
+        self.reset_server_counts()
+        seconds, latencies, errors = timed_calls(
+            lambda wmi: pv.decode_wmi(wmi, client=client),
+            [(wmi,) for wmi in wmis],
+            concurrency,
+        )
+        return summarize(
+            "decode_wmi",
+            {"size": count, "concurrency": concurrency},
+            count,
+            seconds,
+            latencies,
+            errors,
+            self.server,
+        )
+
+    def bench_pagination(self, prefetch):
+        client = self.client(prefetch + 1)
+        self.reset_server_counts()
+        count = 0
+        errors = 0
+        start = time.perf_counter()
+        try:
+            for _ in pv.iter_manufacturers(client=client, prefetch=prefetch):
+                count += 1
+        except Exception:
+            errors = 1
+        seconds = time.perf_counter() - start
+        return summarize(
+            "iter_manufacturers",
+            {"pages": self.args.pages, "concurrency": prefetch},
+            count,
+            seconds,
+            [],
+            errors,
+            self.server,
+        )
+
+    def bench_get_df(self, count, raw):
+        client = self.client(4)
+        vehicles = pv.decode_vins(self.vins(count), client=client)
+        # the first call pays for importing pandas
+        ResultsList(vehicles.results_list[:1]).get_df(raw=raw)
+        self.reset_server_counts()
+        seconds, latencies, errors = timed_calls(
+            lambda: vehicles.get_df(raw=raw), [()], 1
+        )
+        return summarize(
+            "get_df",
+            {"size": count, "raw": raw},
+            count,
+            seconds,
+            latencies,
+            errors,
+            self.server,
+        )
+
+    def run(self):
+        args = self.args
+        rows = []
+        with self.server:
+            for concurrency in args.concurrency:
+                for size in args.sizes:
+                    rows.append(self.bench_decode(size, concurrency))
+                    rows.append(self.bench_decode_wmi(size, concurrency))
+                for size in args.batch_sizes:
+                    rows.append(self.bench_decode_vins(size, concurrency))
+                rows.append(self.bench_pagination(concurrency))
+            for size in args.batch_sizes:
+                for raw in (False, True):
+                    rows.append(self.bench_get_df(size, raw))
+        return rows
+
+
+def print_rows(rows):
+    print(
+        f"{'scenario':<20}{'size':>8}{'conc':>6}{'units/s':>12}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    )
+    for row in rows:
+        size = row.get("size", row.get("pages"))
+        concurrency = row.get("concurrency", "raw" if row.get("raw") else "")
+
+        def ms(value):
+            return f"{value:10.1f}" if value is not None else f"{'-':>10}"
+
+        print(
+            f"{row['scenario']:<20}{size:>8}{concurrency:>6}"
+            f"{row['units_per_second'] or 0:12.1f}"
+            f"{ms(row['latency_p50_ms'])}{ms(row['latency_p95_ms'])}"
+            f"{ms(row['latency_p99_ms'])}{row['errors']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--json-backend", choices=["auto", "orjson", "simdjson", "json"]
+    )
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = Bench(args).run()
+    print_rows(rows)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "created": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "settings": vars(args),
+                    "results": rows,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
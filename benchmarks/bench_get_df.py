@@ -0,0 +1,102 @@
+"""Times ResultsList.get_df on synthetic decoded vehicles.
+
+    python benchmarks/bench_get_df.py --sizes 1 50 1000 10000 100000 1000000
+
+Every vehicle shares one raw results dict, so the benchmark measures frame
+construction rather than building the inputs. The column-by-column
+implementation get_df used to have is timed alongside for the smaller sizes.
+The 1 and 50 result sizes cover notebook display and other small lists, where
+fixed per-frame costs dominate.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pvaw.results import ResultsList  # noqa: E402
+from pvaw.vin import Vin, Vehicle  # noqa: E402
+
+RESPONSE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "responses", "decode_vin_response.json"
+)
+
+
+def make_results(size):
+    with open(RESPONSE_PATH) as f:
+        results_dict = json.load(f)["Results"][0]
+    return ResultsList(
+        [Vehicle(Vin(f"1HGCM8263{i:08d}"), results_dict) for i in range(size)]
+    )
+
+
+def legacy_get_df(results_list, raw):
+    df = pd.DataFrame()
+    for rl in results_list.results_list:
+        d = rl.results_dict if raw else rl.get_key_attributes()
+        df[rl.identifier] = pd.Series(d).replace(
+            to_replace=r"^\s*$", value=np.nan, regex=True
+        )
+    df.dropna(inplace=True)
+    return df.T
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1, 50, 1_000, 10_000, 100_000, 1_000_000],
+    )
+    parser.add_argument("--legacy-max", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--key-attributes", action="store_true")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    raw = not args.key_attributes
+    rows = []
+    for size in args.sizes:
+        results = make_results(size)
+        repeat = args.repeat if size <= 100_000 else 1
+        row = {
+            "size": size,
+            "raw": raw,
+            "get_df_seconds": best_of(
+                repeat, lambda: results.get_df(raw=raw, drop_na=True)
+            ),
+            "legacy_seconds": None,
+        }
+        if size <= args.legacy_max:
+            row["legacy_seconds"] = best_of(repeat, lambda: legacy_get_df(results, raw))
+        rows.append(row)
+
+        legacy = row["legacy_seconds"]
+        print(
+            f"{size:>9,} results  get_df {row['get_df_seconds']:8.3f}s"
+            + (f"  legacy {legacy:8.3f}s" if legacy is not None else "")
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Times 'import pvaw' in fresh interpreters and checks pandas stays unloaded.
+
+    python benchmarks/bench_import.py --repeat 20 --max-seconds 0.5
+
+Exits with a non-zero status if importing pvaw pulls in pandas or numpy, or
+if the median import time is above --max-seconds, so it can guard against
+import-time regressions in CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+IMPORT_CODE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import pvaw\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(elapsed, 'pandas' in sys.modules, 'numpy' in sys.modules)\n"
+)
+
+
+def time_import():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_CODE],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    ).stdout.split()
+    return float(output[0]), output[1] == "True", output[2] == "True"
+
+
+def slowest_modules(count):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pvaw"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    ).stderr
+    modules = []
+    # lines look like "import time:  self [us] | cumulative | imported package"
+    for line in stderr.splitlines()[1:]:
+        _, cumulative_us, name = line.split("|")
+        modules.append((int(cumulative_us), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    timings = []
+    pandas_loaded = numpy_loaded = False
+    for _ in range(args.repeat):
+        elapsed, pandas_import, numpy_import = time_import()
+        timings.append(elapsed)
+        pandas_loaded |= pandas_import
+        numpy_loaded |= numpy_import
+
+    median = statistics.median(timings)
+    print(f"import pvaw: median {median * 1000:.1f}ms, min {min(timings) * 1000:.1f}ms")
+    print(f"pandas loaded: {pandas_loaded}, numpy loaded: {numpy_loaded}")
+    print("slowest imports (cumulative):")
+    for cumulative_us, name in slowest_modules(5):
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "median_seconds": median,
+                    "timings": timings,
+                    "pandas_loaded": pandas_loaded,
+                    "numpy_loaded": numpy_loaded,
+                },
+                f,
+                indent=2,
+            )
+
+    failed = pandas_loaded or numpy_loaded
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"median import time is above {args.max_seconds}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
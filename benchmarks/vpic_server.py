@@ -0,0 +1,221 @@
+"""A local stand-in for the vPIC API that replays the payloads in tests/responses.
+
+    python benchmarks/vpic_server.py --port 8080 --latency 0.05 --error-rate 0.01
+
+Point a client at it with pv.Client(base_url="http://127.0.0.1:8080/api/vehicles/").
+Every response waits --latency seconds (plus up to --jitter more), and a
+--error-rate fraction of requests fail with --error-status instead. VIN
+decodes echo the requested VINs back so results line up with their inputs,
+and getallmanufacturers serves --pages pages before an empty one.
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+RESPONSES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tests", "responses"
+)
+
+API_PREFIX = "/api/vehicles/"
+
+
+def load_responses():
+    responses = {}
+    for name in os.listdir(RESPONSES_DIR):
+        if name.endswith(".json"):
+            with open(os.path.join(RESPONSES_DIR, name)) as f:
+                responses[name[: -len(".json")]] = json.load(f)
+    return responses
+
+
+def decoded_vin(template, vin, model_year=""):
+    results_dict = dict(template["Results"][0])
+    results_dict["VIN"] = vin
+    if model_year:
+        results_dict["ModelYear"] = model_year
+    return results_dict
+
+
+class VPICStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_status=503,
+        pages=3,
+        seed=None,
+    ):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.pages = pages
+        self.responses = load_responses()
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def delay_and_fail(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(delay)
+        return failed
+
+    def route(self, method, path, query, form):
+        endpoint, _, argument = path.partition("/")
+        endpoint = endpoint.lower()
+        responses = self.responses
+
+        if endpoint == "decodevinvalues" and method == "GET":
+            model_year = query.get("modelyear", [""])[0]
+            template = responses["decode_vin_response"]
+            body = copy.deepcopy(template)
+            body["Results"] = [decoded_vin(template, argument, model_year)]
+            return body
+        if endpoint == "decodevinvaluesbatch" and method == "POST":
+            template = responses["decode_vin_response"]
+            results = []
+            for vin_str in form.get("data", [""])[0].split(";"):
+                vin, _, model_year = vin_str.partition(",")
+                results.append(decoded_vin(template, vin, model_year))
+            return {"Count": len(results), "Message": "", "Results": results}
+        if endpoint == "decodewmi":
+            if len(argument) == 6:
+                return responses["decode_6_digit_wmi_response"]
+            return responses["decode_3_digit_wmi_response"]
+        if endpoint == "getwmisformanufacturer":
+            return responses["get_wmis_response"]
+        if endpoint == "getallmanufacturers":
+            page = int(query.get("page", ["1"])[0])
+            if page > self.pages:
+                return {"Count": 0, "Message": "", "Results": []}
+            return responses["get_manufacturers_response"]
+        if endpoint == "getmanufacturerdetails":
+            if argument.isdigit():
+                return responses["get_manufacturer_details_from_id_response"]
+            return responses["get_manufacturer_details_from_name_response"]
+        if endpoint == "getmakeformanufacturer":
+            return responses["get_makes_for_manufacturer_name_response"]
+        if endpoint == "getmakesformanufacturerandyear":
+            return responses["get_makes_for_manufacturer_name_and_year_response"]
+        if endpoint == "getmakesforvehicletype":
+            return responses["get_makes_for_vehicle_type_response"]
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out as separate writes, which Nagle's algorithm
+    # would hold back for a delayed ACK on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_request(self, method):
+        url = urlsplit(self.path)
+        form = {}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            form = parse_qs(self.rfile.read(length).decode())
+
+        if self.server.delay_and_fail():
+            self.send_json(self.server.error_status, {"Message": "stand-in error"})
+            return
+        if not url.path.startswith(API_PREFIX):
+            self.send_json(404, {"Message": "not found"})
+            return
+
+        body = self.server.route(
+            method, url.path[len(API_PREFIX) :], parse_qs(url.query), form
+        )
+        if body is None:
+            self.send_json(404, {"Message": "not found"})
+        else:
+            self.send_json(200, body)
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--pages", type=int, default=3)
+    args = parser.parse_args()
+
+    server = VPICStandIn(
+        args.host,
+        args.port,
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.error_status,
+        args.pages,
+    )
+    print(f"serving the vPIC stand-in at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,17 @@
+from .results import ResultsList
+from .cache import SQLiteCache, PatternCache
+from .client import Client, get_default_client, set_default_client
+from .ratelimit import RateLimiter, SQLiteRateLimiter, RetryPolicy
+from .instrument import LoggingInstrument, HistogramInstrument
 from .vin import Vin, decode_vins
-from .wmi import decode_wmi, get_wmis
-from .make import get_makes
-from .manufacturer import get_manufacturers, get_manufacturer_details
+from .wmi import decode_wmi, get_wmis, WMIIndex
+from .make import get_makes, get_makes_bulk, MakeCatalog
+from .manufacturer import (
+    get_manufacturers,
+    get_manufacturer_details,
+    get_manufacturer_details_bulk,
+    iter_manufacturers,
+    iter_manufacturer_details,
+)
+from .pipeline import decode_file
+from .arrow import ArrowWriter, open_results
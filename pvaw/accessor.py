@@ -0,0 +1,190 @@
+from __future__ import annotations
+from typing import Any, Iterable, List, Optional, Tuple, Union
+import pandas as pd
+from pvaw.client import Client
+from pvaw.constants import BATCH_VIN_LIMIT, DEFAULT_MAX_WORKERS
+from pvaw.results import _blank_to_nan
+from pvaw.validation import validate_vins
+from pvaw.vin import Vin, Vehicle, BatchVinDecodeError, decode_vins
+
+# importing this module registers the .pvaw accessor on DataFrames and Series
+
+DEFAULT_COLUMNS = tuple(a for a in Vehicle.KEY_ATTRIBUTES if a != "full_or_partial_vin")
+
+
+def _normalize_vins(vins: pd.Series) -> pd.Series:
+    return vins.astype("string").str.strip().str.upper().replace("", pd.NA)
+
+
+def _identifiers(vins: pd.Series, model_years: Optional[pd.Series]) -> pd.Series:
+    # the same "VIN,year" strings decode_vins uses to identify its results
+    identifiers = _normalize_vins(vins)
+    if model_years is not None:
+        years = pd.to_numeric(model_years, errors="coerce").astype("Int64")
+        years = years.astype("string")
+        identifiers = identifiers.where(
+            years.isna(), identifiers + "," + years.fillna("")
+        )
+    return identifiers
+
+
+def _to_vins(identifiers: Iterable[str], invalid: Optional[str]) -> List[Vin]:
+    # cells that can't be built into a Vin at all (e.g. 18 characters) get NaN
+    # like missing VINs, unless invalid="raise"
+    vins = []
+    for identifier in identifiers:
+        vin, _, model_year = identifier.partition(",")
+        try:
+            vins.append(Vin(vin, int(model_year) if model_year else None))
+        except ValueError:
+            if invalid == "raise":
+                raise
+    return vins
+
+
+def _decode_series(
+    vins: pd.Series,
+    model_years: Optional[pd.Series],
+    fields: Optional[Iterable[str]],
+    prefix: str,
+    typed: bool,
+    client: Client,
+    batch_size: int,
+    max_workers: int,
+    invalid: Optional[str],
+    on_error: str,
+) -> pd.DataFrame:
+    if on_error not in ("raise", "skip"):
+        raise ValueError("'on_error' must be 'raise' or 'skip'")
+    if isinstance(fields, str):
+        raise TypeError("'fields' must be an iterable of str field names")
+    columns = list(DEFAULT_COLUMNS if fields is None else fields)
+
+    # each distinct VIN and model year is decoded once, and codes maps every
+    # row back to its decoded VIN (-1 for missing VINs)
+    codes, uniques = pd.factorize(_identifiers(vins, model_years))
+    vin_list = _to_vins(uniques, invalid)
+
+    results = None
+    if vin_list:
+        try:
+            results = decode_vins(
+                vin_list,
+                client=client,
+                batch_size=batch_size,
+                max_workers=max_workers,
+                invalid=invalid,
+                fields=[] if fields is None else columns,
+            )
+        except BatchVinDecodeError as e:
+            if on_error == "raise":
+                raise
+            results = e.results
+
+    records = []
+    for identifier in uniques:
+        vehicle = None if results is None else results.get(identifier)
+        if vehicle is None:
+            records.append({})
+        elif fields is None:
+            records.append(vehicle.get_key_attributes())
+        else:
+            records.append(vehicle.results_dict)
+
+    decoded = _blank_to_nan(pd.DataFrame.from_records(records, columns=columns))
+    if typed:
+        from pvaw.schema import apply_schema
+
+        decoded = apply_schema(decoded)
+    decoded = decoded.reindex(codes)
+    decoded.index = vins.index
+    decoded.columns = [f"{prefix}{column}" for column in columns]
+    return decoded
+
+
+@pd.api.extensions.register_series_accessor("pvaw")
+class VinSeriesAccessor:
+    def __init__(self, series: pd.Series):
+        self._series = series
+
+    def is_valid(self, check_digit: bool = True) -> pd.Series:
+        vins = _normalize_vins(self._series).fillna("")
+        return pd.Series(
+            validate_vins(vins.tolist(), check_digit), index=self._series.index
+        )
+
+    def decode(
+        self,
+        model_years: Union[pd.Series, Iterable[Any]] = None,
+        fields: Optional[Iterable[str]] = None,
+        prefix: str = "",
+        typed: bool = False,
+        client: Client = None,
+        batch_size: int = BATCH_VIN_LIMIT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        invalid: str = None,
+        on_error: str = "raise",
+    ) -> pd.DataFrame:
+        if model_years is not None and not isinstance(model_years, pd.Series):
+            model_years = pd.Series(model_years, index=self._series.index)
+        return _decode_series(
+            self._series,
+            model_years,
+            fields,
+            prefix,
+            typed,
+            client,
+            batch_size,
+            max_workers,
+            invalid,
+            on_error,
+        )
+
+
+@pd.api.extensions.register_dataframe_accessor("pvaw")
+class VinFrameAccessor:
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+
+    def _columns(
+        self, vin_column: str, model_year_column: Optional[str]
+    ) -> Tuple[pd.Series, Optional[pd.Series]]:
+        for column in (vin_column, model_year_column):
+            if column is not None and column not in self._df.columns:
+                raise KeyError(f"DataFrame has no column '{column}'")
+        model_years = None
+        if model_year_column is not None:
+            model_years = self._df[model_year_column]
+        return self._df[vin_column], model_years
+
+    def is_valid(self, vin_column: str = "vin", check_digit: bool = True) -> pd.Series:
+        vins, _ = self._columns(vin_column, None)
+        return vins.pvaw.is_valid(check_digit)
+
+    def decode(
+        self,
+        vin_column: str = "vin",
+        model_year_column: str = None,
+        fields: Optional[Iterable[str]] = None,
+        prefix: str = "",
+        typed: bool = False,
+        client: Client = None,
+        batch_size: int = BATCH_VIN_LIMIT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        invalid: str = None,
+        on_error: str = "raise",
+    ) -> pd.DataFrame:
+        vins, model_years = self._columns(vin_column, model_year_column)
+        decoded = _decode_series(
+            vins,
+            model_years,
+            fields,
+            prefix,
+            typed,
+            client,
+            batch_size,
+            max_workers,
+            invalid,
+            on_error,
+        )
+        return self._df.assign(**{c: decoded[c] for c in decoded.columns})
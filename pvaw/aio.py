@@ -0,0 +1,401 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Union, Iterable, Optional
+import asyncio
+import weakref
+from pvaw.constants import (
+    VEHICLE_API_PATH,
+    DEFAULT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    BATCH_VIN_LIMIT,
+    THROTTLE_STATUSES,
+    DEFAULT_BATCH_WINDOW,
+)
+from pvaw.batcher import _PendingBatch, _check_batcher_args
+from pvaw.cache import normalize_path
+from pvaw.jsondecode import JSONDecoder
+from pvaw.ratelimit import RateLimiter, RetryPolicy
+from pvaw.singleflight import AsyncSingleFlight
+from pvaw.results import ResultsList
+from pvaw.vin import (
+    BATCH_PATH,
+    BatchVinDecodeError,
+    Vin,
+    Vehicle,
+    _batch_post_fields,
+    _check_batch_results,
+    _check_decode_vins_args,
+    _filter_invalid,
+    _unique_vins,
+    _split_batches,
+    _assemble_results,
+)
+from pvaw.wmi import WMIInfo, _decode_wmi_path, _build_wmi_info, _get_wmis_path
+from pvaw.make import Make, _get_makes_path
+from pvaw.manufacturer import (
+    _build_manufacturers,
+    _get_manufacturers_path,
+    _get_manufacturer_details_path,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncClient:
+    def __init__(
+        self,
+        base_url: str = VEHICLE_API_PATH,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_maxsize: int = DEFAULT_POOL_SIZE,
+        max_concurrency: int = DEFAULT_POOL_SIZE,
+        gzip: bool = True,
+        headers: Dict[str, str] = None,
+        rate_limiter: RateLimiter = None,
+        retry: RetryPolicy = None,
+        coalesce: bool = True,
+        batch_window: float = None,
+        max_batch: int = BATCH_VIN_LIMIT,
+        json_backend: str = None,
+    ):
+        if aiohttp is None:
+            raise ImportError(
+                "pvaw.aio requires aiohttp, install it with 'pip install pvaw[async]'"
+            )
+        if not isinstance(base_url, str):
+            raise TypeError("'base_url' must be a str")
+        if not isinstance(pool_maxsize, int) or not isinstance(max_concurrency, int):
+            raise TypeError("'pool_maxsize' and 'max_concurrency' must be ints")
+        if pool_maxsize < 1 or max_concurrency < 1:
+            raise ValueError("'pool_maxsize' and 'max_concurrency' must be positive")
+        if rate_limiter is not None and not isinstance(rate_limiter, RateLimiter):
+            raise TypeError("'rate_limiter' must be a RateLimiter")
+        if retry is not None and not isinstance(retry, RetryPolicy):
+            raise TypeError("'retry' must be a RetryPolicy")
+
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+        self.json_decoder = None
+        if json_backend is not None:
+            self.json_decoder = JSONDecoder(json_backend)
+        self.batcher = None
+        if batch_window is not None:
+            self.batcher = AsyncMicroBatcher(self, batch_window, max_batch)
+        self.headers = {"Accept-Encoding": "gzip, deflate" if gzip else "identity"}
+        if headers is not None:
+            self.headers.update(headers)
+
+        self._session = None
+        self._semaphore = None
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def get(self, path: str) -> Any:
+        if self.single_flight is None:
+            return await self._request("GET", path)
+        return await self.single_flight.do(
+            normalize_path(path), lambda: self._request("GET", path)
+        )
+
+    async def post(self, path: str, data: Dict[str, str]) -> Any:
+        return await self._request("POST", path, data=data)
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        session = self._get_session()
+        attempt = 0
+        while True:
+            # the limiter's reservation is quick, only the wait is awaited
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+            try:
+                async with self._semaphore:
+                    async with session.request(
+                        method, self.url(path), **kwargs
+                    ) as response:
+                        status = response.status
+                        if self.rate_limiter is not None:
+                            if status in THROTTLE_STATUSES:
+                                self.rate_limiter.throttled()
+                            else:
+                                self.rate_limiter.succeeded()
+                        if not self.retry.should_retry(attempt, status):
+                            response.raise_for_status()
+                            if self.json_decoder is None:
+                                return await response.json(content_type=None)
+                            return self.json_decoder.loads(await response.read())
+                        delay = self.retry.delay(
+                            attempt, response.headers.get("Retry-After")
+                        )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not self.retry.should_retry(attempt):
+                    raise
+                delay = self.retry.delay(attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self) -> None:
+        if self.batcher is not None:
+            await self.batcher.flush()
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+
+class AsyncMicroBatcher:
+    def __init__(
+        self,
+        client: AsyncClient,
+        window: float = DEFAULT_BATCH_WINDOW,
+        max_batch: int = BATCH_VIN_LIMIT,
+    ):
+        _check_batcher_args(window, max_batch)
+
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self.submitted = 0
+        self.batches = 0
+
+        self._pending = None
+        self._tasks = set()
+
+    def submit(self, vin: Vin) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        key = str(vin)
+        self.submitted += 1
+
+        batch = self._pending
+        if batch is None:
+            batch = self._pending = _PendingBatch()
+            batch.timer = loop.call_later(self.window, self._flush, batch)
+
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = loop.create_future()
+            batch.vins.append(vin)
+
+        if len(batch.vins) >= self.max_batch:
+            self._flush(batch)
+        return future
+
+    async def decode(self, vin: Vin) -> Dict[str, str]:
+        # shielded, since callers decoding the same VIN share one future
+        return await asyncio.shield(self.submit(vin))
+
+    def _flush(self, batch: _PendingBatch) -> None:
+        if self._pending is not batch:
+            return
+        self._pending = None
+        batch.timer.cancel()
+        task = asyncio.ensure_future(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: _PendingBatch) -> None:
+        # every future is resolved whatever happens here, or the coroutines
+        # awaiting them in decode would wait forever
+        try:
+            results_list = await _decode_vin_batch(batch.vins, self.client)
+            self.batches += 1
+            for vin, results_dict in zip(batch.vins, results_list):
+                future = batch.futures[str(vin)]
+                if not future.done():
+                    future.set_result(results_dict)
+        except Exception as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        except BaseException:
+            # cancelled, e.g. by the loop shutting down
+            for future in batch.futures.values():
+                future.cancel()
+            raise
+        finally:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(
+                        RuntimeError("the batch returned no result for this VIN")
+                    )
+
+    async def flush(self) -> None:
+        if self._pending is not None:
+            self._flush(self._pending)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+# aiohttp sessions are bound to the event loop they were created on, so the
+# default client is kept per loop rather than per process, and closed when
+# that loop shuts down.
+_default_clients = weakref.WeakKeyDictionary()
+
+
+async def _close_at_shutdown(
+    loop: asyncio.AbstractEventLoop, client: AsyncClient
+) -> None:
+    # asyncio.run cancels the tasks still pending once its coroutine returns,
+    # which closes the client while the loop can still await
+    try:
+        await loop.create_future()
+    finally:
+        _default_clients.pop(loop, None)
+        await client.close()
+
+
+def get_default_async_client() -> AsyncClient:
+    loop = asyncio.get_running_loop()
+    default = _default_clients.get(loop)
+    if default is None:
+        client = AsyncClient()
+        # the loop only keeps weak references to its tasks
+        closer = loop.create_task(_close_at_shutdown(loop, client))
+        default = _default_clients[loop] = (client, closer)
+    return default[0]
+
+
+def _resolve_client(client: AsyncClient = None) -> AsyncClient:
+    if client is None:
+        return get_default_async_client()
+    if not isinstance(client, AsyncClient):
+        raise TypeError("'client' must be an AsyncClient")
+    return client
+
+
+async def decode(
+    vin: Vin, client: AsyncClient = None, fields: Optional[Iterable[str]] = None
+) -> Vehicle:
+    if not isinstance(vin, Vin):
+        raise TypeError("'vin' must be a Vin")
+
+    client = _resolve_client(client)
+
+    if client.batcher is not None:
+        results_dict = await client.batcher.decode(vin)
+    else:
+        results_dict = (await client.get(vin._decode_path()))["Results"][0]
+
+    return Vehicle(vin, results_dict, fields)
+
+
+async def _decode_vin_batch(
+    vin_batch: List[Vin], client: AsyncClient
+) -> List[Dict[str, str]]:
+    try:
+        response = await client.post(BATCH_PATH, _batch_post_fields(vin_batch))
+        results_list = response["Results"]
+    except Exception as e:
+        raise BatchVinDecodeError("Error in API request") from e
+
+    _check_batch_results(vin_batch, results_list)
+
+    return results_list
+
+
+async def decode_vins(
+    vin_list: List[Vin],
+    client: AsyncClient = None,
+    batch_size: int = BATCH_VIN_LIMIT,
+    invalid: str = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ResultsList:
+
+    client = _resolve_client(client)
+
+    _check_decode_vins_args(vin_list, batch_size, client.max_concurrency)
+
+    batches = _split_batches(
+        _unique_vins(_filter_invalid(vin_list, invalid)), batch_size
+    )
+
+    vehicles = {}
+    errors = []
+
+    async def decode_batch(vin_batch: List[Vin]) -> None:
+        try:
+            results_list = await _decode_vin_batch(vin_batch, client)
+        except BatchVinDecodeError as e:
+            errors.append((vin_batch, e))
+            return
+        for vin, results_dict in zip(vin_batch, results_list):
+            vehicles[str(vin)] = Vehicle(vin, results_dict, fields)
+
+    await asyncio.gather(*(decode_batch(vin_batch) for vin_batch in batches))
+
+    return _assemble_results(vin_list, vehicles, errors, len(batches))
+
+
+async def decode_wmi(wmi: str, client: AsyncClient = None) -> WMIInfo:
+    path = _decode_wmi_path(wmi)
+
+    client = _resolve_client(client)
+
+    return _build_wmi_info(wmi, await client.get(path))
+
+
+async def get_wmis(manufacturer_search: str, client: AsyncClient = None) -> ResultsList:
+    path = _get_wmis_path(manufacturer_search)
+
+    client = _resolve_client(client)
+
+    results = (await client.get(path))["Results"]
+    return ResultsList([WMIInfo(result) for result in results])
+
+
+async def get_makes(
+    manufacturer_name_or_id: Union[str, int] = None,
+    model_year: Union[str, int] = None,
+    vehicle_type: str = None,
+    client: AsyncClient = None,
+) -> ResultsList:
+
+    path = _get_makes_path(manufacturer_name_or_id, model_year, vehicle_type)
+
+    client = _resolve_client(client)
+
+    results_list = (await client.get(path))["Results"]
+
+    return ResultsList([Make(results_dict) for results_dict in results_list])
+
+
+async def get_manufacturers(
+    m_type: str = None, page: int = 1, client: AsyncClient = None
+) -> ResultsList:
+
+    path = _get_manufacturers_path(m_type, page)
+
+    client = _resolve_client(client)
+
+    return _build_manufacturers((await client.get(path))["Results"])
+
+
+async def get_manufacturer_details(
+    manufacturer_name_or_id: Union[str, int], client: AsyncClient = None
+) -> ResultsList:
+
+    path = _get_manufacturer_details_path(manufacturer_name_or_id)
+
+    client = _resolve_client(client)
+
+    return _build_manufacturers((await client.get(path))["Results"])
@@ -0,0 +1,314 @@
+from __future__ import annotations
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+)
+import functools
+import os
+from pvaw.export import PART_PATTERN, import_pyarrow
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+    from pvaw.results import Results
+
+IDENTIFIER = "identifier"
+
+ARROW_FORMATS = ("parquet", "feather")
+
+_EXTENSIONS = {
+    "parquet": "parquet",
+    "feather": "feather",
+    "arrow": "feather",
+    "ipc": "feather",
+}
+
+
+def _arrow_to_number(array: pa.Array, dtype: str) -> pa.Array:
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+    from pvaw.schema import INTEGER, NUMBER_PATTERN
+
+    numeric = pc.match_substring_regex(array, f"^{NUMBER_PATTERN}$")
+    numbers = pc.cast(
+        pc.if_else(numeric, pc.utf8_trim_whitespace(array), None), pa.float64()
+    )
+    if dtype == INTEGER:
+        integral = pc.all(pc.equal(numbers, pc.floor(numbers))).as_py()
+        if integral is not False:
+            return pc.cast(numbers, pa.int64())
+    return numbers
+
+
+def _arrow_to_category(array: pa.Array, dtype: str) -> pa.Array:
+    return array.dictionary_encode()
+
+
+# the Arrow counterpart of pvaw.schema.CONVERTERS, built on first use so that
+# pandas is only imported for typed columns
+@functools.lru_cache(maxsize=None)
+def _arrow_converters() -> Dict[str, Callable[[pa.Array, str], pa.Array]]:
+    from pvaw.schema import INTEGER, FLOAT, CATEGORY
+
+    return {
+        INTEGER: _arrow_to_number,
+        FLOAT: _arrow_to_number,
+        CATEGORY: _arrow_to_category,
+    }
+
+
+def _column(values: List[Any], name: str, typed: bool) -> pa.Array:
+    pa = import_pyarrow()
+    import pyarrow.compute as pc
+
+    array = pa.array(values)
+    if pa.types.is_null(array.type):
+        array = array.cast(pa.string())
+    if pa.types.is_string(array.type):
+        # blank strings become nulls, as they become NaN in get_df
+        blank = pc.equal(pc.utf8_trim_whitespace(array), "")
+        if pc.any(blank).as_py():
+            array = pc.if_else(blank, pa.scalar(None, pa.string()), array)
+
+    if typed and pa.types.is_string(array.type):
+        from pvaw.schema import SCHEMA
+
+        converters = _arrow_converters()
+        dtype = SCHEMA.get(name)
+        if dtype in converters:
+            array = converters[dtype](array, dtype)
+    return array
+
+
+# fields picks the columns, filled with nulls where results don't have them,
+# instead of taking the union of their keys
+def to_record_batch(
+    results: Iterable[Results],
+    raw: bool = True,
+    typed: bool = False,
+    fields: Optional[Sequence[str]] = None,
+) -> pa.RecordBatch:
+    pa = import_pyarrow()
+
+    results = list(results)
+    identifiers = [r.identifier for r in results]
+    if raw:
+        rows = [r.results_dict for r in results]
+    else:
+        rows = [r.get_key_attributes() for r in results]
+
+    if fields is not None:
+        columns = dict.fromkeys(fields)
+    else:
+        # results usually share their keys, so the union is only recomputed
+        # when a row's keys differ from the row before
+        columns = {}
+        last_keys = None
+        for row in rows:
+            keys = row.keys()
+            if keys != last_keys:
+                columns.update(dict.fromkeys(keys))
+                last_keys = keys
+    columns.pop(IDENTIFIER, None)
+
+    arrays = [pa.array(identifiers, pa.string())]
+    arrays += [
+        _column([row.get(column) for row in rows], column, typed) for column in columns
+    ]
+    return pa.RecordBatch.from_arrays(arrays, [IDENTIFIER, *columns])
+
+
+def infer_arrow_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension not in _EXTENSIONS:
+        raise ValueError(
+            f"Cannot infer the format of '{path}', "
+            f"pass one of {', '.join(ARROW_FORMATS)}"
+        )
+    return _EXTENSIONS[extension]
+
+
+class ArrowWriter:
+    # the schema is fixed by the first batch written; later batches are cast
+    # to it, with missing columns filled with nulls and extra ones dropped
+    def __init__(
+        self,
+        path: str,
+        output_format: str = None,
+        raw: bool = True,
+        typed: bool = False,
+        compression: Optional[str] = None,
+    ):
+        self.pa = import_pyarrow()
+        if output_format is None:
+            output_format = infer_arrow_format(path)
+        if output_format not in ARROW_FORMATS:
+            raise ValueError(
+                f"'output_format' must be one of {', '.join(ARROW_FORMATS)}"
+            )
+
+        self.path = path
+        self.output_format = output_format
+        self.raw = raw
+        self.typed = typed
+        self.compression = compression
+        self.schema = None
+        self.rows = 0
+        self._writer = None
+
+    def _open(self, schema: pa.Schema) -> None:
+        pa = self.pa
+        fields = []
+        for field in schema:
+            if self.output_format == "feather" and pa.types.is_dictionary(field.type):
+                # an Arrow file can't replace a dictionary between batches
+                field = field.with_type(field.type.value_type)
+            fields.append(field)
+        self.schema = pa.schema(fields)
+
+        if self.output_format == "parquet":
+            compression = self.compression if self.compression else "snappy"
+            self._writer = pa.parquet.ParquetWriter(
+                self.path, self.schema, compression=compression
+            )
+        else:
+            import pyarrow.ipc
+
+            # uncompressed by default so the file can be memory-mapped
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = pa.ipc.new_file(self.path, self.schema, options=options)
+
+    def _conform(self, batch: pa.RecordBatch) -> pa.RecordBatch:
+        pa = self.pa
+        arrays = []
+        for field in self.schema:
+            index = batch.schema.get_field_index(field.name)
+            if index == -1:
+                arrays.append(pa.nulls(batch.num_rows, field.type))
+            else:
+                arrays.append(batch.column(index).cast(field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        if self._writer is None:
+            self._open(batch.schema)
+        if batch.num_rows:
+            self._writer.write_batch(self._conform(batch))
+            self.rows += batch.num_rows
+
+    def write(
+        self, results: Iterable[Results], fields: Optional[Sequence[str]] = None
+    ) -> None:
+        self.write_batch(to_record_batch(results, self.raw, self.typed, fields))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> ArrowWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def _read_table(path: str) -> pa.Table:
+    pa = import_pyarrow()
+    import pyarrow.ipc
+
+    with open(path, "rb") as f:
+        magic = f.read(6)
+    if magic == b"ARROW1":
+        # read_all over a memory map only wraps the mapped buffers, unless
+        # the file was written compressed
+        with pa.ipc.open_file(pa.memory_map(path)) as reader:
+            return reader.read_all()
+    return pa.parquet.read_table(path, memory_map=True)
+
+
+def open_results(path: str) -> ResultsView:
+    pa = import_pyarrow()
+    if os.path.isdir(path):
+        parts = sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if PART_PATTERN.fullmatch(name)
+        )
+        if not parts:
+            raise ValueError(f"'{path}' has no part files")
+        tables = [_read_table(part) for part in parts]
+        return ResultsView(pa.concat_tables(tables, promote_options="default"))
+    return ResultsView(_read_table(path))
+
+
+class ResultsView:
+    MAX_LIST = 5
+
+    def __init__(self, table: pa.Table):
+        self.table = table
+
+    @property
+    def columns(self) -> List[str]:
+        return self.table.column_names
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.table.to_batches():
+            yield from batch.to_pylist()
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResultsView index out of range")
+        return self.table.slice(index, 1).to_pylist()[0]
+
+    def get(self, identifier: Any, default: Any = None) -> Optional[Dict[str, Any]]:
+        import pyarrow.compute as pc
+
+        index = pc.index(self.table[IDENTIFIER], identifier).as_py()
+        if index == -1:
+            return default
+        return self[index]
+
+    def __contains__(self, identifier: Any) -> bool:
+        return self.get(identifier) is not None
+
+    def column(self, name: str) -> pa.ChunkedArray:
+        return self.table[name]
+
+    def filter(self, expression: Any = None, **columns: Any) -> ResultsView:
+        import pyarrow.compute as pc
+
+        for column, value in columns.items():
+            condition = pc.field(column) == value
+            expression = condition if expression is None else expression & condition
+        if expression is None:
+            return self
+        return ResultsView(self.table.filter(expression))
+
+    def to_arrow(self) -> pa.Table:
+        return self.table
+
+    def get_df(self, drop_na: bool = True) -> pd.DataFrame:
+        df = self.table.to_pandas().set_index(IDENTIFIER)
+        df.index.name = None
+        if drop_na:
+            df = df.dropna(axis=1)
+        return df
+
+    def __str__(self):
+        rows = [str(row) for row in self.table.slice(0, self.MAX_LIST).to_pylist()]
+        if len(self) > self.MAX_LIST:
+            rows.append("...")
+        return "[{}]".format(",\n ".join(rows))
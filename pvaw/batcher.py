@@ -0,0 +1,127 @@
+from __future__ import annotations
+from typing import Any, Dict, List, TYPE_CHECKING
+from concurrent.futures import Future
+import logging
+import threading
+from pvaw.constants import BATCH_VIN_LIMIT, DEFAULT_BATCH_WINDOW
+
+if TYPE_CHECKING:
+    from pvaw.client import Client
+    from pvaw.vin import Vin
+
+logger = logging.getLogger("pvaw")
+
+
+def _check_batcher_args(window: float, max_batch: int) -> None:
+    if not isinstance(window, (int, float)):
+        raise TypeError("'window' must be a number of seconds")
+    if window < 0:
+        raise ValueError("'window' must not be negative")
+    if not isinstance(max_batch, int):
+        raise TypeError("'max_batch' must be an int")
+    if not 1 <= max_batch <= BATCH_VIN_LIMIT:
+        raise ValueError(f"'max_batch' must be between 1 and {BATCH_VIN_LIMIT}")
+
+
+class _PendingBatch:
+    __slots__ = ("vins", "futures", "timer")
+
+    def __init__(self):
+        self.vins: List[Vin] = []
+        self.futures: Dict[str, Any] = {}
+        self.timer = None
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        client: Client,
+        window: float = DEFAULT_BATCH_WINDOW,
+        max_batch: int = BATCH_VIN_LIMIT,
+    ):
+        _check_batcher_args(window, max_batch)
+
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self.submitted = 0
+        self.batches = 0
+
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def submit(self, vin: Vin) -> Future:
+        key = str(vin)
+        with self._lock:
+            self.submitted += 1
+            batch = self._pending
+            if batch is None:
+                batch = self._pending = _PendingBatch()
+                batch.timer = threading.Timer(self.window, self._flush, (batch,))
+                batch.timer.daemon = True
+                batch.timer.start()
+
+            future = batch.futures.get(key)
+            if future is None:
+                future = batch.futures[key] = Future()
+                batch.vins.append(vin)
+
+            full = len(batch.vins) >= self.max_batch
+            if full:
+                self._pending = None
+
+        # a full batch is sent by the caller that filled it, which would
+        # otherwise just be waiting for it
+        if full:
+            batch.timer.cancel()
+            self._send(batch)
+        return future
+
+    def decode(self, vin: Vin) -> Dict[str, str]:
+        cached = self.client.cache_get(vin._decode_path())
+        if cached is not None:
+            return cached["Results"][0]
+        return self.submit(vin).result()
+
+    def _flush(self, batch: _PendingBatch) -> None:
+        with self._lock:
+            if self._pending is not batch:
+                return
+            self._pending = None
+        self._send(batch)
+
+    def _send(self, batch: _PendingBatch) -> None:
+        from pvaw.vin import _decode_vin_batch
+
+        # every future is resolved whatever happens here, or the callers
+        # waiting on them in decode would block forever
+        try:
+            results_list = _decode_vin_batch(batch.vins, self.client)
+            with self._lock:
+                self.batches += 1
+            for vin, results_dict in zip(batch.vins, results_list):
+                batch.futures[str(vin)].set_result(results_dict)
+                try:
+                    self.client.cache_set(
+                        vin._decode_path(), {"Results": [results_dict]}
+                    )
+                except Exception:
+                    # the VIN was decoded, it just won't be cached
+                    logger.warning("pvaw could not cache %s", vin, exc_info=True)
+        except BaseException as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(
+                        RuntimeError("the batch returned no result for this VIN")
+                    )
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, None
+        if batch is not None:
+            batch.timer.cancel()
+            self._send(batch)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+from typing import Any, Dict, Tuple, Optional
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+from pvaw.constants import (
+    DEFAULT_CACHE_TTL,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_PATTERN_CACHE_SIZE,
+)
+
+
+def normalize_path(path: str) -> Tuple[str, str]:
+    resource, _, query = path.partition("?")
+    endpoint, _, argument = resource.partition("/")
+    params = sorted(
+        p.lower() for p in query.split("&") if p and p.lower() != "format=json"
+    )
+    key = argument.strip("/").lower()
+    if params:
+        key = f"{key}?{'&'.join(params)}"
+    return endpoint.lower(), key
+
+
+class SQLiteCache:
+    EVICTION_INTERVAL = 256
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = DEFAULT_CACHE_TTL,
+        endpoint_ttls: Dict[str, float] = None,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        timeout: float = 30,
+    ):
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError("'path' must be a str or path")
+        if not isinstance(ttl, (int, float)):
+            raise TypeError("'ttl' must be a number of seconds")
+        if endpoint_ttls is not None and not isinstance(endpoint_ttls, dict):
+            raise TypeError("'endpoint_ttls' must be a dict")
+        if not isinstance(max_entries, int):
+            raise TypeError("'max_entries' must be an int")
+        if max_entries < 1:
+            raise ValueError("'max_entries' must be positive")
+
+        self.path = os.fspath(path)
+        self.ttl = ttl
+        self.endpoint_ttls = {
+            endpoint.lower(): endpoint_ttl
+            for endpoint, endpoint_ttl in (endpoint_ttls or {}).items()
+        }
+        self.max_entries = max_entries
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._writes = 0
+
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "endpoint TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "PRIMARY KEY (endpoint, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections can't cross threads or forks, so each thread of
+        # each process opens its own and sqlite's file locking does the rest
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get_ttl(self, endpoint: str) -> float:
+        return self.endpoint_ttls.get(endpoint.lower(), self.ttl)
+
+    def get(self, endpoint: str, key: str) -> Any:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM responses "
+                "WHERE endpoint = ? AND key = ? AND expires_at > ?",
+                (endpoint.lower(), key, time.time()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def set(self, endpoint: str, key: str, value: Any) -> None:
+        ttl = self.get_ttl(endpoint)
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (endpoint.lower(), key, json.dumps(value), now, now + ttl),
+        )
+
+        self._writes += 1
+        if self._writes % self.EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+            )
+            connection.execute(
+                "DELETE FROM responses WHERE rowid IN ("
+                "SELECT rowid FROM responses ORDER BY stored_at LIMIT max(0, "
+                "(SELECT COUNT(*) FROM responses) - ?))",
+                (self.max_entries,),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        return (
+            self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        )
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def vin_pattern(full_or_partial_vin: str, model_year: int = None) -> Optional[str]:
+    # positions 1-8 (WMI and VDS), 10 (model year) and 11 (plant) determine
+    # the decoded attributes; the check digit and serial number don't
+    if len(full_or_partial_vin) != 17 or "*" in full_or_partial_vin:
+        return None
+    vin = full_or_partial_vin.upper()
+    pattern = f"{vin[:8]}{vin[9:11]}"
+    if model_year is not None:
+        pattern = f"{pattern},{model_year}"
+    return pattern
+
+
+class PatternCache:
+    def __init__(self, maxsize: int = DEFAULT_PATTERN_CACHE_SIZE):
+        if not isinstance(maxsize, int):
+            raise TypeError("'maxsize' must be an int")
+        if maxsize < 1:
+            raise ValueError("'maxsize' must be positive")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, full_vin: str, model_year: int = None) -> Optional[Dict[str, Any]]:
+        pattern = vin_pattern(full_vin, model_year)
+        if pattern is None:
+            return None
+
+        with self._lock:
+            results_dict = self._entries.get(pattern)
+            if results_dict is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(pattern)
+            self.hits += 1
+
+        results_dict = dict(results_dict)
+        results_dict["VIN"] = full_vin
+        return results_dict
+
+    def set(self, full_vin: str, model_year: int, results_dict: Dict[str, Any]) -> bool:
+        pattern = vin_pattern(full_vin, model_year)
+        # only clean decodes are shared, errors may be specific to one VIN
+        if pattern is None or results_dict.get("ErrorCode") != "0":
+            return False
+
+        with self._lock:
+            self._entries[pattern] = results_dict
+            self._entries.move_to_end(pattern)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._entries
@@ -0,0 +1,279 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, Optional, Union, Tuple, TYPE_CHECKING
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from pvaw.cache import SQLiteCache, PatternCache, normalize_path
+from pvaw.ratelimit import RateLimiter, RetryPolicy
+from pvaw.singleflight import SingleFlight
+from pvaw.batcher import MicroBatcher
+from pvaw.instrument import Instrument, RequestEvent
+from pvaw.jsondecode import JSONDecoder
+from pvaw.constants import (
+    VEHICLE_API_PATH,
+    DEFAULT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    THROTTLE_STATUSES,
+    BATCH_VIN_LIMIT,
+)
+
+if TYPE_CHECKING:
+    from pvaw.wmi import WMIIndex
+
+
+class Client:
+    def __init__(
+        self,
+        base_url: str = VEHICLE_API_PATH,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        pool_connections: int = DEFAULT_POOL_SIZE,
+        pool_maxsize: int = DEFAULT_POOL_SIZE,
+        gzip: bool = True,
+        headers: Dict[str, str] = None,
+        cache: SQLiteCache = None,
+        pattern_cache: PatternCache = None,
+        wmi_index: WMIIndex = None,
+        rate_limiter: RateLimiter = None,
+        retry: RetryPolicy = None,
+        coalesce: bool = True,
+        batch_window: float = None,
+        max_batch: int = BATCH_VIN_LIMIT,
+        instrument: Instrument = None,
+        json_backend: str = None,
+    ):
+        if not isinstance(base_url, str):
+            raise TypeError("'base_url' must be a str")
+        if not isinstance(pool_connections, int) or not isinstance(pool_maxsize, int):
+            raise TypeError("'pool_connections' and 'pool_maxsize' must be ints")
+        if pool_connections < 1 or pool_maxsize < 1:
+            raise ValueError("'pool_connections' and 'pool_maxsize' must be positive")
+        if cache is not None and not isinstance(cache, SQLiteCache):
+            raise TypeError("'cache' must be a SQLiteCache")
+        if pattern_cache is not None and not isinstance(pattern_cache, PatternCache):
+            raise TypeError("'pattern_cache' must be a PatternCache")
+        if wmi_index is not None:
+            from pvaw.wmi import WMIIndex
+
+            if not isinstance(wmi_index, WMIIndex):
+                raise TypeError("'wmi_index' must be a WMIIndex")
+        if rate_limiter is not None and not isinstance(rate_limiter, RateLimiter):
+            raise TypeError("'rate_limiter' must be a RateLimiter")
+        if retry is not None and not isinstance(retry, RetryPolicy):
+            raise TypeError("'retry' must be a RetryPolicy")
+        if instrument is not None and not isinstance(instrument, Instrument):
+            raise TypeError("'instrument' must be an Instrument")
+
+        self.base_url = base_url if base_url.endswith("/") else f"{base_url}/"
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.cache = cache
+        self.pattern_cache = pattern_cache
+        self.wmi_index = wmi_index
+        self.rate_limiter = rate_limiter
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.single_flight = SingleFlight() if coalesce else None
+        self.instrument = instrument
+        self.json_decoder = None
+        if json_backend is not None:
+            self.json_decoder = JSONDecoder(json_backend)
+        self.batcher = None
+        if batch_window is not None:
+            self.batcher = MicroBatcher(self, batch_window, max_batch)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = (
+            "gzip, deflate" if gzip else "identity"
+        )
+        if headers is not None:
+            self.session.headers.update(headers)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def cache_get(self, path: str) -> Any:
+        if self.cache is None:
+            return None
+        return self.cache.get(*normalize_path(path))
+
+    def cache_set(self, path: str, value: Any) -> None:
+        if self.cache is not None:
+            self.cache.set(*normalize_path(path), value)
+
+    def get(self, path: str, build: Callable[[Any], Any] = None) -> Any:
+        return self._call("GET", path, lambda event: self._get(path, event), build)
+
+    # with a json_backend, fields limits which fields of each result are parsed
+    def post(
+        self,
+        path: str,
+        data: Dict[str, str],
+        build: Callable[[Any], Any] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Any:
+        return self._call(
+            "POST",
+            path,
+            lambda event: self._fetch(
+                self.session.post, path, event, data, fields=fields
+            ),
+            build,
+        )
+
+    # build turns the parsed response into results objects, so its time can be
+    # reported separately from the network and parsing
+    def _call(
+        self,
+        method: str,
+        path: str,
+        request: Callable[[RequestEvent], Any],
+        build: Callable[[Any], Any],
+    ) -> Any:
+        if self.instrument is None:
+            value = request(None)
+            return value if build is None else build(value)
+
+        event = RequestEvent(method, path)
+        try:
+            value = request(event)
+            if build is not None:
+                start = time.perf_counter()
+                value = build(value)
+                event.build_seconds = time.perf_counter() - start
+            return value
+        except BaseException as e:
+            event.error = e
+            raise
+        finally:
+            event.finish()
+            self.instrument.on_request(event)
+
+    def _get(self, path: str, event: RequestEvent = None) -> Any:
+        cached = self.cache_get(path)
+        if event is not None and self.cache is not None:
+            event.cache = "miss" if cached is None else "hit"
+        if cached is not None:
+            return cached
+
+        if self.single_flight is None:
+            return self._fetch_get(path, event)
+
+        start = time.perf_counter()
+        value = self.single_flight.do(
+            normalize_path(path), lambda: self._fetch_get(path, event)
+        )
+        # only the caller that sent the request has its event filled in
+        if event is not None and event.status is None:
+            event.coalesced = True
+            event.network_seconds = time.perf_counter() - start
+        return value
+
+    def _fetch_get(self, path: str, event: RequestEvent = None) -> Any:
+        value = self._fetch(self.session.get, path, event)
+        self.cache_set(path, value)
+        return value
+
+    def _fetch(
+        self,
+        method: Callable,
+        path: str,
+        event: RequestEvent = None,
+        *args,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            response = self._send(method, self.url(path), *args, event=event)
+        finally:
+            if event is not None:
+                event.network_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if self.json_decoder is None:
+            value = response.json()
+        else:
+            value = self.json_decoder.loads_results(response.content, fields)
+        if event is not None:
+            event.parse_seconds = time.perf_counter() - start
+            content = response.content
+            if isinstance(content, (bytes, bytearray)):
+                event.response_bytes = len(content)
+        return value
+
+    def _send(
+        self, method: Callable, url: str, *args, event: RequestEvent = None
+    ) -> requests.Response:
+        attempt = 0
+        while True:
+            if event is not None:
+                event.retries = attempt
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = method(url, *args, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self.retry.should_retry(attempt):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+            else:
+                status = response.status_code
+                if event is not None:
+                    event.status = status
+                if self.rate_limiter is not None:
+                    if status in THROTTLE_STATUSES:
+                        self.rate_limiter.throttled()
+                    else:
+                        self.rate_limiter.succeeded()
+                if not self.retry.should_retry(attempt, status):
+                    response.raise_for_status()
+                    return response
+                time.sleep(
+                    self.retry.delay(attempt, response.headers.get("Retry-After"))
+                )
+            attempt += 1
+
+    def close(self) -> None:
+        if self.batcher is not None:
+            self.batcher.flush()
+        self.session.close()
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> Client:
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = Client()
+    return _default_client
+
+
+def set_default_client(client: Client) -> None:
+    global _default_client
+    if not isinstance(client, Client):
+        raise TypeError("'client' must be a Client")
+    with _default_client_lock:
+        _default_client = client
+
+
+def resolve_client(client: Client = None) -> Client:
+    if client is None:
+        return get_default_client()
+    if not isinstance(client, Client):
+        raise TypeError("'client' must be a Client")
+    return client
@@ -1,3 +1,50 @@
 VEHICLE_API_PATH = "https://vpic.nhtsa.dot.gov/api/vehicles/"
 
-EARLIEST_YEAR = 1953
\ No newline at end of file
+EARLIEST_YEAR = 1953
+
+DEFAULT_TIMEOUT = 30
+
+DEFAULT_POOL_SIZE = 10
+
+BATCH_VIN_LIMIT = 50
+
+DEFAULT_MAX_WORKERS = 4
+
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60
+
+DEFAULT_CACHE_MAX_ENTRIES = 1_000_000
+
+DEFAULT_PATTERN_CACHE_SIZE = 100_000
+
+DEFAULT_PREFETCH_PAGES = 2
+
+DEFAULT_CHECKPOINT_EVERY = 20
+
+DEFAULT_RETRIES = 3
+
+DEFAULT_BACKOFF = 0.5
+
+DEFAULT_MAX_BACKOFF = 30
+
+RETRY_STATUSES = (403, 429, 500, 502, 503, 504)
+
+# statuses NHTSA answers with when it wants clients to slow down
+THROTTLE_STATUSES = (403, 429, 503)
+
+DEFAULT_BATCH_WINDOW = 0.02
+
+# rejected lines held by one decode_file batch before it is written out
+MAX_BATCH_REJECTS = 1000
+
+# every vehicle type vPIC assigns makes to
+VEHICLE_TYPES = (
+    "Bus",
+    "Incomplete Vehicle",
+    "Low Speed Vehicle (LSV)",
+    "Motorcycle",
+    "Multipurpose Passenger Vehicle (MPV)",
+    "Off Road Vehicle",
+    "Passenger Car",
+    "Trailer",
+    "Truck",
+)
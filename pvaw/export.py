@@ -0,0 +1,204 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
+import csv
+import json
+import os
+import re
+
+if TYPE_CHECKING:
+    from pvaw.results import Results
+
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet", "feather")
+
+# the part files written for Parquet and Feather output
+PART_PATTERN = re.compile(r"part-(\d{8})\.(parquet|arrow)")
+
+
+def infer_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("json", "ndjson"):
+        extension = "jsonl"
+    if extension in ("arrow", "ipc"):
+        extension = "feather"
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Cannot infer the output format of '{path}', "
+            f"pass one of {', '.join(OUTPUT_FORMATS)}"
+        )
+    return extension
+
+
+def import_pyarrow():
+    # pyarrow is optional and slow to import, so it's only loaded when an
+    # Arrow or Parquet output is opened
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Arrow and Parquet output requires pyarrow, "
+            "install it with 'pip install pvaw[arrow]'"
+        ) from e
+    return pyarrow
+
+
+def _to_row(
+    results: Results, raw: bool, fields: Optional[Sequence[str]]
+) -> Dict[str, Any]:
+    if raw:
+        row = results.results_dict
+    else:
+        row = results.get_key_attributes()
+    if fields is not None:
+        row = {field: row.get(field) for field in fields}
+    return row
+
+
+class RowWriter:
+    def __init__(self, path: str, state: Dict[str, Any] = None):
+        self.path = path
+        self.columns = None if state is None else state.get("columns")
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def write_results(
+        self, results: List[Results], raw: bool, fields: Optional[Sequence[str]]
+    ) -> None:
+        self.write_rows([_to_row(r, raw, fields) for r in results])
+
+    def commit(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> RowWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class _TextRowWriter(RowWriter):
+    # text outputs are appended to; committing records the file offset so a
+    # resumed run can cut off rows written after the last commit
+    def __init__(self, path: str, state: Dict[str, Any] = None):
+        super().__init__(path, state)
+        if state is not None and os.path.exists(path):
+            self.file = open(path, "r+", encoding="utf-8", newline="")
+            self.file.truncate(state["offset"])
+            self.file.seek(state["offset"])
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline="")
+
+    def commit(self) -> Dict[str, Any]:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {"offset": self.file.tell(), "columns": self.columns}
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class CSVRowWriter(_TextRowWriter):
+    def __init__(self, path: str, state: Dict[str, Any] = None):
+        super().__init__(path, state)
+        self.writer = None
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if self.writer is None:
+            header = self.columns is None
+            if header:
+                self.columns = list(rows[0].keys())
+            self.writer = csv.DictWriter(
+                self.file, fieldnames=self.columns, extrasaction="ignore"
+            )
+            if header:
+                self.writer.writeheader()
+        self.writer.writerows(rows)
+
+
+class JSONLRowWriter(_TextRowWriter):
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.file.write(json.dumps(row, separators=(",", ":")))
+            self.file.write("\n")
+
+
+class _PartRowWriter(RowWriter):
+    # Parquet and Arrow files are only readable once closed, so the output is
+    # a directory of part files and each commit closes the current part. The
+    # parts are written with pvaw.ArrowWriter, so pvaw.open_results reads them
+    OUTPUT_FORMAT = None
+    EXTENSION = None
+
+    def __init__(self, path: str, state: Dict[str, Any] = None):
+        import_pyarrow()
+        super().__init__(path, state)
+        os.makedirs(path, exist_ok=True)
+        self.parts = 0 if state is None else state["parts"]
+        # parts written after the last commit are removed, other files kept
+        for name in os.listdir(path):
+            match = PART_PATTERN.fullmatch(name)
+            if match is not None and int(match.group(1)) >= self.parts:
+                os.remove(os.path.join(path, name))
+        self.writer = None
+
+    def write_results(
+        self, results: List[Results], raw: bool, fields: Optional[Sequence[str]]
+    ) -> None:
+        from pvaw.arrow import ArrowWriter, to_record_batch
+
+        if not results:
+            return
+        # every part has the columns of the first batch written
+        batch = to_record_batch(results, raw, fields=self.columns or fields)
+        if self.columns is None:
+            self.columns = batch.schema.names[1:]
+        if self.writer is None:
+            part_path = os.path.join(
+                self.path, f"part-{self.parts:08d}.{self.EXTENSION}"
+            )
+            self.writer = ArrowWriter(part_path, self.OUTPUT_FORMAT)
+        self.writer.write_batch(batch)
+
+    def commit(self) -> Dict[str, Any]:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.parts += 1
+        return {"parts": self.parts, "columns": self.columns}
+
+    def close(self) -> None:
+        self.commit()
+
+
+class ParquetRowWriter(_PartRowWriter):
+    OUTPUT_FORMAT = "parquet"
+    EXTENSION = "parquet"
+
+
+class FeatherRowWriter(_PartRowWriter):
+    OUTPUT_FORMAT = "feather"
+    EXTENSION = "arrow"
+
+
+ROW_WRITERS = {
+    "csv": CSVRowWriter,
+    "jsonl": JSONLRowWriter,
+    "parquet": ParquetRowWriter,
+    "feather": FeatherRowWriter,
+}
+
+
+def open_row_writer(
+    path: str, output_format: str = None, state: Dict[str, Any] = None
+) -> RowWriter:
+    if output_format is None:
+        output_format = infer_format(path)
+    if output_format not in ROW_WRITERS:
+        raise ValueError(f"'output_format' must be one of {', '.join(OUTPUT_FORMATS)}")
+    return ROW_WRITERS[output_format](path, state)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional
+import bisect
+import logging
+import threading
+import time
+from pvaw.cache import normalize_path
+
+# upper bounds in seconds, roughly 2.5x apart, with a final catch-all bucket
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float("inf"),
+)
+
+PHASES = ("network", "parse", "build", "total")
+
+
+class RequestEvent:
+    __slots__ = (
+        "method",
+        "endpoint",
+        "params",
+        "status",
+        "retries",
+        "response_bytes",
+        "cache",
+        "coalesced",
+        "network_seconds",
+        "parse_seconds",
+        "build_seconds",
+        "total_seconds",
+        "error",
+        "_start",
+    )
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.endpoint, self.params = normalize_path(path)
+        self.status = None
+        self.retries = 0
+        self.response_bytes = None
+        # "hit" or "miss" when the client has a cache, None otherwise
+        self.cache = None
+        self.coalesced = False
+        self.network_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.build_seconds = 0.0
+        self.total_seconds = None
+        self.error = None
+        self._start = time.perf_counter()
+
+    def finish(self) -> None:
+        self.total_seconds = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {field: getattr(self, field) for field in self.__slots__[:-1]}
+        if self.error is not None:
+            d["error"] = repr(self.error)
+        return d
+
+    def __str__(self):
+        return " ".join(f"{k}={v}" for k, v in self.to_dict().items())
+
+
+class Instrument:
+    def on_request(self, event: RequestEvent) -> None:
+        pass
+
+
+class LoggingInstrument(Instrument):
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG):
+        self.logger = logger if logger is not None else logging.getLogger("pvaw")
+        self.level = level
+
+    def on_request(self, event: RequestEvent) -> None:
+        level = logging.WARNING if event.error is not None else self.level
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, "pvaw request %s", event)
+
+
+class Histogram:
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        self.counts[min(index, len(self.buckets) - 1)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    # the upper bound of the bucket holding the quantile, capped at the max
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(map(str, self.buckets), self.counts)),
+        }
+
+
+class _EndpointStats:
+    COUNTERS = (
+        "requests",
+        "errors",
+        "retries",
+        "cache_hits",
+        "cache_misses",
+        "coalesced",
+        "response_bytes",
+    )
+
+    def __init__(self, buckets: Iterable[float]):
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+        self.histograms = {phase: Histogram(buckets) for phase in PHASES}
+
+    def add(self, event: RequestEvent) -> None:
+        self.requests += 1
+        self.errors += event.error is not None
+        self.retries += event.retries
+        self.cache_hits += event.cache == "hit"
+        self.cache_misses += event.cache == "miss"
+        self.coalesced += event.coalesced
+        self.response_bytes += event.response_bytes or 0
+        for phase in PHASES:
+            self.histograms[phase].add(getattr(event, f"{phase}_seconds"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {counter: getattr(self, counter) for counter in self.COUNTERS}
+        for phase, histogram in self.histograms.items():
+            d[f"{phase}_seconds"] = histogram.to_dict()
+        return d
+
+
+class HistogramInstrument(Instrument):
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _EndpointStats] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._stats.get(event.endpoint)
+            if stats is None:
+                stats = self._stats[event.endpoint] = _EndpointStats(self.buckets)
+            stats.add(event)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {endpoint: s.to_dict() for endpoint, s in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
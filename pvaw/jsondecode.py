@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Optional
+import json
+import threading
+
+JSON_BACKENDS = ("orjson", "simdjson", "json")
+
+
+def _load_backend(name: str) -> Any:
+    if name == "json":
+        return json
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"'json_backend' must be 'auto' or one of {JSON_BACKENDS}")
+    try:
+        return __import__(name)
+    except ImportError as e:
+        raise ImportError(
+            f"the {name} JSON backend requires {name}, "
+            f"install it with 'pip install {name}'"
+        ) from e
+
+
+class JSONDecoder:
+    def __init__(self, backend: str = "auto"):
+        if not isinstance(backend, str):
+            raise TypeError("'json_backend' must be a str")
+
+        if backend == "auto":
+            for name in JSON_BACKENDS:
+                try:
+                    module = _load_backend(name)
+                except ImportError:
+                    continue
+                backend = name
+                break
+        else:
+            module = _load_backend(backend)
+
+        self.backend = backend
+        self.loads: Callable[[Any], Any] = module.loads
+        # simdjson parsers are reused between documents but can't be shared
+        # between threads
+        self._local = threading.local() if backend == "simdjson" else None
+        self._simdjson = module if backend == "simdjson" else None
+
+    def _parser(self) -> Any:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._local.parser = self._simdjson.Parser()
+        return parser
+
+    # parses a response keeping only the given fields of each of its Results
+    def loads_results(self, content: Any, fields: Optional[Iterable[str]]) -> Any:
+        if fields is None:
+            return self.loads(content)
+        fields = tuple(fields)
+
+        if self._simdjson is None:
+            response = self.loads(content)
+            response["Results"] = [
+                {field: result[field] for field in fields if field in result}
+                for result in response["Results"]
+            ]
+            return response
+
+        # simdjson parses lazily, so the fields left out are never turned into
+        # Python objects; the proxies must be copied out before the next parse
+        document = self._parser().parse(content)
+        response = {key: value for key, value in document.items() if key != "Results"}
+        response["Results"] = [
+            {field: result[field] for field in fields if field in result}
+            for result in document["Results"]
+        ]
+        return response
+
+    def __repr__(self):
+        return f"JSONDecoder({self.backend!r})"
@@ -1,13 +1,23 @@
 from __future__ import annotations
-from typing import Dict, Union
-import requests
-from pvaw.constants import VEHICLE_API_PATH
-from pvaw.results import Results, ResultsList
-from pvaw.utils import check_model_year
+from typing import Any, Dict, List, Tuple, Union, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import json
+import os
+from pvaw.results import Results, ResultsList, intern
+from pvaw.utils import check_model_year, get_int
+from pvaw.client import Client, resolve_client
+from pvaw.constants import DEFAULT_MAX_WORKERS, VEHICLE_TYPES
+from pvaw.manufacturer import iter_manufacturers
 
 
 class Make(Results):
-    def __init__(self, results_dict: Dict[str, str]):
+    KEY_ATTRIBUTES = ("make_id", "make_name", "manufacturer", "vehicle_type")
+    __slots__ = KEY_ATTRIBUTES
+
+    def __init__(
+        self, results_dict: Dict[str, str], fields: Optional[Iterable[str]] = None
+    ):
         if "Make_ID" in results_dict.keys():
             self.make_id = results_dict["Make_ID"]
         else:
@@ -19,26 +29,57 @@ class Make(Results):
             self.make_name = results_dict["MakeName"]
 
         if "Mfr_Name" in results_dict.keys():
-            self.manufacturer = results_dict["Mfr_Name"]
+            self.manufacturer = intern(results_dict["Mfr_Name"])
         elif "MfrName" in results_dict.keys():
-            self.manufacturer = results_dict["MfrName"]
+            self.manufacturer = intern(results_dict["MfrName"])
         else:
             self.manufacturer = None
 
         if "VehicleTypeName" in results_dict.keys():
-            self.vehicle_type = results_dict["VehicleTypeName"]
+            self.vehicle_type = intern(results_dict["VehicleTypeName"])
         else:
             self.vehicle_type = None
 
-        super().__init__(f"{self.make_id}-{self.manufacturer}", results_dict)
+        super().__init__(f"{self.make_id}-{self.manufacturer}", results_dict, fields)
 
 
-def get_makes(
+class MakeYears(Make):
+    KEY_ATTRIBUTES = Make.KEY_ATTRIBUTES + ("model_years",)
+    __slots__ = ("model_years",)
+
+    # one make merged across the model years it was returned for
+    def __init__(
+        self,
+        results_dict: Dict[str, str],
+        model_years: Iterable[int] = (),
+        fields: Optional[Iterable[str]] = None,
+    ):
+        super().__init__(results_dict, fields)
+        self.identifier = self.make_id
+        self.model_years = sorted(model_years)
+
+
+class BulkMakesError(Exception):
+    def __init__(
+        self,
+        message: str,
+        results: ResultsList = None,
+        errors: List[Tuple[Tuple[Union[str, int], int], Exception]] = None,
+    ):
+        super().__init__(message)
+        self.results = results
+        self.errors = errors if errors is not None else []
+
+
+def _build_makes(response: Dict[str, Any]) -> ResultsList:
+    return ResultsList([Make(results_dict) for results_dict in response["Results"]])
+
+
+def _check_makes_args(
     manufacturer_name_or_id: Union[str, int] = None,
     model_year: Union[str, int] = None,
     vehicle_type: str = None,
-) -> ResultsList:
-
+) -> None:
     if manufacturer_name_or_id is not None and not isinstance(
         manufacturer_name_or_id, (str, int)
     ):
@@ -60,15 +101,263 @@ def get_makes(
             "Cannot search by 'model_year' without 'manufacturer_name_or_id'"
         )
 
+
+def _get_makes_path(
+    manufacturer_name_or_id: Union[str, int] = None,
+    model_year: Union[str, int] = None,
+    vehicle_type: str = None,
+) -> str:
+
+    _check_makes_args(manufacturer_name_or_id, model_year, vehicle_type)
+
     if manufacturer_name_or_id is not None:
         if model_year is not None:
-            path = f"{VEHICLE_API_PATH}GetMakesForManufacturerAndYear/{manufacturer_name_or_id}?year={model_year}&format=json"
+            path = f"GetMakesForManufacturerAndYear/{manufacturer_name_or_id}?year={model_year}&format=json"
         else:
-            path = f"{VEHICLE_API_PATH}GetMakeForManufacturer/{manufacturer_name_or_id}?format=json"
+            path = f"GetMakeForManufacturer/{manufacturer_name_or_id}?format=json"
     else:
-        path = f"{VEHICLE_API_PATH}GetMakesForVehicleType/{vehicle_type}?format=json"
+        path = f"GetMakesForVehicleType/{vehicle_type}?format=json"
+
+    return path
+
+
+def get_makes(
+    manufacturer_name_or_id: Union[str, int] = None,
+    model_year: Union[str, int] = None,
+    vehicle_type: str = None,
+    client: Client = None,
+) -> ResultsList:
+
+    path = _get_makes_path(manufacturer_name_or_id, model_year, vehicle_type)
+
+    client = resolve_client(client)
+
+    return client.get(path, build=_build_makes)
+
+
+def get_makes_bulk(
+    manufacturers: Iterable[Union[str, int]],
+    model_years: Iterable[Union[str, int]],
+    client: Client = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> ResultsList:
+    if isinstance(manufacturers, (str, int)) or isinstance(model_years, (str, int)):
+        raise TypeError("'manufacturers' and 'model_years' must be iterables")
+    if not isinstance(max_workers, int):
+        raise TypeError("'max_workers' must be an int")
+    if max_workers < 1:
+        raise ValueError("'max_workers' must be positive")
+
+    model_years = list(model_years)
+    for year in model_years:
+        check_model_year(year)
+    queries = [(m, int(year)) for m in manufacturers for year in model_years]
+    # every query is checked before any request is sent
+    paths = [_get_makes_path(m, year) for m, year in queries]
+
+    client = resolve_client(client)
+
+    def fetch(path: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Exception]]:
+        try:
+            return client.get(path)["Results"], None
+        except Exception as e:
+            return None, e
+
+    outcomes = []
+    if paths:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+            outcomes = list(pool.map(fetch, paths))
+
+    # makes are merged by make_id in query order, keeping the first
+    # manufacturer a make was returned for and every year it was returned for
+    merged = {}
+    years = {}
+    errors = []
+    for query, (results, error) in zip(queries, outcomes):
+        if error is not None:
+            errors.append((query, error))
+            continue
+        for results_dict in results:
+            make_id = results_dict.get("MakeId", results_dict.get("Make_ID"))
+            if make_id not in merged:
+                merged[make_id] = results_dict
+                years[make_id] = set()
+            years[make_id].add(query[1])
+
+    results = ResultsList(
+        [MakeYears(results_dict, years[k]) for k, results_dict in merged.items()]
+    )
+    if errors:
+        raise BulkMakesError(
+            f"{len(errors)} of {len(queries)} queries failed: {errors[0][1]}",
+            results=results,
+            errors=errors,
+        )
+    return results
+
+
+class MakeCatalog:
+    # one entry per make per query it was returned for, so a make stays
+    # findable by each manufacturer, year and vehicle type it was loaded with
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self._entries: List[Tuple[Make, Optional[int], str, str, Optional[int]]] = []
+        self._by_make_id: Dict[Any, List[int]] = {}
+        self._by_manufacturer_id: Dict[int, List[int]] = {}
+        self._by_manufacturer: Dict[str, List[int]] = {}
+        self._by_vehicle_type: Dict[str, List[int]] = {}
+        self._by_year: Dict[int, List[int]] = {}
+        self._matches: Dict[Tuple[str, str], frozenset] = {}
+        self._queries: Dict[Tuple[Any, ...], List[Make]] = {}
+        for entry in entries:
+            self.add(entry["results"], entry.get("year"), entry.get("manufacturer_id"))
+
+    def add(
+        self,
+        results_dict: Dict[str, Any],
+        model_year: Union[str, int] = None,
+        manufacturer_id: int = None,
+    ) -> None:
+        make = Make(results_dict)
+        if manufacturer_id is None:
+            manufacturer_id = get_int(results_dict.get("MfrId"))
+        model_year = get_int(model_year)
+        manufacturer = (make.manufacturer or "").lower()
+        vehicle_type = (make.vehicle_type or "").lower()
+
+        position = len(self._entries)
+        self._entries.append(
+            (make, manufacturer_id, manufacturer, vehicle_type, model_year)
+        )
+        self._matches.clear()
+        self._queries.clear()
+        for index, key in (
+            (self._by_make_id, make.make_id),
+            (self._by_manufacturer_id, manufacturer_id),
+            (self._by_manufacturer, manufacturer),
+            (self._by_vehicle_type, vehicle_type),
+            (self._by_year, model_year),
+        ):
+            if key is not None and key != "":
+                index.setdefault(key, []).append(position)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def years(self) -> List[int]:
+        return sorted(self._by_year)
+
+    # the API matches manufacturer and vehicle type names by substring, so the
+    # names are scanned once per distinct search and the answer is kept
+    def _match(self, name: str, index: Dict[str, List[int]], search: str) -> frozenset:
+        key = (name, search.lower())
+        positions = self._matches.get(key)
+        if positions is None:
+            positions = frozenset(
+                position
+                for value, value_positions in index.items()
+                if key[1] in value
+                for position in value_positions
+            )
+            self._matches[key] = positions
+        return positions
+
+    def get_makes(
+        self,
+        manufacturer_name_or_id: Union[str, int] = None,
+        model_year: Union[str, int] = None,
+        vehicle_type: str = None,
+        make_id: int = None,
+    ) -> ResultsList:
+        _check_makes_args(manufacturer_name_or_id, model_year, vehicle_type)
+
+        # repeated questions are answered from the makes found the first time
+        key = (manufacturer_name_or_id, get_int(model_year), vehicle_type, make_id)
+        makes = self._queries.get(key)
+        if makes is None:
+            makes = self._query(*key)
+            self._queries[key] = makes
+        return ResultsList(list(makes))
+
+    def _query(
+        self,
+        manufacturer_name_or_id: Union[str, int],
+        model_year: Optional[int],
+        vehicle_type: Optional[str],
+        make_id: Optional[int],
+    ) -> List[Make]:
+        if vehicle_type is not None:
+            positions = self._match("vehicle_type", self._by_vehicle_type, vehicle_type)
+        elif manufacturer_name_or_id is not None:
+            manufacturer_id = get_int(manufacturer_name_or_id)
+            if manufacturer_id is not None:
+                positions = frozenset(self._by_manufacturer_id.get(manufacturer_id, ()))
+            else:
+                positions = self._match(
+                    "manufacturer", self._by_manufacturer, manufacturer_name_or_id
+                )
+            if model_year is not None:
+                positions = positions.intersection(self._by_year.get(model_year, ()))
+        else:
+            positions = range(len(self._entries))
+
+        if make_id is not None:
+            positions = set(positions).intersection(self._by_make_id.get(make_id, ()))
+
+        # a make returned for several years or searches is only listed once
+        makes = {}
+        for position in sorted(positions):
+            make = self._entries[position][0]
+            makes.setdefault((make.identifier, make.vehicle_type), make)
+        return list(makes.values())
+
+    @classmethod
+    def build(
+        cls,
+        manufacturers: Iterable[Union[str, int]] = None,
+        years: Iterable[Union[str, int]] = None,
+        vehicle_types: Iterable[str] = VEHICLE_TYPES,
+        client: Client = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> MakeCatalog:
+        client = resolve_client(client)
+
+        queries = [(None, None, vehicle_type) for vehicle_type in vehicle_types]
+        if years is not None and manufacturers is None:
+            manufacturers = [m.id for m in iter_manufacturers(client=client)]
+        if manufacturers is not None:
+            years = [None] if years is None else list(years)
+            queries += [(m, year, None) for m in manufacturers for year in years]
+
+        def fetch(query: Tuple[Any, Any, Any]) -> List[Dict[str, Any]]:
+            return client.get(_get_makes_path(*query))["Results"]
+
+        catalog = cls()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for (manufacturer, year, _), results in zip(
+                queries, pool.map(fetch, queries)
+            ):
+                manufacturer_id = get_int(manufacturer)
+                for results_dict in results:
+                    catalog.add(results_dict, year, manufacturer_id)
+        return catalog
 
-    response = requests.get(path)
-    results_list = response.json()["Results"]
+    def save(self, path: str) -> None:
+        entries = [
+            {
+                "results": make.results_dict,
+                "year": year,
+                "manufacturer_id": manufacturer_id,
+            }
+            for make, manufacturer_id, _, _, year in self._entries
+        ]
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f, separators=(",", ":"))
 
-    return ResultsList([Make(results_dict) for results_dict in results_list])
+    @classmethod
+    def load(cls, path: str) -> MakeCatalog:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No make catalog at '{path}'")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["entries"])
@@ -1,20 +1,51 @@
 from __future__ import annotations
-from typing import Dict, Union
-import requests
-from pvaw.constants import VEHICLE_API_PATH
-from pvaw.results import Results, ResultsList
+from typing import Any, Dict, List, Tuple, Union, Iterator, Iterable, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pvaw.results import Results, ResultsList, intern
+from pvaw.client import Client, resolve_client
+from pvaw.constants import DEFAULT_PREFETCH_PAGES, DEFAULT_MAX_WORKERS
 
 
 class Manufacturer(Results):
-    def __init__(self, man_id: Union[str, int], results_dict: Dict[str, str]):
-        super().__init__(man_id, results_dict)
+    KEY_ATTRIBUTES = ("common_name", "name", "vehicle_types", "id")
+    __slots__ = KEY_ATTRIBUTES
+
+    def __init__(
+        self,
+        man_id: Union[str, int],
+        results_dict: Dict[str, str],
+        fields: Optional[Iterable[str]] = None,
+    ):
+        super().__init__(man_id, results_dict, fields)
         self.common_name = results_dict["Mfr_CommonName"]
         self.name = results_dict["Mfr_Name"]
-        self.vehicle_types = [d["Name"] for d in results_dict["VehicleTypes"]]
+        self.vehicle_types = [intern(d["Name"]) for d in results_dict["VehicleTypes"]]
         self.id = results_dict["Mfr_ID"]
 
 
-def get_manufacturers(m_type: str = None, page: int = 1) -> ResultsList:
+class BulkManufacturersError(Exception):
+    def __init__(
+        self,
+        message: str,
+        results: Dict[Union[str, int], ResultsList] = None,
+        errors: List[Tuple[Union[str, int], Exception]] = None,
+    ):
+        super().__init__(message)
+        self.results = results if results is not None else {}
+        self.errors = errors if errors is not None else []
+
+
+def _build_manufacturers(results_list: List[Dict[str, Any]]) -> ResultsList:
+    return ResultsList(
+        [
+            Manufacturer(results_dict["Mfr_ID"], results_dict)
+            for results_dict in results_list
+        ]
+    )
+
+
+def _get_manufacturers_path(m_type: str = None, page: int = 1) -> str:
 
     args = ["format=json"]
     if m_type is not None:
@@ -29,32 +60,226 @@ def get_manufacturers(m_type: str = None, page: int = 1) -> ResultsList:
 
     args_str = "&".join(args)
 
-    path = f"{VEHICLE_API_PATH}getallmanufacturers?{args_str}"
+    return f"getallmanufacturers?{args_str}"
 
-    response = requests.get(path)
-    results_list = response.json()["Results"]
 
-    return ResultsList(
-        [
-            Manufacturer(results_dict["Mfr_ID"], results_dict)
-            for results_dict in results_list
-        ]
+def get_manufacturers(
+    m_type: str = None, page: int = 1, client: Client = None
+) -> ResultsList:
+
+    path = _get_manufacturers_path(m_type, page)
+
+    client = resolve_client(client)
+
+    return client.get(
+        path, build=lambda response: _build_manufacturers(response["Results"])
     )
 
 
-def get_manufacturer_details(manufacturer_name_or_id: Union[str, int]) -> Manufacturer:
+def _iter_manufacturers(
+    m_type: str, client: Client, prefetch: int, start_page: int
+) -> Iterator[Manufacturer]:
+    pool = ThreadPoolExecutor(max_workers=prefetch + 1)
+
+    def fetch(page: int) -> ResultsList:
+        return client.get(
+            _get_manufacturers_path(m_type, page),
+            build=lambda response: _build_manufacturers(response["Results"]),
+        )
+
+    pending = deque(pool.submit(fetch, start_page + i) for i in range(prefetch + 1))
+    next_page = start_page + prefetch + 1
+    try:
+        while True:
+            manufacturers = pending.popleft().result()
+            if len(manufacturers) == 0:
+                return
+            pending.append(pool.submit(fetch, next_page))
+            next_page += 1
+            yield from manufacturers
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def iter_manufacturers(
+    m_type: str = None,
+    client: Client = None,
+    prefetch: int = DEFAULT_PREFETCH_PAGES,
+    start_page: int = 1,
+) -> Iterator[Manufacturer]:
+
+    _get_manufacturers_path(m_type, start_page)
+
+    if not isinstance(prefetch, int):
+        raise TypeError("'prefetch' must be an int")
+    if prefetch < 0:
+        raise ValueError("'prefetch' must not be negative")
+
+    client = resolve_client(client)
+
+    return _iter_manufacturers(m_type, client, prefetch, start_page)
+
 
+def _get_manufacturer_details_path(manufacturer_name_or_id: Union[str, int]) -> str:
     if not isinstance(manufacturer_name_or_id, (str, int)):
         raise TypeError("'manufacturer_name_or_id' must be a str or int")
 
-    path = f"{VEHICLE_API_PATH}GetManufacturerDetails/{manufacturer_name_or_id}?format=json"
+    return f"GetManufacturerDetails/{manufacturer_name_or_id}?format=json"
 
-    response = requests.get(path)
-    results_list = response.json()["Results"]
 
-    return ResultsList(
-        [
-            Manufacturer(results_dict["Mfr_ID"], results_dict)
-            for results_dict in results_list
-        ]
+def get_manufacturer_details(
+    manufacturer_name_or_id: Union[str, int], client: Client = None
+) -> Manufacturer:
+
+    path = _get_manufacturer_details_path(manufacturer_name_or_id)
+
+    client = resolve_client(client)
+
+    return client.get(
+        path, build=lambda response: _build_manufacturers(response["Results"])
     )
+
+
+def _check_bulk_details_args(
+    manufacturer_names_or_ids: Iterable[Union[str, int]], max_workers: int
+) -> None:
+    if isinstance(manufacturer_names_or_ids, (str, int)):
+        raise TypeError("'manufacturer_names_or_ids' must be an iterable")
+    if not isinstance(max_workers, int):
+        raise TypeError("'max_workers' must be an int")
+    if max_workers < 1:
+        raise ValueError("'max_workers' must be positive")
+
+
+def _iter_bulk_details(
+    manufacturer_names_or_ids: Iterable[Union[str, int]],
+    client: Client,
+    max_workers: int,
+) -> Iterator[Tuple[Union[str, int], Optional[ResultsList], Optional[Exception]]]:
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    # every input matching the same Mfr_ID shares one Manufacturer object
+    manufacturers = {}
+    # inputs differing only in case or spacing are looked up once
+    finished = {}
+    waiting = {}
+    pending = {}
+    inputs = iter(manufacturer_names_or_ids)
+    exhausted = False
+
+    def collapse(results: List[Dict[str, Any]]) -> List[Manufacturer]:
+        matches = {}
+        for results_dict in results:
+            mfr_id = results_dict["Mfr_ID"]
+            if mfr_id not in manufacturers:
+                manufacturers[mfr_id] = Manufacturer(mfr_id, results_dict)
+            matches.setdefault(mfr_id, manufacturers[mfr_id])
+        return list(matches.values())
+
+    def outcomes(key: str) -> Iterator[Tuple[Any, ...]]:
+        matches, error = finished[key]
+        for manufacturer_name_or_id in waiting.pop(key, ()):
+            if error is not None:
+                yield manufacturer_name_or_id, None, error
+            else:
+                yield manufacturer_name_or_id, ResultsList(list(matches)), None
+
+    try:
+        while True:
+            # only a couple of requests per worker are queued at once, but the
+            # results of every distinct input are kept for later duplicates,
+            # so memory still grows with the number of distinct inputs
+            while not exhausted and len(pending) < 2 * max_workers:
+                try:
+                    manufacturer_name_or_id = next(inputs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                path = _get_manufacturer_details_path(manufacturer_name_or_id)
+                key = str(manufacturer_name_or_id).strip().lower()
+                if key in finished:
+                    waiting[key] = [manufacturer_name_or_id]
+                    yield from outcomes(key)
+                    continue
+                if key not in waiting:
+                    waiting[key] = []
+                    pending[pool.submit(client.get, path)] = key
+                waiting[key].append(manufacturer_name_or_id)
+
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    outcome = (collapse(future.result()["Results"]), None)
+                except Exception as e:
+                    outcome = (None, e)
+                finished[key] = outcome
+                yield from outcomes(key)
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+def iter_manufacturer_details(
+    manufacturer_names_or_ids: Iterable[Union[str, int]],
+    client: Client = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    on_error: str = "raise",
+) -> Iterator[Tuple[Union[str, int], ResultsList]]:
+
+    _check_bulk_details_args(manufacturer_names_or_ids, max_workers)
+    if on_error not in ("raise", "skip"):
+        raise ValueError("'on_error' must be 'raise' or 'skip'")
+
+    client = resolve_client(client)
+
+    def stream() -> Iterator[Tuple[Union[str, int], ResultsList]]:
+        details = _iter_bulk_details(manufacturer_names_or_ids, client, max_workers)
+        try:
+            for manufacturer_name_or_id, matches, error in details:
+                if error is None:
+                    yield manufacturer_name_or_id, matches
+                elif on_error == "raise":
+                    raise error
+        finally:
+            details.close()
+
+    return stream()
+
+
+def get_manufacturer_details_bulk(
+    manufacturer_names_or_ids: Iterable[Union[str, int]],
+    client: Client = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Dict[Union[str, int], ResultsList]:
+
+    _check_bulk_details_args(manufacturer_names_or_ids, max_workers)
+
+    client = resolve_client(client)
+
+    inputs = list(manufacturer_names_or_ids)
+    for manufacturer_name_or_id in inputs:
+        _get_manufacturer_details_path(manufacturer_name_or_id)
+    found = {}
+    errors = []
+    for manufacturer_name_or_id, matches, error in _iter_bulk_details(
+        inputs, client, max_workers
+    ):
+        if error is None:
+            found[manufacturer_name_or_id] = matches
+        else:
+            errors.append((manufacturer_name_or_id, error))
+
+    # the mapping follows the order of the inputs rather than of completion
+    results = {m: found[m] for m in inputs if m in found}
+    if errors:
+        raise BulkManufacturersError(
+            f"{len(errors)} of {len(inputs)} lookups failed: {errors[0][1]}",
+            results=results,
+            errors=errors,
+        )
+    return results
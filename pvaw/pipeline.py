@@ -0,0 +1,280 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import json
+import os
+from pvaw.client import Client, resolve_client
+from pvaw.constants import (
+    BATCH_VIN_LIMIT,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_CHECKPOINT_EVERY,
+    MAX_BATCH_REJECTS,
+)
+from pvaw.export import open_row_writer
+from pvaw.vin import Vin, Vehicle, BatchVinDecodeError, decode_vins
+
+
+class PipelineStats:
+    FIELDS = ("read", "invalid", "duplicates", "decoded", "failed", "batches")
+
+    def __init__(self, counts: Dict[str, int] = None):
+        for field in self.FIELDS:
+            setattr(self, field, 0 if counts is None else counts.get(field, 0))
+
+    def to_dict(self) -> Dict[str, int]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __str__(self):
+        return ", ".join(f"{field}: {value}" for field, value in self.to_dict().items())
+
+
+class _Batch:
+    def __init__(self):
+        self.vins = []
+        self.rejects = []
+        self.duplicates = 0
+
+
+def read_vins(
+    input_path: str, vin_column: str = "vin", model_year_column: str = "model_year"
+) -> Iterator[Tuple[str, Optional[str]]]:
+    with open(input_path, encoding="utf-8", newline="") as f:
+        if input_path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None or vin_column not in reader.fieldnames:
+                raise ValueError(f"'{input_path}' has no '{vin_column}' column")
+            for row in reader:
+                yield row[vin_column], row.get(model_year_column) or None
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    vin, _, model_year = line.partition(",")
+                    yield vin, model_year.strip() or None
+
+
+def _parse_record(
+    vin_str: str, model_year: Optional[str], validate: bool
+) -> Tuple[Optional[Vin], Optional[str]]:
+    if not vin_str or not vin_str.strip():
+        return None, "empty VIN"
+    try:
+        vin = Vin(vin_str.strip().upper(), model_year)
+    except (TypeError, ValueError) as e:
+        return None, str(e)
+
+    if validate:
+        errors = vin.validate()
+        if errors:
+            return None, "; ".join(errors)
+    return vin, None
+
+
+def _iter_batches(
+    records: Iterator[Tuple[str, Optional[str]]],
+    batch_size: int,
+    deduplicate: bool,
+    validate: bool,
+    max_rejects: int = MAX_BATCH_REJECTS,
+) -> Iterator[_Batch]:
+    seen = set()
+    batch = _Batch()
+    for vin_str, model_year in records:
+        vin, reason = _parse_record(vin_str, model_year, validate)
+        if reason is not None:
+            batch.rejects.append((vin_str, reason))
+            # a long run of bad lines is written out on its own rather than
+            # held until enough valid VINs arrive
+            if len(batch.rejects) == max_rejects:
+                yield batch
+                batch = _Batch()
+            continue
+
+        if deduplicate:
+            key = str(vin)
+            if key in seen:
+                batch.duplicates += 1
+                continue
+            seen.add(key)
+
+        batch.vins.append(vin)
+        if len(batch.vins) == batch_size:
+            yield batch
+            batch = _Batch()
+
+    if batch.vins or batch.rejects or batch.duplicates:
+        yield batch
+
+
+def _load_checkpoint(
+    checkpoint_path: str, input_path: str, settings: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    if checkpoint_path is None or not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    if checkpoint["input"] != os.path.abspath(input_path):
+        raise ValueError(
+            f"Checkpoint '{checkpoint_path}' belongs to '{checkpoint['input']}'"
+        )
+    # batches are counted, not named, so resuming with settings that split
+    # the input differently would skip the wrong records
+    changed = [
+        name
+        for name, value in checkpoint.get("settings", {}).items()
+        if settings.get(name) != value
+    ]
+    if changed:
+        raise ValueError(
+            f"Checkpoint '{checkpoint_path}' was written with different "
+            f"{', '.join(changed)}"
+        )
+    return checkpoint
+
+
+def _save_checkpoint(checkpoint_path: str, checkpoint: Dict[str, Any]) -> None:
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+
+def decode_file(
+    input_path: str,
+    output_path: str,
+    output_format: str = None,
+    checkpoint_path: str = None,
+    rejects_path: str = None,
+    client: Client = None,
+    batch_size: int = BATCH_VIN_LIMIT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    raw: bool = True,
+    fields: Sequence[str] = None,
+    deduplicate: bool = True,
+    validate: bool = True,
+    on_error: str = "raise",
+    checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    vin_column: str = "vin",
+    model_year_column: str = "model_year",
+) -> PipelineStats:
+
+    if not isinstance(input_path, str) or not isinstance(output_path, str):
+        raise TypeError("'input_path' and 'output_path' must be strs")
+    if on_error not in ("raise", "skip"):
+        raise ValueError("'on_error' must be 'raise' or 'skip'")
+    if not isinstance(checkpoint_every, int) or not isinstance(max_workers, int):
+        raise TypeError("'checkpoint_every' and 'max_workers' must be ints")
+    if checkpoint_every < 1 or max_workers < 1:
+        raise ValueError("'checkpoint_every' and 'max_workers' must be positive")
+    if not 0 < batch_size <= BATCH_VIN_LIMIT:
+        raise ValueError(f"'batch_size' must be between 1 and {BATCH_VIN_LIMIT}")
+
+    client = resolve_client(client)
+
+    settings = {
+        "batch_size": batch_size,
+        "deduplicate": deduplicate,
+        "validate": validate,
+        "vin_column": vin_column,
+        "model_year_column": model_year_column,
+    }
+    checkpoint = _load_checkpoint(checkpoint_path, input_path, settings)
+    if checkpoint is not None and checkpoint.get("complete"):
+        return PipelineStats(checkpoint["stats"])
+
+    stats = PipelineStats(None if checkpoint is None else checkpoint["stats"])
+    batches_done = 0 if checkpoint is None else checkpoint["batches"]
+
+    writer = open_row_writer(
+        output_path, output_format, None if checkpoint is None else checkpoint["output"]
+    )
+    rejects_writer = None
+    if rejects_path is not None:
+        rejects_writer = open_row_writer(
+            rejects_path, "csv", None if checkpoint is None else checkpoint["rejects"]
+        )
+
+    def decode(batch: _Batch) -> Tuple[List[Vehicle], List[Tuple[str, str]]]:
+        if not batch.vins:
+            return [], []
+        try:
+            return list(decode_vins(batch.vins, client=client, max_workers=1)), []
+        except BatchVinDecodeError as e:
+            if on_error == "raise":
+                raise
+            failed = [(str(vin), str(error)) for b, error in e.errors for vin in b]
+            return list(e.results), failed
+
+    def write(batch: _Batch, vehicles: List[Vehicle], failed: List[Tuple[str, str]]):
+        writer.write_results(vehicles, raw, fields)
+        if rejects_writer is not None:
+            rejects_writer.write_rows(
+                [
+                    {"vin": vin, "reason": reason}
+                    for vin, reason in batch.rejects + failed
+                ]
+            )
+        stats.read += len(batch.vins) + len(batch.rejects) + batch.duplicates
+        stats.invalid += len(batch.rejects)
+        stats.duplicates += batch.duplicates
+        stats.decoded += len(vehicles)
+        stats.failed += len(failed)
+        stats.batches += 1
+
+    def commit(complete: bool = False) -> None:
+        output_state = writer.commit()
+        rejects_state = None if rejects_writer is None else rejects_writer.commit()
+        if checkpoint_path is not None:
+            _save_checkpoint(
+                checkpoint_path,
+                {
+                    "input": os.path.abspath(input_path),
+                    "settings": settings,
+                    "batches": stats.batches,
+                    "stats": stats.to_dict(),
+                    "output": output_state,
+                    "rejects": rejects_state,
+                    "complete": complete,
+                },
+            )
+
+    records = read_vins(input_path, vin_column, model_year_column)
+    pending = deque()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            try:
+                for index, batch in enumerate(
+                    _iter_batches(records, batch_size, deduplicate, validate)
+                ):
+                    # batches before the checkpoint were written by an earlier run
+                    if index < batches_done:
+                        continue
+                    pending.append((batch, pool.submit(decode, batch)))
+                    # bounding the batches in flight keeps memory flat
+                    while len(pending) > max_workers * 2:
+                        batch, future = pending.popleft()
+                        write(batch, *future.result())
+                        if stats.batches % checkpoint_every == 0:
+                            commit()
+                while pending:
+                    batch, future = pending.popleft()
+                    write(batch, *future.result())
+                    if stats.batches % checkpoint_every == 0:
+                        commit()
+            except BaseException:
+                # leaving the with block waits for the pool, which would
+                # still send every queued batch
+                for _, future in pending:
+                    future.cancel()
+                raise
+        commit(complete=True)
+    finally:
+        writer.close()
+        if rejects_writer is not None:
+            rejects_writer.close()
+
+    return stats
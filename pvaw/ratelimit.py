@@ -0,0 +1,230 @@
+from __future__ import annotations
+from typing import Iterable, Optional, Tuple
+from email.utils import parsedate_to_datetime
+import os
+import random
+import sqlite3
+import threading
+import time
+from pvaw.constants import (
+    DEFAULT_RETRIES,
+    DEFAULT_BACKOFF,
+    DEFAULT_MAX_BACKOFF,
+    RETRY_STATUSES,
+)
+
+
+def _take(
+    tokens: float, updated: float, rate: float, burst: float, now: float, count: float
+) -> Tuple[float, float]:
+    # callers reserve tokens even when the bucket is empty and wait off the
+    # debt, so waiting callers are served in the order they arrived
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate) - count
+    wait = -tokens / rate if tokens < 0 else 0.0
+    return tokens, wait
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: float = None,
+        min_rate: float = None,
+        increase: float = None,
+        decrease: float = 0.5,
+    ):
+        if not isinstance(rate, (int, float)):
+            raise TypeError("'rate' must be a number of requests per second")
+        if rate <= 0:
+            raise ValueError("'rate' must be positive")
+        if burst is not None and burst < 1:
+            raise ValueError("'burst' must be at least 1")
+        if not 0 < decrease < 1:
+            raise ValueError("'decrease' must be between 0 and 1")
+
+        self.max_rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.min_rate = float(min_rate if min_rate is not None else rate / 20)
+        self.increase = float(increase if increase is not None else rate / 100)
+        self.decrease = decrease
+
+        self._lock = threading.Lock()
+        self._rate = self.max_rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def reserve(self, tokens: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, wait = _take(
+                self._tokens, self._updated, self._rate, self.burst, now, tokens
+            )
+            self._updated = now
+        return wait
+
+    def acquire(self, tokens: float = 1) -> float:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    # additive increase, multiplicative decrease: the rate settles just under
+    # whatever the service currently tolerates
+    def throttled(self) -> None:
+        with self._lock:
+            self._rate = max(self.min_rate, self._rate * self.decrease)
+
+    def succeeded(self) -> None:
+        if self._rate < self.max_rate:
+            with self._lock:
+                self._rate = min(self.max_rate, self._rate + self.increase)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: float = None,
+        min_rate: float = None,
+        increase: float = None,
+        decrease: float = 0.5,
+        name: str = "default",
+        timeout: float = 30,
+    ):
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError("'path' must be a str or path")
+        super().__init__(rate, burst, min_rate, increase, decrease)
+
+        self.path = os.fspath(path)
+        self.name = name
+        self.timeout = timeout
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "name TEXT PRIMARY KEY, "
+            "tokens REAL NOT NULL, "
+            "updated REAL NOT NULL, "
+            "rate REAL NOT NULL)"
+        )
+        connection.execute(
+            "INSERT OR IGNORE INTO rate_limits VALUES (?, ?, ?, ?)",
+            (name, self.burst, time.time(), self.max_rate),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @property
+    def rate(self) -> float:
+        row = (
+            self._connection()
+            .execute("SELECT rate FROM rate_limits WHERE name = ?", (self.name,))
+            .fetchone()
+        )
+        return row[0]
+
+    def reserve(self, tokens: float = 1) -> float:
+        # BEGIN IMMEDIATE takes the write lock up front, so the read and the
+        # update are atomic across every process sharing the file
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            stored_tokens, updated, rate = connection.execute(
+                "SELECT tokens, updated, rate FROM rate_limits WHERE name = ?",
+                (self.name,),
+            ).fetchone()
+            now = time.time()
+            stored_tokens, wait = _take(
+                stored_tokens, updated, rate, self.burst, now, tokens
+            )
+            connection.execute(
+                "UPDATE rate_limits SET tokens = ?, updated = ? WHERE name = ?",
+                (stored_tokens, max(now, updated), self.name),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return wait
+
+    def throttled(self) -> None:
+        self._connection().execute(
+            "UPDATE rate_limits SET rate = MAX(?, rate * ?) WHERE name = ?",
+            (self.min_rate, self.decrease, self.name),
+        )
+
+    def succeeded(self) -> None:
+        self._connection().execute(
+            "UPDATE rate_limits SET rate = MIN(?, rate + ?) "
+            "WHERE name = ? AND rate < ?",
+            (self.max_rate, self.increase, self.name, self.max_rate),
+        )
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        statuses: Iterable[int] = RETRY_STATUSES,
+        max_retry_after: float = 120,
+    ):
+        if not isinstance(retries, int):
+            raise TypeError("'retries' must be an int")
+        if retries < 0:
+            raise ValueError("'retries' must not be negative")
+
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.max_retry_after = max_retry_after
+
+    def should_retry(self, attempt: int, status: int = None) -> bool:
+        if attempt >= self.retries:
+            return False
+        return status is None or status in self.statuses
+
+    # full jitter keeps workers that failed together from retrying together
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None:
+            delay = max(delay, min(seconds, self.max_retry_after))
+        return delay
@@ -1,37 +1,145 @@
 from __future__ import annotations
-from typing import Dict, Any, List
-import pandas as pd
-import numpy as np
+from typing import (
+    Dict,
+    Any,
+    List,
+    Iterable,
+    Iterator,
+    Optional,
+    Callable,
+    Union,
+    TYPE_CHECKING,
+)
+import itertools
+import operator
+import sys
+import threading
+
+# pandas is only imported once a DataFrame is asked for, so importing pvaw
+# stays cheap for callers that never build one
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+def _is_blank(value: Any) -> bool:
+    return isinstance(value, str) and (not value or value.isspace())
+
+
+_blank_cells = None
+
+
+# one pass over every text cell at once, so small frames don't pay a fixed
+# cost per column
+def _blank_to_nan(df: pd.DataFrame) -> pd.DataFrame:
+    global _blank_cells
+    import numpy as np
+    import pandas as pd
+    from pandas.api.types import is_object_dtype, is_string_dtype
+
+    columns = [
+        column
+        for column, dtype in zip(df.columns, df.dtypes)
+        if is_object_dtype(dtype) or is_string_dtype(dtype)
+    ]
+    if not columns or df.empty:
+        return df
+    if _blank_cells is None:
+        _blank_cells = np.frompyfunc(_is_blank, 1, 1)
+
+    # frames built by _build_df are a single object block, which is read and
+    # rebuilt without a copy or any per-column type inference
+    whole = len(columns) == len(df.columns) and all(
+        is_object_dtype(dtype) for dtype in df.dtypes
+    )
+    values = (df if whole else df[columns]).to_numpy(dtype=object)
+    cells = values.ravel()
+    try:
+        # decoded fields repeat a lot, so each distinct value is checked once
+        codes, uniques = pd.factorize(cells)
+        blank = np.append(_blank_cells(uniques).astype(bool), False)[codes]
+    except TypeError:
+        # unhashable cells, like the lists in VehicleTypes
+        blank = _blank_cells(cells).astype(bool)
+    blank = blank.reshape(values.shape)
+    if not blank.any():
+        return df
+    values = np.where(blank, np.nan, values)
+    if whole:
+        return pd.DataFrame(values, index=df.index, columns=df.columns, dtype=object)
+    df[columns] = values
+    return df
+
+
+def intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def select_fields(
+    results_dict: Dict[str, Any], fields: Optional[Iterable[str]]
+) -> Dict[str, Any]:
+    if fields is None:
+        return results_dict
+    if isinstance(fields, str):
+        raise TypeError("'fields' must be an iterable of str field names")
+    return {
+        intern(field): results_dict[field] for field in fields if field in results_dict
+    }
+
+
+def _build_df(
+    results_list: List[Results], raw: bool, drop_na: bool, typed: bool = False
+) -> pd.DataFrame:
+    if raw:
+        records = [r.results_dict for r in results_list]
+    else:
+        records = [r.get_key_attributes() for r in results_list]
+    index = [r.identifier for r in results_list]
+
+    import pandas as pd
+
+    df = _blank_to_nan(pd.DataFrame(records, index=index, dtype=object))
+    if drop_na:
+        df = df.dropna(axis=1)
+    if typed:
+        from pvaw.schema import apply_schema
+
+        df = apply_schema(df)
+    return df
 
 
 class Results:
+    __slots__ = ("identifier", "results_dict")
+
     CLASS_NAME = "Results"
+    KEY_ATTRIBUTES = ()
 
-    def __init__(self, identifier: str, results_dict: Dict[str, Any]):
+    # fields=None keeps the whole raw dict, otherwise only the named fields are
+    # kept and an empty iterable keeps just the key attributes
+    def __init__(
+        self,
+        identifier: str,
+        results_dict: Dict[str, Any],
+        fields: Optional[Iterable[str]] = None,
+    ):
         self.identifier = identifier
-        self.results_dict = results_dict
+        self.results_dict = select_fields(results_dict, fields)
 
     def get_results(self) -> Dict[str, str]:
         return self.results_dict
 
-    def get_key_attributes(self):
-        d = self.__dict__.copy()
-        d.pop("identifier", None)
-        d.pop("results_dict", None)
-        return d
+    def get_key_attributes(self) -> Dict[str, Any]:
+        return {
+            attribute: getattr(self, attribute) for attribute in self.KEY_ATTRIBUTES
+        }
 
     def get_series(self, raw):
-        if raw:
-            d = self.results_dict
-        else:
-            d = self.get_key_attributes()
-        return pd.Series(d).replace(to_replace=r"^\s*$", value=np.nan, regex=True)
-
-    def get_df(self, raw: bool = False, drop_na: bool = True) -> pd.DataFrame:
-        df = pd.DataFrame({self.identifier: self.get_series(raw)})
-        if drop_na:
-            df.dropna(inplace=True)
-        return df.T
+        return _build_df([self], raw, drop_na=False).iloc[0]
+
+    def get_df(
+        self, raw: bool = False, drop_na: bool = True, typed: bool = False
+    ) -> pd.DataFrame:
+        return _build_df([self], raw, drop_na, typed)
 
     def __str__(self):
         d = self.get_key_attributes()
@@ -47,19 +155,82 @@ class ResultsList:
 
     def __init__(self, results_list: List[Results]):
         self.results_list = results_list
-        self.index = 0
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[Results]:
+        return iter(self.results_list)
+
+    # the index is rebuilt if results were appended to results_list after it
+    # was built; the first identifier wins when results repeat
+    def _get_index(self) -> Dict[Any, Results]:
+        index = self._index
+        if index is None or index[0] != len(self.results_list):
+            with self._index_lock:
+                index = self._index
+                if index is None or index[0] != len(self.results_list):
+                    results_list = list(self.results_list)
+                    lookup = {}
+                    for results in results_list:
+                        lookup.setdefault(results.identifier, results)
+                    index = (len(results_list), lookup)
+                    self._index = index
+        return index[1]
+
+    def get(self, identifier: Any, default: Any = None) -> Optional[Results]:
+        return self._get_index().get(identifier, default)
+
+    def __contains__(self, identifier: Any) -> bool:
+        return identifier in self._get_index()
+
+    def filter(
+        self, predicate: Callable[[Results], bool] = None, **attributes: Any
+    ) -> ResultsList:
+        results_list = self.results_list
+        if attributes:
+            results_list = [
+                r
+                for r in results_list
+                if all(getattr(r, a) == v for a, v in attributes.items())
+            ]
+        if predicate is not None:
+            results_list = [r for r in results_list if predicate(r)]
+        return ResultsList(list(results_list))
+
+    def group_by(
+        self, key: Union[str, Callable[[Results], Any]]
+    ) -> Dict[Any, ResultsList]:
+        if isinstance(key, str):
+            key = operator.attrgetter(key)
+        groups = {}
+        for results in self.results_list:
+            groups.setdefault(key(results), []).append(results)
+        return {k: ResultsList(group) for k, group in groups.items()}
+
+    @classmethod
+    def concat(cls, *results_lists: ResultsList) -> ResultsList:
+        return cls(
+            list(itertools.chain.from_iterable(r.results_list for r in results_lists))
+        )
+
+    @classmethod
+    def merge(cls, *results_lists: ResultsList) -> ResultsList:
+        merged = {}
+        for results_list in results_lists:
+            for results in results_list.results_list:
+                merged.setdefault(results.identifier, results)
+        return cls(list(merged.values()))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"results_list": self.results_list}
 
-    def __iter__(self) -> ResultsList:
-        return self
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__init__(state["results_list"])
 
-    def __next__(self) -> Results:
-        if self.index < len(self.results_list):
-            current = self.results_list[self.index]
-            self.index += 1
-            return current
-        else:
-            self.index = 0
-            raise StopIteration
+    def __add__(self, other: ResultsList) -> ResultsList:
+        if not isinstance(other, ResultsList):
+            return NotImplemented
+        return ResultsList.concat(self, other)
 
     def __len__(self):
         return len(self.results_list)
@@ -81,10 +252,37 @@ class ResultsList:
     def get_results(self) -> List[Dict[str, str]]:
         return [r.get_results() for r in self.results_list]
 
-    def get_df(self, raw: bool = False, drop_na: bool = True):
-        df = pd.DataFrame()
-        for rl in self.results_list:
-            df[rl.identifier] = rl.get_series(raw=raw)
-        if drop_na:
-            df.dropna(inplace=True)
-        return df.T
+    def get_df(
+        self, raw: bool = False, drop_na: bool = True, typed: bool = False
+    ) -> pd.DataFrame:
+        return _build_df(self.results_list, raw, drop_na, typed)
+
+    # raw fields by default, as a data lake wants everything the API returned
+    def to_arrow(self, raw: bool = True, typed: bool = False) -> pa.Table:
+        from pvaw.arrow import to_record_batch
+        from pvaw.export import import_pyarrow
+
+        pa = import_pyarrow()
+        return pa.Table.from_batches([to_record_batch(self.results_list, raw, typed)])
+
+    def to_parquet(
+        self,
+        path: str,
+        raw: bool = True,
+        typed: bool = False,
+        compression: str = "snappy",
+    ) -> None:
+        self._write(path, "parquet", raw, typed, compression)
+
+    def to_feather(
+        self, path: str, raw: bool = True, typed: bool = False, compression: str = None
+    ) -> None:
+        self._write(path, "feather", raw, typed, compression)
+
+    def _write(
+        self, path: str, output_format: str, raw: bool, typed: bool, compression: str
+    ) -> None:
+        from pvaw.arrow import ArrowWriter
+
+        with ArrowWriter(path, output_format, raw, typed, compression) as writer:
+            writer.write(self.results_list)
@@ -0,0 +1,147 @@
+from typing import Callable, Dict
+import pandas as pd
+
+INTEGER = "Int64"
+FLOAT = "Float64"
+CATEGORY = "category"
+
+# one schema covers the raw fields and key attributes of every Results class,
+# fields that share a name across endpoints share a meaning
+SCHEMA: Dict[str, str] = {
+    # Vehicle
+    "ModelYear": INTEGER,
+    "MakeID": INTEGER,
+    "ManufacturerId": INTEGER,
+    "ModelID": INTEGER,
+    "Doors": INTEGER,
+    "Windows": INTEGER,
+    "Wheels": INTEGER,
+    "Axles": INTEGER,
+    "Seats": INTEGER,
+    "SeatRows": INTEGER,
+    "EngineCylinders": INTEGER,
+    "EngineCycles": INTEGER,
+    "TransmissionSpeeds": INTEGER,
+    "TopSpeedMPH": INTEGER,
+    "BatteryCells": INTEGER,
+    "BatteryModules": INTEGER,
+    "BatteryPacks": INTEGER,
+    "DisplacementCC": FLOAT,
+    "DisplacementCI": FLOAT,
+    "DisplacementL": FLOAT,
+    "EngineHP": FLOAT,
+    "EngineHP_to": FLOAT,
+    "EngineKW": FLOAT,
+    "CurbWeightLB": FLOAT,
+    "BedLengthIN": FLOAT,
+    "WheelBaseShort": FLOAT,
+    "WheelBaseLong": FLOAT,
+    "WheelSizeFront": FLOAT,
+    "WheelSizeRear": FLOAT,
+    "TrackWidth": FLOAT,
+    "BusLength": FLOAT,
+    "TrailerLength": FLOAT,
+    "BasePrice": FLOAT,
+    "BatteryA": FLOAT,
+    "BatteryA_to": FLOAT,
+    "BatteryKWh": FLOAT,
+    "BatteryKWh_to": FLOAT,
+    "BatteryV": FLOAT,
+    "BatteryV_to": FLOAT,
+    "ChargerPowerKW": FLOAT,
+    "Make": CATEGORY,
+    "Manufacturer": CATEGORY,
+    "Model": CATEGORY,
+    "Series": CATEGORY,
+    "Trim": CATEGORY,
+    "VehicleType": CATEGORY,
+    "BodyClass": CATEGORY,
+    "BodyCabType": CATEGORY,
+    "DriveType": CATEGORY,
+    "FuelTypePrimary": CATEGORY,
+    "FuelTypeSecondary": CATEGORY,
+    "ElectrificationLevel": CATEGORY,
+    "EngineConfiguration": CATEGORY,
+    "TransmissionStyle": CATEGORY,
+    "GVWR": CATEGORY,
+    "PlantCity": CATEGORY,
+    "PlantCountry": CATEGORY,
+    "PlantState": CATEGORY,
+    "ErrorCode": CATEGORY,
+    "ErrorText": CATEGORY,
+    # Make
+    "Make_ID": INTEGER,
+    "MakeId": INTEGER,
+    "MfrId": INTEGER,
+    "VehicleTypeId": INTEGER,
+    "Make_Name": CATEGORY,
+    "MakeName": CATEGORY,
+    "Mfr_Name": CATEGORY,
+    "MfrName": CATEGORY,
+    "VehicleTypeName": CATEGORY,
+    # WMIInfo
+    "Id": INTEGER,
+    "Name": CATEGORY,
+    "ManufacturerName": CATEGORY,
+    "CommonName": CATEGORY,
+    "ParentCompanyName": CATEGORY,
+    "Country": CATEGORY,
+    # Manufacturer
+    "Mfr_ID": INTEGER,
+    "Mfr_CommonName": CATEGORY,
+    "StateProvince": CATEGORY,
+    "City": CATEGORY,
+    # key attributes
+    "model_year": INTEGER,
+    "make_id": INTEGER,
+    "id": INTEGER,
+    "make": CATEGORY,
+    "make_name": CATEGORY,
+    "manufacturer": CATEGORY,
+    "model": CATEGORY,
+    "vehicle_type": CATEGORY,
+    "common_name": CATEGORY,
+}
+
+
+# strings that count as numbers, both here and in the typed columns of
+# pvaw.arrow, the rest (e.g. "None" or "inf") become missing
+NUMBER_PATTERN = r"\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*"
+
+
+# INTEGER columns holding a fraction fall back to FLOAT rather than losing it
+def _to_number(values: pd.Series, dtype: str) -> pd.Series:
+    text = values.astype("string").str.strip()
+    numeric = text.str.fullmatch(NUMBER_PATTERN).fillna(False).astype(bool)
+    numbers = pd.to_numeric(text.where(numeric), errors="coerce").astype(FLOAT)
+    if dtype == INTEGER:
+        integral = numbers.isna() | (numbers == numbers.round())
+        if integral.all():
+            return numbers.astype(INTEGER)
+    return numbers
+
+
+def _to_category(values: pd.Series, dtype: str) -> pd.Series:
+    return values.astype(CATEGORY)
+
+
+# how each dtype of the schema is converted, pvaw.arrow keeps the Arrow
+# counterpart of this table
+CONVERTERS: Dict[str, Callable[[pd.Series, str], pd.Series]] = {
+    INTEGER: _to_number,
+    FLOAT: _to_number,
+    CATEGORY: _to_category,
+}
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str] = None) -> pd.DataFrame:
+    if schema is None:
+        schema = SCHEMA
+    columns = {}
+    for column in df.columns:
+        dtype = schema.get(column)
+        values = df[column]
+        if dtype in CONVERTERS:
+            values = CONVERTERS[dtype](values, dtype)
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import copy
+import threading
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self, done: Any = None):
+        self.done = done
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+# every caller that shared a flight gets its own copy of the response, since
+# callers such as decode_wmi modify the dicts they are handed
+def _share(flight: _Flight) -> Any:
+    if flight.waiters:
+        return copy.deepcopy(flight.result)
+    return flight.result
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight(threading.Event())
+                self._flights[key] = flight
+                self.calls += 1
+                leader = True
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if leader:
+            try:
+                flight.result = fn()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                # removed before the waiters are released, so nobody can join
+                # a flight whose result has already been handed out
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return _share(flight)
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+
+            async def run() -> Any:
+                try:
+                    return await fn()
+                finally:
+                    self._flights.pop(key, None)
+
+            # the request runs in its own task so a cancelled caller doesn't
+            # cancel it for everyone else waiting on it
+            flight.done = asyncio.ensure_future(run())
+            self._flights[key] = flight
+            self.calls += 1
+        else:
+            flight.waiters += 1
+            self.coalesced += 1
+
+        flight.result = await asyncio.shield(flight.done)
+        return _share(flight)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+from typing import Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+VIN_LENGTH = 17
+
+VIN_ALPHABET = "0123456789ABCDEFGHJKLMNPRSTUVWXYZ"
+
+TRANSLITERATION = {
+    **{str(d): d for d in range(10)},
+    **dict(zip("ABCDEFGH", range(1, 9))),
+    **dict(zip("JKLMN", range(1, 6))),
+    "P": 7,
+    "R": 9,
+    **dict(zip("STUVWXYZ", range(2, 10))),
+}
+
+WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# the check digit is only mandatory for VINs assigned in North America
+CHECK_DIGIT_REGIONS = "12345"
+
+# position 10 cycles through these codes every 30 years starting in 1980
+MODEL_YEAR_CODES = "ABCDEFGHJKLMNPRSTVWXY123456789"
+
+EARLIEST_CODED_YEAR = 1980
+
+
+def compute_check_digit(full_vin: str) -> str:
+    total = sum(TRANSLITERATION[c] * w for c, w in zip(full_vin.upper(), WEIGHTS))
+    remainder = total % 11
+    return "X" if remainder == 10 else str(remainder)
+
+
+def vin_errors(full_or_partial_vin: str, check_digit: bool = True) -> List[str]:
+    if not isinstance(full_or_partial_vin, str):
+        raise TypeError("'full_or_partial_vin' must be a str")
+
+    vin = full_or_partial_vin.upper()
+    errors = []
+    if not vin:
+        errors.append("empty")
+    if len(vin) > VIN_LENGTH:
+        errors.append(f"longer than {VIN_LENGTH} characters")
+    invalid = sorted(set(c for c in vin if c not in VIN_ALPHABET and c != "*"))
+    if invalid:
+        errors.append(f"invalid characters {', '.join(repr(c) for c in invalid)}")
+
+    # partial VINs go to the API as wildcard searches, so only full VINs can
+    # be checked any further
+    if errors or len(vin) != VIN_LENGTH or "*" in vin:
+        return errors
+
+    if vin[9] not in MODEL_YEAR_CODES:
+        errors.append(f"invalid model year code '{vin[9]}'")
+    if check_digit and vin[0] in CHECK_DIGIT_REGIONS:
+        expected = compute_check_digit(vin)
+        if vin[8] != expected:
+            errors.append(f"check digit is '{vin[8]}' but should be '{expected}'")
+    return errors
+
+
+def is_valid_vin(full_or_partial_vin: str, check_digit: bool = True) -> bool:
+    return not vin_errors(full_or_partial_vin, check_digit)
+
+
+def infer_model_year(full_vin: str) -> Optional[int]:
+    if not isinstance(full_vin, str):
+        raise TypeError("'full_vin' must be a str")
+    vin = full_vin.upper()
+    if len(vin) != VIN_LENGTH or vin[9] not in MODEL_YEAR_CODES:
+        return None
+    year = EARLIEST_CODED_YEAR + MODEL_YEAR_CODES.index(vin[9])
+    # light vehicles built for North America use a letter in position 7 from
+    # 2010 on, when the position 10 codes started repeating
+    if vin[6].isalpha():
+        year += 30
+    return year
+
+
+def _vin_codes(vins: Iterable[str]) -> np.ndarray:
+    import numpy as np
+
+    if isinstance(vins, str):
+        raise TypeError("'vins' must be an iterable of str, not a str")
+    # numpy would take a generator for a single object
+    if not isinstance(vins, (np.ndarray, list, tuple)):
+        vins = list(vins)
+    try:
+        raw = np.asarray(vins, dtype=f"S{VIN_LENGTH + 1}")
+    except UnicodeEncodeError:
+        raw = np.asarray(
+            [v.encode("ascii", "replace") for v in vins], dtype=f"S{VIN_LENGTH + 1}"
+        )
+    codes = raw.reshape(-1).view(np.uint8).reshape(-1, VIN_LENGTH + 1)
+    lower = (codes >= ord("a")) & (codes <= ord("z"))
+    return np.where(lower, codes - 32, codes).astype(np.uint8)
+
+
+def _lookup_table(values: dict) -> np.ndarray:
+    import numpy as np
+
+    table = np.full(256, -1, dtype=np.int16)
+    for c, value in values.items():
+        table[ord(c)] = value
+    return table
+
+
+# the same rules as vin_errors: every VIN is checked for length and
+# characters, and only full VINs for the model year code and check digit
+def validate_vins(vins: Iterable[str], check_digit: bool = True) -> np.ndarray:
+    import numpy as np
+
+    codes = _vin_codes(vins)
+    present = codes != 0
+    full = codes[:, :VIN_LENGTH]
+    values = _lookup_table(TRANSLITERATION)[full]
+    wildcard = full == ord("*")
+
+    valid = present[:, 0] & ~present[:, VIN_LENGTH]
+    valid &= ((values >= 0) | wildcard | ~present[:, :VIN_LENGTH]).all(axis=1)
+
+    complete = present[:, VIN_LENGTH - 1] & ~wildcard.any(axis=1)
+    checked = np.isin(full[:, 9], np.frombuffer(MODEL_YEAR_CODES.encode(), np.uint8))
+    if check_digit:
+        remainder = (values.astype(np.int32) @ np.array(WEIGHTS)) % 11
+        expected = np.where(remainder == 10, ord("X"), ord("0") + remainder)
+        required = np.isin(
+            full[:, 0], np.frombuffer(CHECK_DIGIT_REGIONS.encode(), np.uint8)
+        )
+        checked &= ~required | (full[:, 8] == expected)
+    return valid & (~complete | checked)
+
+
+def infer_model_years(vins: Iterable[str]) -> np.ndarray:
+    import numpy as np
+
+    codes = _vin_codes(vins)
+    table = _lookup_table({c: i for i, c in enumerate(MODEL_YEAR_CODES)})
+    offsets = table[codes[:, 9]].astype(np.int32)
+    alpha = (codes[:, 6] >= ord("A")) & (codes[:, 6] <= ord("Z"))
+    years = EARLIEST_CODED_YEAR + offsets + np.where(alpha, 30, 0)
+    full_length = (codes[:, VIN_LENGTH - 1] != 0) & (codes[:, VIN_LENGTH] == 0)
+    return np.where((offsets >= 0) & full_length, years, 0)
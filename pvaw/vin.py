@@ -1,13 +1,26 @@
 from __future__ import annotations
-from typing import Dict, Union, List
-from pvaw.results import Results, ResultsList
+from typing import Any, Callable, Dict, Union, List, Tuple, Optional, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pvaw.results import Results, ResultsList, intern
 from pvaw.utils import get_int, check_model_year
-from pvaw.constants import VEHICLE_API_PATH
-import requests
+from pvaw.client import Client, resolve_client
+from pvaw.cache import vin_pattern
+from pvaw.validation import vin_errors, is_valid_vin
+from pvaw.constants import BATCH_VIN_LIMIT, DEFAULT_MAX_WORKERS
+
+BATCH_PATH = "DecodeVINValuesBatch/"
 
 
 class BatchVinDecodeError(Exception):
-    pass
+    def __init__(
+        self,
+        message: str,
+        results: ResultsList = None,
+        errors: List[Tuple[List[Vin], Exception]] = None,
+    ):
+        super().__init__(message)
+        self.results = results
+        self.errors = errors if errors is not None else []
 
 
 class Vin:
@@ -32,63 +45,302 @@ class Vin:
         else:
             return self.full_or_partial_vin
 
-    def decode(self) -> Vehicle:
+    def validate(self, check_digit: bool = True) -> List[str]:
+        return vin_errors(self.full_or_partial_vin, check_digit)
 
+    def is_valid(self, check_digit: bool = True) -> bool:
+        return is_valid_vin(self.full_or_partial_vin, check_digit)
+
+    def _decode_path(self) -> str:
         args = ["format=json"]
         if self.model_year is not None:
             args.append(f"modelyear={self.model_year}")
 
         args_str = "&".join(args)
 
-        path = (
-            f"{VEHICLE_API_PATH}DecodeVinValues/{self.full_or_partial_vin}?{args_str}"
+        return f"DecodeVinValues/{self.full_or_partial_vin}?{args_str}"
+
+    def decode(
+        self, client: Client = None, fields: Optional[Iterable[str]] = None
+    ) -> Vehicle:
+        client = resolve_client(client)
+
+        results_dict = _pattern_get(client, self)
+        if results_dict is not None:
+            return Vehicle(self, results_dict, fields)
+        if client.batcher is not None:
+            return _build_vehicle(client, self, client.batcher.decode(self), fields)
+
+        return client.get(
+            self._decode_path(),
+            build=lambda response: _build_vehicle(
+                client, self, response["Results"][0], fields
+            ),
         )
 
-        response = requests.get(path)
-        results_dict = response.json()["Results"][0]
 
-        return Vehicle(self, results_dict)
+def _pattern_get(client: Client, vin: Vin) -> Optional[Dict[str, str]]:
+    # a pattern hit ignores the check digit, so VINs with a wrong one have to
+    # go to the API to get their errors reported
+    if client.pattern_cache is None or not vin.is_valid():
+        return None
+    return client.pattern_cache.get(vin.full_or_partial_vin, vin.model_year)
+
+
+def _pattern_set(client: Client, vin: Vin, results_dict: Dict[str, str]) -> bool:
+    if client.pattern_cache is None or not vin.is_valid():
+        return False
+    return client.pattern_cache.set(
+        vin.full_or_partial_vin, vin.model_year, results_dict
+    )
+
+
+def _build_vehicle(
+    client: Client,
+    vin: Vin,
+    results_dict: Dict[str, str],
+    fields: Optional[Iterable[str]] = None,
+) -> Vehicle:
+    _pattern_set(client, vin, results_dict)
+    return Vehicle(vin, results_dict, fields)
+
+
+def _batch_post_fields(vin_batch: List[Vin]) -> Dict[str, str]:
+    vin_batch_str = ";".join(str(vin) for vin in vin_batch)
+    return {"format": "json", "data": vin_batch_str}
 
 
-def decode_vins(vin_list: List[Vin]) -> ResultsList:
+def _check_batch_results(vin_batch: List[Vin], results_list: List[Dict[str, str]]):
+    if len(results_list) != len(vin_batch):
+        raise BatchVinDecodeError("Incorrect number of results returned from API")
+
+
+def _batch_parse_fields(
+    client: Client, fields: Optional[Iterable[str]]
+) -> Optional[Tuple[str, ...]]:
+    # partial results can't be cached, so only a client without caches parses
+    # just the requested fields (plus those every Vehicle needs)
+    if fields is None or client.json_decoder is None:
+        return None
+    if client.cache is not None or client.pattern_cache is not None:
+        return None
+    if isinstance(fields, str):
+        raise TypeError("'fields' must be an iterable of str field names")
+    return (*Vehicle.SOURCE_FIELDS, *fields)
+
+
+def _decode_vin_batch(
+    vin_batch: List[Vin],
+    client: Client,
+    build: Callable[[List[Dict[str, str]]], Any] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> Any:
+    def check(response: Dict[str, Any]) -> Any:
+        results_list = response["Results"]
+        _check_batch_results(vin_batch, results_list)
+        return results_list if build is None else build(results_list)
+
+    try:
+        return client.post(
+            BATCH_PATH, _batch_post_fields(vin_batch), build=check, fields=fields
+        )
+    except BatchVinDecodeError:
+        raise
+    except Exception as e:
+        raise BatchVinDecodeError("Error in API request") from e
 
+
+def _check_decode_vins_args(
+    vin_list: List[Vin], batch_size: int, max_workers: int
+) -> None:
     if not isinstance(vin_list, list) or any(not isinstance(v, Vin) for v in vin_list):
         raise TypeError("'vin_list' must be list of Vin objects")
 
     if len(vin_list) == 0:
         raise ValueError("'vin_list' must have at least on Vin")
 
-    vin_batch_str = ";".join(str(vin) for vin in vin_list)
+    if not isinstance(batch_size, int) or not isinstance(max_workers, int):
+        raise TypeError("'batch_size' and 'max_workers' must be ints")
 
-    path = f"{VEHICLE_API_PATH}DecodeVINValuesBatch/"
+    if not 0 < batch_size <= BATCH_VIN_LIMIT:
+        raise ValueError(f"'batch_size' must be between 1 and {BATCH_VIN_LIMIT}")
 
-    post_fields = {"format": "json", "data": vin_batch_str}
+    if max_workers < 1:
+        raise ValueError("'max_workers' must be positive")
 
-    try:
-        response = requests.post(path, post_fields)
-        results_list = response.json()["Results"]
-    except Exception:
-        raise BatchVinDecodeError("Error in API request")
 
-    if len(results_list) != len(vin_list):
-        raise BatchVinDecodeError("Incorrect number of results returned from API")
+def _filter_invalid(vin_list: List[Vin], invalid: str) -> List[Vin]:
+    if invalid is None:
+        return vin_list
+    if invalid not in ("drop", "raise"):
+        raise ValueError("'invalid' must be None, 'drop' or 'raise'")
+
+    valid_vins = [vin for vin in vin_list if vin.is_valid()]
+    if invalid == "raise" and len(valid_vins) != len(vin_list):
+        first = next(vin for vin in vin_list if not vin.is_valid())
+        raise ValueError(
+            f"{len(vin_list) - len(valid_vins)} invalid VINs, "
+            f"'{first.full_or_partial_vin}': {'; '.join(first.validate())}"
+        )
+    return valid_vins
+
+
+def _unique_vins(vin_list: List[Vin]) -> List[Vin]:
+    return list({str(vin): vin for vin in vin_list}.values())
 
-    return ResultsList(
-        [Vehicle(vin_list[i], results_list[i]) for i in range(len(results_list))]
+
+def _split_batches(vin_list: List[Vin], batch_size: int) -> List[List[Vin]]:
+    return [vin_list[i : i + batch_size] for i in range(0, len(vin_list), batch_size)]
+
+
+def _assemble_results(
+    vin_list: List[Vin],
+    vehicles: Dict[str, Vehicle],
+    errors: List[Tuple[List[Vin], Exception]],
+    batch_count: int,
+) -> ResultsList:
+    results = ResultsList(
+        [vehicles[str(vin)] for vin in vin_list if str(vin) in vehicles]
+    )
+
+    if errors:
+        raise BatchVinDecodeError(
+            f"{len(errors)} of {batch_count} batches failed: {errors[0][1]}",
+            results=results,
+            errors=errors,
+        )
+
+    return results
+
+
+def _decode_batches(
+    vin_list: List[Vin],
+    client: Client,
+    batch_size: int,
+    max_workers: int,
+    vehicles: Dict[str, Vehicle],
+    errors: List[Tuple[List[Vin], Exception]],
+    fields: Optional[Iterable[str]] = None,
+) -> int:
+    batches = _split_batches(vin_list, batch_size)
+    parse_fields = _batch_parse_fields(client, fields)
+
+    def decode_batch(vin_batch: List[Vin]) -> None:
+        def build(results_list: List[Dict[str, str]]) -> List[Vehicle]:
+            return [
+                _build_vehicle(client, vin, results_dict, fields)
+                for vin, results_dict in zip(vin_batch, results_list)
+            ]
+
+        try:
+            results_list, batch_vehicles = _decode_vin_batch(
+                vin_batch, client, lambda r: (r, build(r)), parse_fields
+            )
+        except BatchVinDecodeError as e:
+            errors.append((vin_batch, e))
+            return
+        for vin, results_dict, vehicle in zip(vin_batch, results_list, batch_vehicles):
+            vehicles[str(vin)] = vehicle
+            client.cache_set(vin._decode_path(), {"Results": [results_dict]})
+
+    if len(batches) == 1:
+        decode_batch(batches[0])
+    elif len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+            list(pool.map(decode_batch, batches))
+
+    return len(batches)
+
+
+def decode_vins(
+    vin_list: List[Vin],
+    client: Client = None,
+    batch_size: int = BATCH_VIN_LIMIT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    invalid: str = None,
+    fields: Optional[Iterable[str]] = None,
+) -> ResultsList:
+
+    _check_decode_vins_args(vin_list, batch_size, max_workers)
+
+    client = resolve_client(client)
+
+    vehicles = {}
+    errors = []
+
+    # batches only carry the VINs the caches couldn't answer; each decoded VIN
+    # is stored under its single decode path so Vin.decode shares the entries
+    uncached_vins = []
+    for vin in _unique_vins(_filter_invalid(vin_list, invalid)):
+        results_dict = _pattern_get(client, vin)
+        if results_dict is None:
+            cached = client.cache_get(vin._decode_path())
+            if cached is not None:
+                results_dict = cached["Results"][0]
+                _pattern_set(client, vin, results_dict)
+        if results_dict is not None:
+            vehicles[str(vin)] = Vehicle(vin, results_dict, fields)
+        else:
+            uncached_vins.append(vin)
+
+    # with a pattern cache, only one VIN per pattern is sent at first and the
+    # others are answered from the pattern cache once it has been decoded
+    representatives = []
+    deferred_vins = []
+    seen_patterns = set()
+    for vin in uncached_vins:
+        pattern = None
+        if client.pattern_cache is not None:
+            pattern = vin_pattern(vin.full_or_partial_vin, vin.model_year)
+        if pattern is not None and pattern in seen_patterns:
+            deferred_vins.append(vin)
+        else:
+            seen_patterns.add(pattern)
+            representatives.append(vin)
+
+    batch_count = _decode_batches(
+        representatives, client, batch_size, max_workers, vehicles, errors, fields
     )
 
+    remaining_vins = []
+    for vin in deferred_vins:
+        results_dict = _pattern_get(client, vin)
+        if results_dict is not None:
+            vehicles[str(vin)] = Vehicle(vin, results_dict, fields)
+        else:
+            remaining_vins.append(vin)
+
+    batch_count += _decode_batches(
+        remaining_vins, client, batch_size, max_workers, vehicles, errors, fields
+    )
+
+    return _assemble_results(vin_list, vehicles, errors, batch_count)
+
 
 class Vehicle(Results):
+    KEY_ATTRIBUTES = (
+        "model_year",
+        "make",
+        "manufacturer",
+        "model",
+        "full_or_partial_vin",
+        "vehicle_type",
+    )
+    __slots__ = KEY_ATTRIBUTES
+    # the response fields the key attributes are read from
+    SOURCE_FIELDS = ("ModelYear", "Make", "Manufacturer", "Model", "VIN", "VehicleType")
+
     def __init__(
         self,
         vin: Vin,
         results_dict: Dict[str, str],
+        fields: Optional[Iterable[str]] = None,
     ):
-        super().__init__(str(vin), results_dict)
+        super().__init__(str(vin), results_dict, fields)
 
         self.model_year = get_int(results_dict["ModelYear"])
-        self.make = results_dict["Make"]
-        self.manufacturer = results_dict["Manufacturer"]
-        self.model = results_dict["Model"]
+        self.make = intern(results_dict["Make"])
+        self.manufacturer = intern(results_dict["Manufacturer"])
+        self.model = intern(results_dict["Model"])
         self.full_or_partial_vin = results_dict["VIN"]
-        self.vehicle_type = results_dict["VehicleType"]
+        self.vehicle_type = intern(results_dict["VehicleType"])
@@ -1,21 +1,32 @@
-import requests
-from typing import Dict, List
-from pvaw.results import Results, ResultsList
-from pvaw.constants import VEHICLE_API_PATH
+from __future__ import annotations
+from typing import Any, Dict, List, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import json
+import os
+from pvaw.results import Results, ResultsList, intern
+from pvaw.client import Client, resolve_client
+from pvaw.constants import DEFAULT_MAX_WORKERS
+from pvaw.manufacturer import iter_manufacturers
 
 
 class WMIInfo(Results):
-    def __init__(self, results_dict: Dict[str, str]) -> None:
-        super().__init__(results_dict["WMI"], results_dict)
+    KEY_ATTRIBUTES = ("wmi", "vehicle_type", "manufacturer")
+    __slots__ = KEY_ATTRIBUTES
+
+    def __init__(
+        self, results_dict: Dict[str, str], fields: Optional[Iterable[str]] = None
+    ) -> None:
+        super().__init__(results_dict["WMI"], results_dict, fields)
         self.wmi = results_dict["WMI"]
-        self.vehicle_type = results_dict["VehicleType"]
+        self.vehicle_type = intern(results_dict["VehicleType"])
         if "ManufacturerName" in results_dict.keys():
-            self.manufacturer = results_dict["ManufacturerName"]
+            self.manufacturer = intern(results_dict["ManufacturerName"])
         else:
-            self.manufacturer = results_dict["Name"]
+            self.manufacturer = intern(results_dict["Name"])
 
 
-def decode_wmi(wmi: str) -> WMIInfo:
+def _decode_wmi_path(wmi: str) -> str:
     if not isinstance(wmi, str):
         raise TypeError("'wmi' must be a str")
     if not len(wmi) in (3, 6):
@@ -24,18 +35,133 @@ def decode_wmi(wmi: str) -> WMIInfo:
             "or length 6 representing VIN positions 1-3 & 12-14."
         )
 
-    path = f"{VEHICLE_API_PATH}DecodeWMI/{wmi}?format=json"
-    response = requests.get(path)
-    results_dict = response.json()["Results"][0]
+    return f"DecodeWMI/{wmi}?format=json"
+
+
+def _build_wmi_info(wmi: str, response: Dict[str, Any]) -> WMIInfo:
+    results_dict = response["Results"][0]
     results_dict["WMI"] = wmi
     return WMIInfo(results_dict)
 
 
-def get_wmis(manufacturer_search: str) -> List[WMIInfo]:
+def decode_wmi(wmi: str, client: Client = None) -> WMIInfo:
+    path = _decode_wmi_path(wmi)
+
+    client = resolve_client(client)
+
+    if client.wmi_index is not None:
+        wmi_info = client.wmi_index.lookup(wmi)
+        if wmi_info is not None:
+            return wmi_info
+
+    return client.get(path, build=lambda response: _build_wmi_info(wmi, response))
+
+
+def _build_wmis(response: Dict[str, Any]) -> ResultsList:
+    return ResultsList([WMIInfo(result) for result in response["Results"]])
+
+
+def _get_wmis_path(manufacturer_search: str) -> str:
     if not isinstance(manufacturer_search, str):
         raise TypeError("'make_search' must be a str")
 
-    path = f"{VEHICLE_API_PATH}GetWMIsForManufacturer/{manufacturer_search}?format=json"
-    response = requests.get(path)
-    results = response.json()["Results"]
-    return ResultsList([WMIInfo(result) for result in results])
+    return f"GetWMIsForManufacturer/{manufacturer_search}?format=json"
+
+
+def get_wmis(manufacturer_search: str, client: Client = None) -> List[WMIInfo]:
+    path = _get_wmis_path(manufacturer_search)
+
+    client = resolve_client(client)
+
+    return client.get(path, build=_build_wmis)
+
+
+class WMIIndex:
+    # only what lookup puts into a WMIInfo is kept, fields of files saved
+    # with more are ignored on load
+    FIELDS = ("WMI", "Name", "VehicleType")
+
+    # the keys of a DecodeWMI result, so a WMIInfo has the same shape whether
+    # it came from the index or the network; GetWMIsForManufacturer has no
+    # values for the ones left blank
+    DECODE_WMI_FIELDS = (
+        "CommonName",
+        "CreatedOn",
+        "DateAvailableToPublic",
+        "Make",
+        "ManufacturerName",
+        "ParentCompanyName",
+        "URL",
+        "UpdatedOn",
+        "VehicleType",
+    )
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self._entries = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, results_dict: Dict[str, Any]) -> None:
+        wmi = results_dict["WMI"].upper()
+        self._entries[wmi] = tuple(results_dict.get(f) for f in self.FIELDS)
+
+    def lookup(self, wmi: str) -> Optional[WMIInfo]:
+        values = self._entries.get(wmi.upper())
+        if values is None:
+            return None
+        entry = dict(zip(self.FIELDS, values))
+        results_dict = dict.fromkeys(self.DECODE_WMI_FIELDS, "")
+        results_dict["ManufacturerName"] = entry["Name"]
+        results_dict["VehicleType"] = entry["VehicleType"]
+        results_dict["WMI"] = wmi
+        return WMIInfo(results_dict)
+
+    def lookup_vin(self, full_vin: str) -> Optional[WMIInfo]:
+        # manufacturers building fewer than 1000 vehicles a year share a
+        # 3 character WMI ending in 9 and are told apart by positions 12-14
+        if len(full_vin) == 17 and full_vin[2] == "9":
+            wmi_info = self.lookup(f"{full_vin[:3]}{full_vin[11:14]}")
+            if wmi_info is not None:
+                return wmi_info
+        return self.lookup(full_vin[:3])
+
+    @classmethod
+    def build(
+        cls,
+        m_type: str = None,
+        client: Client = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> WMIIndex:
+        client = resolve_client(client)
+
+        manufacturer_ids = [m.id for m in iter_manufacturers(m_type, client=client)]
+
+        def fetch(manufacturer_id: int) -> List[Dict[str, Any]]:
+            path = _get_wmis_path(str(manufacturer_id))
+            return client.get(path)["Results"]
+
+        index = cls()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for results in pool.map(fetch, manufacturer_ids):
+                for results_dict in results:
+                    index.add(results_dict)
+        return index
+
+    def save(self, path: str) -> None:
+        rows = [list(values) for values in self._entries.values()]
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"fields": self.FIELDS, "rows": rows}, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> WMIIndex:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No WMI index at '{path}'")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(dict(zip(data["fields"], row)) for row in data["rows"])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, wmi: str) -> bool:
+        return wmi.upper() in self._entries
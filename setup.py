@@ -13,6 +13,7 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/michaelmicheal/PythonVehicleAPIWrapper",
     install_requires=["pandas", "requests"],
+    extras_require={"async": ["aiohttp"], "arrow": ["pyarrow"], "fast": ["orjson"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
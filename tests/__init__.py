@@ -0,0 +1,38 @@
+from typing import Any, Callable, Dict, Optional
+from unittest import mock
+
+
+def decoded_result(
+    vin: str, model_year: Optional[str] = None, **fields: Any
+) -> Dict[str, Any]:
+    results_dict = {
+        "VIN": vin,
+        "Make": "HONDA",
+        "Manufacturer": "HONDA",
+        "Model": "Accord",
+        "ModelYear": model_year or "2003",
+        "VehicleType": "PASSENGER CAR",
+        "ErrorCode": "0",
+    }
+    results_dict.update(fields)
+    return results_dict
+
+
+# a stand-in for Session.post answering DecodeVINValuesBatch requests with one
+# result per VIN sent, built by result(vin, model_year)
+def make_batch_response(
+    result: Callable[[str, Optional[str]], Dict[str, Any]] = decoded_result,
+) -> Callable[..., mock.Mock]:
+    def batch_response(path, post_fields, timeout=None):
+        results = []
+        for vin_str in post_fields["data"].split(";"):
+            vin, _, model_year = vin_str.partition(",")
+            results.append(result(vin, model_year or None))
+        response = mock.Mock()
+        response.json.return_value = {"Results": results}
+        return response
+
+    return batch_response
+
+
+batch_response = make_batch_response()
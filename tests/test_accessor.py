@@ -0,0 +1,152 @@
+import unittest
+from unittest import mock
+import pandas as pd
+import requests
+from pvaw.client import Client
+from pvaw.validation import compute_check_digit, is_valid_vin
+import pvaw.accessor  # noqa: F401
+from tests import decoded_result, make_batch_response
+
+batch_response = make_batch_response(
+    lambda vin, model_year: decoded_result(
+        vin,
+        model_year,
+        Make="TESLA" if vin.startswith("5YJ") else "HONDA",
+        Manufacturer="",
+        Model=vin[-3:],
+        DisplacementL="2.4",
+    )
+)
+
+
+class TestAccessor(unittest.TestCase):
+    def setUp(self):
+        self.client = Client()
+        vins = [f"1HGCM82603{i:07d}" for i in range(20)]
+        self.vins = [vin[:8] + compute_check_digit(vin) + vin[9:] for vin in vins]
+
+    def sent_vins(self, mock_post):
+        return [
+            vin_str
+            for c in mock_post.call_args_list
+            for vin_str in c[0][1]["data"].split(";")
+        ]
+
+    @mock.patch("requests.Session.post")
+    def test_decode_unique(self, mock_post):
+        mock_post.side_effect = batch_response
+        vins = [self.vins[i % 20] for i in range(1000)]
+        # case and whitespace don't make a VIN distinct
+        vins[1] = f" {vins[1].lower()} "
+        vins[2] = None
+        df = pd.DataFrame({"vin": vins, "price": range(1000)}, index=range(5, 1005))
+
+        decoded = df.pvaw.decode(client=self.client, batch_size=10)
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(sorted(self.sent_vins(mock_post)), sorted(self.vins))
+        self.assertEqual(
+            list(decoded.columns),
+            [
+                "vin",
+                "price",
+                "model_year",
+                "make",
+                "manufacturer",
+                "model",
+                "vehicle_type",
+            ],
+        )
+        self.assertEqual(list(decoded.index), list(df.index))
+        self.assertEqual(decoded.loc[26, "model"], self.vins[1][-3:])
+        self.assertEqual(decoded.loc[6, "model"], self.vins[1][-3:])
+        self.assertTrue(decoded.loc[7, ["make", "model"]].isna().all())
+        self.assertEqual(decoded["make"].eq("HONDA").sum(), 999)
+        self.assertTrue(decoded["manufacturer"].isna().all())
+
+    @mock.patch("requests.Session.post")
+    def test_decode_model_years_and_fields(self, mock_post):
+        mock_post.side_effect = batch_response
+        df = pd.DataFrame(
+            {
+                "vin": [self.vins[0], self.vins[0], self.vins[0], "5YJSA3DS*EF"],
+                "year": [2011, "2011", None, 2014.0],
+            }
+        )
+
+        decoded = df.pvaw.decode(
+            model_year_column="year",
+            fields=["ModelYear", "DisplacementL"],
+            prefix="vpic_",
+            typed=True,
+            client=self.client,
+        )
+
+        self.assertEqual(
+            sorted(self.sent_vins(mock_post)),
+            sorted([f"{self.vins[0]},2011", self.vins[0], "5YJSA3DS*EF,2014"]),
+        )
+        self.assertEqual(decoded["vpic_ModelYear"].tolist(), [2011, 2011, 2003, 2014])
+        self.assertEqual(str(decoded["vpic_ModelYear"].dtype), "Int64")
+        self.assertEqual(decoded["vpic_DisplacementL"].tolist(), [2.4] * 4)
+
+        series_decoded = df["vin"].pvaw.decode(df["year"], client=self.client)
+        self.assertEqual(
+            series_decoded["model_year"].tolist(), [2011, 2011, 2003, 2014]
+        )
+
+        with self.assertRaises(KeyError):
+            df.pvaw.decode(vin_column="VIN", client=self.client)
+        with self.assertRaises(TypeError):
+            df.pvaw.decode(fields="Make", client=self.client)
+
+    @mock.patch("requests.Session.post")
+    def test_decode_errors(self, mock_post):
+        def side_effect(path, post_fields, timeout=None):
+            if self.vins[0] in post_fields["data"]:
+                raise requests.ConnectionError()
+            return batch_response(path, post_fields, timeout)
+
+        mock_post.side_effect = side_effect
+        df = pd.DataFrame({"vin": self.vins + ["1HGCM8260", "X" * 18]})
+
+        with self.assertRaises(ValueError):
+            df.pvaw.decode(client=self.client, invalid="raise")
+        with mock.patch("time.sleep"):
+            decoded = df.pvaw.decode(
+                client=self.client, batch_size=10, invalid="drop", on_error="skip"
+            )
+        self.assertEqual(
+            decoded["make"].isna().tolist(), [True] * 10 + [False] * 11 + [True]
+        )
+        with self.assertRaises(ValueError):
+            df.pvaw.decode(client=self.client, on_error="ignore")
+
+    @mock.patch("requests.Session.post")
+    def test_decode_malformed(self, mock_post):
+        mock_post.side_effect = batch_response
+        df = pd.DataFrame({"vin": [self.vins[0], "X" * 18, self.vins[1]]})
+
+        # the malformed cell gets NaN rather than failing the whole decode
+        decoded = df.pvaw.decode(client=self.client)
+        self.assertEqual(decoded["make"].isna().tolist(), [False, True, False])
+        self.assertEqual(self.sent_vins(mock_post), self.vins[:2])
+        with self.assertRaises(ValueError):
+            df.pvaw.decode(client=self.client, invalid="raise")
+
+    def test_is_valid(self):
+        df = pd.DataFrame(
+            {"vin": [self.vins[0], self.vins[0].lower(), "1HGCM82603A004352", None]}
+        )
+        self.assertEqual(df.pvaw.is_valid().tolist(), [True, True, False, False])
+        self.assertEqual(
+            df.pvaw.is_valid(check_digit=False).tolist(), [True, True, True, False]
+        )
+        partial = pd.Series(["5UXWX7C5*BA", "5UXWX7C5*BI", ""])
+        self.assertEqual(
+            partial.pvaw.is_valid().tolist(), [is_valid_vin(v) for v in partial]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+import unittest
+import asyncio
+import gc
+import weakref
+from unittest import mock
+import json
+from pvaw.vin import Vin, Vehicle, BatchVinDecodeError
+from pvaw.wmi import WMIInfo
+from pvaw.make import Make
+from pvaw.manufacturer import Manufacturer
+from pvaw.ratelimit import RateLimiter, RetryPolicy
+
+try:
+    import aiohttp
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from pvaw import aio
+except ImportError:
+    aiohttp = None
+
+
+def load_response(name):
+    with open(f"tests/responses/{name}") as f:
+        return json.load(f)
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAio(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = aio.AsyncClient(max_concurrency=2)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_exceptions(self):
+        with self.assertRaises(TypeError):
+            await aio.decode("5UXWX7C5*BA", client=self.client)
+        with self.assertRaises(TypeError):
+            await aio.decode(Vin("5UXWX7C5*BA"), client="client")
+        with self.assertRaises(ValueError):
+            await aio.decode_vins([], client=self.client)
+        with self.assertRaises(ValueError):
+            await aio.decode_wmi("1F", client=self.client)
+        with self.assertRaises(ValueError):
+            await aio.get_makes(model_year=1999, client=self.client)
+        with self.assertRaises(ValueError):
+            aio.AsyncClient(max_concurrency=0)
+
+    async def test_decode(self):
+        expected_response = load_response("decode_vin_response_with_year.json")
+
+        with mock.patch.object(
+            self.client, "get", mock.AsyncMock(return_value=expected_response)
+        ) as mock_get:
+            vehicle = await aio.decode(Vin("5UXWX7C5*BA", 2011), client=self.client)
+
+        mock_get.assert_awaited_once_with(
+            "DecodeVinValues/5UXWX7C5*BA?format=json&modelyear=2011"
+        )
+        self.assertTrue(isinstance(vehicle, Vehicle))
+        self.assertEqual(vehicle.make, "BMW")
+        self.assertEqual(vehicle.model_year, 2011)
+
+    async def test_decode_vins(self):
+        expected_response = load_response("decode_vin_batch_reponse.json")
+
+        with mock.patch.object(
+            self.client, "post", mock.AsyncMock(return_value=expected_response)
+        ) as mock_post:
+            vehicles = await aio.decode_vins(
+                [Vin("5UXWX7C5*BA", 2011), Vin("5YJSA3DS*EF")], client=self.client
+            )
+
+        mock_post.assert_awaited_once_with(
+            "DecodeVINValuesBatch/",
+            {"format": "json", "data": "5UXWX7C5*BA,2011;5YJSA3DS*EF"},
+        )
+        self.assertEqual([v.make for v in vehicles], ["BMW", "TESLA"])
+
+        with mock.patch.object(
+            self.client, "post", mock.AsyncMock(side_effect=ConnectionError())
+        ):
+            with self.assertRaises(BatchVinDecodeError) as cm:
+                await aio.decode_vins([Vin("5YJSA3DS*EF")], client=self.client)
+        self.assertEqual(len(cm.exception.results), 0)
+        self.assertEqual(len(cm.exception.errors), 1)
+
+    async def test_decode_wmi_and_get_wmis(self):
+        with mock.patch.object(
+            self.client,
+            "get",
+            mock.AsyncMock(
+                return_value=load_response("decode_3_digit_wmi_response.json")
+            ),
+        ):
+            wmi_info = await aio.decode_wmi("1FD", client=self.client)
+        self.assertTrue(isinstance(wmi_info, WMIInfo))
+        self.assertEqual(wmi_info.manufacturer, "FORD MOTOR COMPANY, USA")
+
+        with mock.patch.object(
+            self.client,
+            "get",
+            mock.AsyncMock(return_value=load_response("get_wmis_response.json")),
+        ):
+            wmis = await aio.get_wmis("honda", client=self.client)
+        self.assertTrue(all(isinstance(w, WMIInfo) for w in wmis))
+
+    async def test_makes_and_manufacturers(self):
+        with mock.patch.object(
+            self.client,
+            "get",
+            mock.AsyncMock(
+                return_value=load_response(
+                    "get_makes_for_manufacturer_name_response.json"
+                )
+            ),
+        ) as mock_get:
+            makes = await aio.get_makes("honda", client=self.client)
+        mock_get.assert_awaited_once_with("GetMakeForManufacturer/honda?format=json")
+        self.assertTrue(all(isinstance(m, Make) for m in makes))
+
+        with mock.patch.object(
+            self.client,
+            "get",
+            mock.AsyncMock(
+                return_value=load_response("get_manufacturers_response.json")
+            ),
+        ):
+            manufacturers = await aio.get_manufacturers(page=3, client=self.client)
+        self.assertTrue(all(isinstance(m, Manufacturer) for m in manufacturers))
+
+        with mock.patch.object(
+            self.client,
+            "get",
+            mock.AsyncMock(
+                return_value=load_response(
+                    "get_manufacturer_details_from_id_response.json"
+                )
+            ),
+        ):
+            details = await aio.get_manufacturer_details(987, client=self.client)
+        self.assertTrue(all(isinstance(m, Manufacturer) for m in details))
+
+    async def test_http_round_trip(self):
+        expected_response = load_response("decode_3_digit_wmi_response.json")
+
+        async def handler(request):
+            return web.json_response(expected_response)
+
+        app = web.Application()
+        app.router.add_get("/api/vehicles/DecodeWMI/1FD", handler)
+
+        async with TestServer(app) as server:
+            async with aio.AsyncClient(
+                base_url=str(server.make_url("/api/vehicles/"))
+            ) as client:
+                wmi_info = await aio.decode_wmi("1FD", client=client)
+
+        self.assertEqual(wmi_info.manufacturer, "FORD MOTOR COMPANY, USA")
+
+    async def test_retry(self):
+        expected_response = load_response("decode_3_digit_wmi_response.json")
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return web.json_response({}, status=429, headers={"Retry-After": "0"})
+            return web.json_response(expected_response)
+
+        app = web.Application()
+        app.router.add_get("/api/vehicles/DecodeWMI/1FD", handler)
+
+        limiter = RateLimiter(100)
+        async with TestServer(app) as server:
+            async with aio.AsyncClient(
+                base_url=str(server.make_url("/api/vehicles/")),
+                rate_limiter=limiter,
+                retry=RetryPolicy(backoff=0.01),
+            ) as client:
+                wmi_info = await aio.decode_wmi("1FD", client=client)
+
+                async with aio.AsyncClient(
+                    base_url=str(server.make_url("/api/vehicles/")),
+                    retry=RetryPolicy(retries=0),
+                ) as failing_client:
+                    calls.clear()
+                    with self.assertRaises(aiohttp.ClientResponseError):
+                        await aio.decode_wmi("1FD", client=failing_client)
+
+        self.assertEqual(wmi_info.manufacturer, "FORD MOTOR COMPANY, USA")
+        self.assertEqual(len(calls), 1)
+        self.assertLess(limiter.rate, 100)
+
+    async def test_coalesce(self):
+        expected_response = load_response("decode_3_digit_wmi_response.json")
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return web.json_response(expected_response)
+
+        app = web.Application()
+        app.router.add_get("/api/vehicles/DecodeWMI/{wmi}", handler)
+
+        async with TestServer(app) as server:
+            async with aio.AsyncClient(
+                base_url=str(server.make_url("/api/vehicles/"))
+            ) as client:
+                wmi_infos = await asyncio.gather(
+                    *(aio.decode_wmi(wmi, client=client) for wmi in ["1FD", "1fd"] * 3)
+                )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(client.single_flight.coalesced, 5)
+        self.assertEqual([w.wmi for w in wmi_infos], ["1FD", "1fd"] * 3)
+
+    async def test_micro_batching(self):
+        response = load_response("decode_vin_batch_reponse.json")
+        client = aio.AsyncClient(batch_window=0.01)
+        vins = [Vin("5UXWX7C5*BA", 2011), Vin("5YJSA3DS*EF"), Vin("5YJSA3DS*EF")]
+
+        with mock.patch.object(
+            client, "post", mock.AsyncMock(return_value=response)
+        ) as mock_post:
+            vehicles = await asyncio.gather(
+                *(aio.decode(vin, client=client) for vin in vins)
+            )
+        await client.close()
+
+        mock_post.assert_awaited_once_with(
+            "DecodeVINValuesBatch/",
+            {"format": "json", "data": "5UXWX7C5*BA,2011;5YJSA3DS*EF"},
+        )
+        self.assertEqual([v.make for v in vehicles], ["BMW", "TESLA", "TESLA"])
+        self.assertEqual((client.batcher.submitted, client.batcher.batches), (3, 1))
+
+    async def test_micro_batch_cancelled(self):
+        client = aio.AsyncClient(batch_window=0.01)
+
+        async def never_answer(path, data):
+            await asyncio.sleep(60)
+
+        with mock.patch.object(client, "post", never_answer):
+            decodes = [
+                asyncio.ensure_future(aio.decode(Vin(vin), client=client))
+                for vin in ("5UXWX7C5*BA", "5YJSA3DS*EF")
+            ]
+            await asyncio.sleep(0.05)
+            for task in list(client.batcher._tasks):
+                task.cancel()
+            results = await asyncio.wait_for(
+                asyncio.gather(*decodes, return_exceptions=True), 5
+            )
+        await client.close()
+
+        self.assertTrue(all(isinstance(r, asyncio.CancelledError) for r in results))
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestDefaultAsyncClient(unittest.TestCase):
+    def test_closed_at_shutdown(self):
+        expected_response = load_response("decode_3_digit_wmi_response.json")
+
+        async def handler(request):
+            return web.json_response(expected_response)
+
+        loops = []
+
+        async def main():
+            loops.append(asyncio.get_running_loop())
+            app = web.Application()
+            app.router.add_get("/api/vehicles/DecodeWMI/1FD", handler)
+            async with TestServer(app) as server:
+                client = aio.get_default_async_client()
+                self.assertTrue(client is aio.get_default_async_client())
+                client.base_url = str(server.make_url("/api/vehicles/"))
+                wmi_info = await aio.decode_wmi("1FD")
+            return client, wmi_info
+
+        client, wmi_info = asyncio.run(main())
+
+        self.assertEqual(wmi_info.manufacturer, "FORD MOTOR COMPANY, USA")
+        self.assertTrue(client._session.closed)
+        self.assertTrue(asyncio.run(main())[0] is not client)
+        asyncio.run(main())
+
+        # finished loops aren't kept alive by their default clients
+        self.assertFalse(any(loop in aio._default_clients for loop in loops))
+        loop_refs = [weakref.ref(loop) for loop in loops]
+        del loops[:], client
+        gc.collect()
+        self.assertTrue(all(ref() is None for ref in loop_refs))
+
+
+if __name__ == "__main__":
+    unittest.main()
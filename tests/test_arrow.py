@@ -0,0 +1,123 @@
+import unittest
+import json
+import os
+import tempfile
+import pandas as pd
+from pvaw.results import ResultsList
+from pvaw.vin import Vin, Vehicle
+from pvaw.make import Make
+
+try:
+    import pyarrow as pa
+    from pvaw.arrow import ArrowWriter, open_results, to_record_batch
+except ImportError:
+    pa = None
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestArrow(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open("tests/responses/decode_vin_batch_reponse.json") as f:
+            results = json.load(f)["Results"]
+        self.vins = [Vin("5UXWX7C5*BA", 2011), Vin("5YJSA3DS*EF")]
+        self.vehicles = ResultsList(
+            [Vehicle(vin, d) for vin, d in zip(self.vins, results)]
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_to_arrow(self):
+        table = self.vehicles.to_arrow()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column_names[0], "identifier")
+        self.assertEqual(table["identifier"].to_pylist(), [str(v) for v in self.vins])
+        self.assertEqual(table["Make"].to_pylist(), ["BMW", "TESLA"])
+        self.assertEqual(table.schema.field("ModelYear").type, pa.string())
+        # blank strings are stored as nulls, as get_df turns them into NaN
+        self.assertEqual(table["Trim2"].to_pylist(), ["SAV", None])
+
+        typed = self.vehicles.to_arrow(typed=True)
+        self.assertEqual(typed["ModelYear"].to_pylist(), [2011, 2014])
+        self.assertEqual(typed.schema.field("ModelYear").type, pa.int64())
+        self.assertTrue(pa.types.is_dictionary(typed.schema.field("Make").type))
+
+        key_attributes = self.vehicles.to_arrow(raw=False)
+        self.assertEqual(
+            key_attributes.column_names, ["identifier", *Vehicle.KEY_ATTRIBUTES]
+        )
+        self.assertEqual(key_attributes["model_year"].to_pylist(), [2011, 2014])
+
+        makes = [
+            Make({"Make_ID": 440, "Make_Name": "ASTON MARTIN"}),
+            Make({"Make_ID": 441, "Make_Name": "TESLA", "Mfr_Name": "TESLA, INC."}),
+        ]
+        batch = to_record_batch(makes)
+        self.assertEqual(
+            batch.column_names, ["identifier", "Make_ID", "Make_Name", "Mfr_Name"]
+        )
+        self.assertEqual(batch["Mfr_Name"].to_pylist(), [None, "TESLA, INC."])
+
+    def test_typed_matches_get_df(self):
+        # typed Arrow columns are converted like get_df(typed=True) converts them
+        values = ["440", " 441 ", "1e2", "inf", "None", "", None]
+        makes = ResultsList(
+            [
+                Make({"Make_ID": 441, "Make_Name": "TESLA", "VehicleTypeId": v})
+                for v in values
+            ]
+        )
+        expected = makes.get_df(raw=True, drop_na=False, typed=True)["VehicleTypeId"]
+        self.assertEqual(str(expected.dtype), "Int64")
+        self.assertEqual(
+            makes.to_arrow(typed=True)["VehicleTypeId"].to_pylist(),
+            [None if pd.isna(v) else v for v in expected],
+        )
+        self.assertEqual(expected.tolist()[:3], [440, 441, 100])
+
+    def test_write_and_open(self):
+        self.vehicles.to_parquet(self.path("vehicles.parquet"), typed=True)
+        self.vehicles.to_feather(self.path("vehicles.feather"), typed=True)
+
+        for name in ("vehicles.parquet", "vehicles.feather"):
+            view = open_results(self.path(name))
+            self.assertEqual(len(view), 2)
+            self.assertEqual(view[1]["Make"], "TESLA")
+            self.assertEqual(view[-1]["ModelYear"], 2014)
+            self.assertEqual(view.get("5YJSA3DS*EF")["Model"], "Model S")
+            self.assertIsNone(view.get("1HGCM82633A004352"))
+            self.assertIn("5UXWX7C5*BA,2011", view)
+            self.assertEqual([row["Make"] for row in view], ["BMW", "TESLA"])
+            self.assertEqual(len(view.filter(Make="BMW", ModelYear=2011)), 1)
+            self.assertEqual(list(view.get_df().index), [str(v) for v in self.vins])
+            with self.assertRaises(IndexError):
+                view[2]
+
+        # a memory-mapped Arrow file is read without copying it into memory
+        allocated = pa.total_allocated_bytes()
+        view = open_results(self.path("vehicles.feather"))
+        self.assertEqual(pa.total_allocated_bytes(), allocated)
+        self.assertEqual(view.column("Make").to_pylist(), ["BMW", "TESLA"])
+
+    def test_writer(self):
+        with self.assertRaises(ValueError):
+            ArrowWriter(self.path("vehicles.csv"))
+
+        with ArrowWriter(self.path("vehicles.arrow"), typed=True) as writer:
+            writer.write(self.vehicles)
+            writer.write([])
+            writer.write(ResultsList(self.vehicles.results_list[:1]))
+            writer.write([Vehicle(self.vins[1], self.vehicles[1].results_dict, [])])
+        self.assertEqual(writer.rows, 4)
+
+        view = open_results(self.path("vehicles.arrow"))
+        self.assertEqual(view.column("Make").to_pylist(), ["BMW", "TESLA", "BMW", None])
+        self.assertEqual(view.columns, writer.schema.names)
+
+
+if __name__ == "__main__":
+    unittest.main()
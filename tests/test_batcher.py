@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sqlite3
+import tempfile
+from pvaw.cache import SQLiteCache
+from pvaw.client import Client
+from pvaw.constants import DEFAULT_TIMEOUT
+from pvaw.vin import Vin, Vehicle, BatchVinDecodeError
+from tests import batch_response
+
+
+class TestMicroBatcher(unittest.TestCase):
+    TEST_BATCH_VIN_URL = "https://vpic.nhtsa.dot.gov/api/vehicles/DecodeVINValuesBatch/"
+
+    def test_exceptions(self):
+        with self.assertRaises(TypeError):
+            Client(batch_window="20ms")
+        with self.assertRaises(ValueError):
+            Client(batch_window=-1)
+        with self.assertRaises(ValueError):
+            Client(batch_window=0.02, max_batch=51)
+        self.assertIsNone(Client().batcher)
+
+    @mock.patch("requests.Session.get")
+    @mock.patch("requests.Session.post")
+    def test_full_batches(self, mock_post, mock_get):
+        mock_post.side_effect = batch_response
+        client = Client(batch_window=10, max_batch=10)
+        vins = [Vin(f"5YJSA3DS*E{i}") for i in range(20)]
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            vehicles = list(pool.map(lambda vin: vin.decode(client=client), vins))
+
+        mock_get.assert_not_called()
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual((client.batcher.submitted, client.batcher.batches), (20, 2))
+        self.assertTrue(all(isinstance(v, Vehicle) for v in vehicles))
+        self.assertEqual(
+            [v.full_or_partial_vin for v in vehicles],
+            [vin.full_or_partial_vin for vin in vins],
+        )
+
+    @mock.patch("requests.Session.post")
+    def test_window(self, mock_post):
+        mock_post.side_effect = batch_response
+        client = Client(batch_window=0.05)
+        vins = [Vin("5YJSA3DS*EF"), Vin("5UXWX7C5*BA", 2011), Vin("5YJSA3DS*EF")]
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            vehicles = list(pool.map(lambda vin: vin.decode(client=client), vins))
+
+        mock_post.assert_called_once()
+        url, post_fields = mock_post.call_args[0]
+        self.assertEqual(url, self.TEST_BATCH_VIN_URL)
+        self.assertEqual(mock_post.call_args[1], {"timeout": DEFAULT_TIMEOUT})
+        # threads may join the batch in any order, a repeated VIN is sent once
+        self.assertEqual(
+            sorted(post_fields["data"].split(";")), ["5UXWX7C5*BA,2011", "5YJSA3DS*EF"]
+        )
+        self.assertEqual([v.model_year for v in vehicles], [2003, 2011, 2003])
+
+    @mock.patch("requests.Session.post")
+    def test_failure(self, mock_post):
+        mock_post.side_effect = ConnectionError("connection reset")
+        client = Client(batch_window=0.01)
+
+        with self.assertRaises(BatchVinDecodeError):
+            Vin("5YJSA3DS*EF").decode(client=client)
+
+    @mock.patch("requests.Session.post")
+    def test_cache_failure(self, mock_post):
+        mock_post.side_effect = batch_response
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(os.path.join(tmp, "cache.db"))
+            client = Client(cache=cache, batch_window=0.05)
+            vins = [Vin("5YJSA3DS*EF"), Vin("5UXWX7C5*BA", 2011)]
+
+            with mock.patch.object(
+                cache,
+                "set",
+                side_effect=[sqlite3.OperationalError("database is locked"), None],
+            ), self.assertLogs("pvaw", level="WARNING"):
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    futures = [pool.submit(vin.decode, client=client) for vin in vins]
+                    vehicles = [future.result(timeout=5) for future in futures]
+
+            mock_post.assert_called_once()
+            self.assertEqual([v.model_year for v in vehicles], [2003, 2011])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+import unittest
+from unittest import mock
+import json
+import os
+import tempfile
+import threading
+import time
+from pvaw.cache import SQLiteCache, PatternCache, normalize_path, vin_pattern
+from pvaw.client import Client
+from pvaw.validation import compute_check_digit
+from pvaw.vin import Vin, decode_vins
+from pvaw.wmi import decode_wmi
+from tests import batch_response
+
+
+def with_check_digit(vin):
+    return vin[:8] + compute_check_digit(vin) + vin[9:]
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache.sqlite")
+        self.cache = SQLiteCache(self.path, endpoint_ttls={"DecodeWMI": 60})
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_exceptions(self):
+        with self.assertRaises(TypeError):
+            SQLiteCache(1)
+        with self.assertRaises(TypeError):
+            SQLiteCache(self.path, ttl="1")
+        with self.assertRaises(ValueError):
+            SQLiteCache(self.path, max_entries=0)
+        with self.assertRaises(TypeError):
+            Client(cache={})
+
+    def test_normalize_path(self):
+        self.assertEqual(
+            normalize_path("DecodeVinValues/5UXWX7C5*BA?format=json&modelyear=2011"),
+            ("decodevinvalues", "5uxwx7c5*ba?modelyear=2011"),
+        )
+        self.assertEqual(
+            normalize_path("getallmanufacturers?format=json&page=3&ManufacturerType=x"),
+            normalize_path("getallmanufacturers?ManufacturerType=X&page=3"),
+        )
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get("DecodeWMI", "1fd"))
+        self.cache.set("DecodeWMI", "1fd", {"Results": [1]})
+        self.assertEqual(self.cache.get("decodewmi", "1fd"), {"Results": [1]})
+        self.assertEqual(len(self.cache), 1)
+
+        # a second handle on the same file sees the entry
+        other = SQLiteCache(self.path)
+        self.assertEqual(other.get("DecodeWMI", "1fd"), {"Results": [1]})
+        other.close()
+
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_ttl(self):
+        self.assertEqual(self.cache.get_ttl("decodewmi"), 60)
+
+        with mock.patch("pvaw.cache.time.time", return_value=1000.0):
+            self.cache.set("DecodeWMI", "1fd", {"Results": [1]})
+            self.cache.set("GetMakeForManufacturer", "honda", {"Results": [2]})
+
+        with mock.patch("pvaw.cache.time.time", return_value=1061.0):
+            self.assertIsNone(self.cache.get("DecodeWMI", "1fd"))
+            self.assertEqual(
+                self.cache.get("GetMakeForManufacturer", "honda"), {"Results": [2]}
+            )
+
+        disabled = SQLiteCache(self.path, endpoint_ttls={"DecodeWMI": 0})
+        disabled.set("DecodeWMI", "1fa", {"Results": [3]})
+        self.assertIsNone(disabled.get("DecodeWMI", "1fa"))
+        disabled.close()
+
+    def test_eviction(self):
+        cache = SQLiteCache(self.path, max_entries=10)
+        now = time.time()
+        for i in range(20):
+            with mock.patch("pvaw.cache.time.time", return_value=now - 20 + i):
+                cache.set("DecodeWMI", str(i), i)
+        cache.evict()
+        self.assertEqual(len(cache), 10)
+        self.assertIsNone(cache.get("DecodeWMI", "0"))
+        self.assertEqual(cache.get("DecodeWMI", "19"), 19)
+        cache.close()
+
+    def test_threads(self):
+        def write(n):
+            for i in range(50):
+                self.cache.set("DecodeWMI", f"{n}-{i}", i)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.cache), 200)
+
+    @mock.patch("requests.Session.get")
+    def test_client_cache(self, mock_get):
+        with open("tests/responses/decode_3_digit_wmi_response.json") as f:
+            mock_get.return_value.json.return_value = json.load(f)
+
+        client = Client(cache=self.cache)
+        first = decode_wmi("1FD", client=client)
+        second = decode_wmi("1fd", client=client)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first.manufacturer, second.manufacturer)
+
+    @mock.patch("requests.Session.post")
+    @mock.patch("requests.Session.get")
+    def test_decode_vins_cache(self, mock_get, mock_post):
+        with open("tests/responses/decode_vin_batch_reponse.json") as f:
+            batch_response = json.load(f)
+        with open("tests/responses/decode_vin_response_with_year.json") as f:
+            mock_get.return_value.json.return_value = json.load(f)
+
+        client = Client(cache=self.cache)
+
+        # the single decode fills the cache for the first VIN
+        Vin("5UXWX7C5*BA", 2011).decode(client=client)
+
+        mock_post.return_value.json.return_value = {
+            "Results": batch_response["Results"][1:]
+        }
+        vehicles = decode_vins(
+            [Vin("5UXWX7C5*BA", 2011), Vin("5YJSA3DS*EF")], client=client
+        )
+        self.assertEqual(
+            mock_post.call_args[0][1], {"format": "json", "data": "5YJSA3DS*EF"}
+        )
+        self.assertEqual([v.make for v in vehicles], ["BMW", "TESLA"])
+
+        vehicles = decode_vins([Vin("5YJSA3DS*EF")], client=client)
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(vehicles[0].make, "TESLA")
+
+    def test_vin_pattern(self):
+        self.assertEqual(vin_pattern("1HGCM82633A004352"), "1HGCM8263A")
+        self.assertEqual(vin_pattern("1hgcm82633a004352", 2003), "1HGCM8263A,2003")
+        self.assertIsNone(vin_pattern("5UXWX7C5*BA"))
+        self.assertIsNone(vin_pattern("1HGCM82633A00435*"))
+
+    def test_pattern_cache(self):
+        with self.assertRaises(ValueError):
+            PatternCache(maxsize=0)
+        with self.assertRaises(TypeError):
+            Client(pattern_cache={})
+
+        pattern_cache = PatternCache(maxsize=2)
+        clean = {"VIN": "1HGCM82633A004352", "Make": "HONDA", "ErrorCode": "0"}
+
+        self.assertIsNone(pattern_cache.get("1HGCM82633A004352"))
+        self.assertFalse(
+            pattern_cache.set("1HGCM82633A004352", None, dict(clean, ErrorCode="1"))
+        )
+        self.assertTrue(pattern_cache.set("1HGCM82633A004352", None, clean))
+
+        hit = pattern_cache.get("1HGCM82653A999999")
+        self.assertEqual(hit["VIN"], "1HGCM82653A999999")
+        self.assertEqual(hit["Make"], "HONDA")
+        self.assertEqual(clean["VIN"], "1HGCM82633A004352")
+        self.assertIsNone(pattern_cache.get("1HGCM82633A004352", 2003))
+        self.assertEqual((pattern_cache.hits, pattern_cache.misses), (1, 2))
+
+        pattern_cache.set("2HGCM82633A004352", None, clean)
+        pattern_cache.get("1HGCM82633A004352")
+        pattern_cache.set("3HGCM82633A004352", None, clean)
+        self.assertEqual(len(pattern_cache), 2)
+        self.assertTrue("1HGCM8263A" in pattern_cache)
+        self.assertFalse("2HGCM8263A" in pattern_cache)
+
+    @mock.patch("requests.Session.post")
+    @mock.patch("requests.Session.get")
+    def test_pattern_cache_decodes(self, mock_get, mock_post):
+        mock_post.side_effect = batch_response
+        client = Client(pattern_cache=PatternCache())
+
+        vin_list = [
+            Vin(with_check_digit(f"1HGCM8260{c}A{i:06d}"))
+            for c in "35"
+            for i in range(100)
+        ]
+        vehicles = decode_vins(vin_list, client=client)
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(
+            mock_post.call_args[0][1]["data"],
+            f"{vin_list[0]};{vin_list[100]}",
+        )
+        for vin, vehicle in zip(vin_list, vehicles):
+            self.assertEqual(vehicle.full_or_partial_vin, vin.full_or_partial_vin)
+
+        vehicle = Vin(with_check_digit("1HGCM82603A123456")).decode(client=client)
+        self.assertEqual(vehicle.full_or_partial_vin, "1HGCM82673A123456")
+        mock_get.assert_not_called()
+
+        Vin("1HGCM82603A123456").decode(client=client)
+        mock_get.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+import json
+from pvaw.client import Client, get_default_client, set_default_client
+from pvaw.constants import DEFAULT_TIMEOUT
+from pvaw.wmi import decode_wmi
+
+
+class TestClient(unittest.TestCase):
+    def test_exceptions(self):
+        with self.assertRaises(TypeError):
+            Client(base_url=1)
+        with self.assertRaises(TypeError):
+            Client(pool_maxsize=1.0)
+        with self.assertRaises(ValueError):
+            Client(pool_connections=0)
+        with self.assertRaises(TypeError):
+            set_default_client("client")
+        with self.assertRaises(TypeError):
+            decode_wmi("1FD", client="client")
+
+    def test_default_client(self):
+        self.assertIs(get_default_client(), get_default_client())
+
+        previous = get_default_client()
+        client = Client()
+        try:
+            set_default_client(client)
+            self.assertIs(get_default_client(), client)
+        finally:
+            set_default_client(previous)
+
+    def test_session_configuration(self):
+        client = Client(
+            base_url="http://localhost:8080/api",
+            pool_maxsize=32,
+            gzip=False,
+            headers={"User-Agent": "pvaw-test"},
+        )
+        self.assertEqual(client.base_url, "http://localhost:8080/api/")
+        self.assertEqual(client.session.headers["Accept-Encoding"], "identity")
+        self.assertEqual(client.session.headers["User-Agent"], "pvaw-test")
+        self.assertEqual(
+            client.session.get_adapter("http://localhost")._pool_maxsize, 32
+        )
+
+    @mock.patch("requests.Session.get")
+    def test_explicit_client(self, mock_get):
+        with open("tests/responses/decode_3_digit_wmi_response.json") as f:
+            expected_response = json.load(f)
+
+        mock_get.return_value.json.return_value = expected_response
+
+        with Client(base_url="http://localhost:8080/api/vehicles/") as client:
+            wmi_info = decode_wmi("1FD", client=client)
+
+        self.assertTrue(
+            mock.call(
+                "http://localhost:8080/api/vehicles/DecodeWMI/1FD?format=json",
+                timeout=DEFAULT_TIMEOUT,
+            )
+            in mock_get.mock_calls
+        )
+        self.assertEqual(wmi_info.manufacturer, "FORD MOTOR COMPANY, USA")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+from unittest import mock
+import json
+import logging
+import os
+import tempfile
+import requests
+from pvaw.cache import SQLiteCache
+from pvaw.client import Client
+from pvaw.instrument import (
+    Instrument,
+    RequestEvent,
+    LoggingInstrument,
+    HistogramInstrument,
+    Histogram,
+)
+from pvaw.vin import Vin, decode_vins
+from pvaw.wmi import decode_wmi
+
+
+class RecordingInstrument(Instrument):
+    def __init__(self):
+        self.events = []
+
+    def on_request(self, event):
+        self.events.append(event)
+
+
+def make_response(status_code, body):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.headers = {}
+    response.content = json.dumps(body).encode()
+    response.json.side_effect = lambda: json.loads(response.content)
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(str(status_code))
+    return response
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        with open("tests/responses/decode_3_digit_wmi_response.json") as f:
+            self.wmi_response = json.load(f)
+        self.wmi_bytes = len(json.dumps(self.wmi_response))
+        with open("tests/responses/decode_vin_batch_reponse.json") as f:
+            self.batch_response = json.load(f)
+
+    def test_exceptions(self):
+        with self.assertRaises(TypeError):
+            Client(instrument=print)
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.Session.get")
+    def test_events(self, mock_get, mock_sleep):
+        instrument = RecordingInstrument()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SQLiteCache(os.path.join(tmp_dir, "cache.sqlite"))
+            client = Client(cache=cache, instrument=instrument)
+            mock_get.side_effect = [
+                make_response(503, {}),
+                make_response(200, self.wmi_response),
+            ]
+
+            decode_wmi("1FD", client=client)
+            decode_wmi("1fd", client=client)
+            cache.close()
+
+        miss, hit = instrument.events
+        self.assertEqual(
+            (miss.method, miss.endpoint, miss.params), ("GET", "decodewmi", "1fd")
+        )
+        self.assertEqual((miss.status, miss.retries, miss.cache), (200, 1, "miss"))
+        self.assertEqual(miss.response_bytes, self.wmi_bytes)
+        self.assertIsNone(miss.error)
+        self.assertGreater(miss.network_seconds, 0)
+        self.assertGreater(miss.build_seconds, 0)
+        self.assertGreaterEqual(
+            miss.total_seconds,
+            miss.network_seconds + miss.parse_seconds + miss.build_seconds,
+        )
+
+        self.assertEqual((hit.cache, hit.status, hit.network_seconds), ("hit", None, 0))
+        self.assertEqual(hit.to_dict()["endpoint"], "decodewmi")
+
+    @mock.patch("requests.Session.post")
+    @mock.patch("requests.Session.get")
+    def test_errors_and_logging(self, mock_get, mock_post):
+        mock_get.side_effect = requests.ConnectionError("connection reset")
+        mock_post.return_value = make_response(200, self.batch_response)
+        logger = logging.getLogger("pvaw.test")
+        client = Client(instrument=LoggingInstrument(logger), retry=None)
+
+        with self.assertLogs(logger, logging.DEBUG) as logs, mock.patch("time.sleep"):
+            with self.assertRaises(requests.ConnectionError):
+                decode_wmi("1FD", client=client)
+            decode_vins([Vin("5UXWX7C5*BA", 2011), Vin("5YJSA3DS*EF")], client=client)
+
+        self.assertEqual(
+            [r.levelno for r in logs.records], [logging.WARNING, logging.DEBUG]
+        )
+        self.assertIn("retries=3", logs.output[0])
+        self.assertIn("error=ConnectionError('connection reset')", logs.output[0])
+        self.assertIn("method=POST endpoint=decodevinvaluesbatch", logs.output[1])
+
+    @mock.patch("requests.Session.get")
+    def test_histogram_instrument(self, mock_get):
+        mock_get.return_value = make_response(200, self.wmi_response)
+        instrument = HistogramInstrument()
+        client = Client(instrument=instrument)
+
+        for wmi in ("1FD", "1FT", "1FA"):
+            decode_wmi(wmi, client=client)
+
+        stats = instrument.snapshot()["decodewmi"]
+        self.assertEqual((stats["requests"], stats["errors"]), (3, 0))
+        self.assertEqual(stats["response_bytes"], 3 * self.wmi_bytes)
+        self.assertEqual(stats["total_seconds"]["count"], 3)
+        self.assertLessEqual(
+            stats["total_seconds"]["p99"], stats["total_seconds"]["max"]
+        )
+        instrument.reset()
+        self.assertEqual(instrument.snapshot(), {})
+
+    def test_histogram(self):
+        histogram = Histogram((0.01, 0.1, 1, float("inf")))
+        self.assertIsNone(histogram.quantile(0.5))
+        for value in [0.005] * 90 + [0.05] * 9 + [5]:
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [90, 9, 0, 1])
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(0.95), 0.1)
+        self.assertEqual(histogram.quantile(1), 5)
+
+        event = RequestEvent("GET", "DecodeWMI/1FD?format=json")
+        event.finish()
+        self.assertEqual(event.endpoint, "decodewmi")
+        self.assertGreaterEqual(event.total_seconds, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
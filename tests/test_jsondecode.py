@@ -0,0 +1,128 @@
+import unittest
+from unittest import mock
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+from pvaw.cache import SQLiteCache
+from pvaw.client import Client
+from pvaw.jsondecode import JSONDecoder
+from pvaw.vin import Vin, decode_vins
+
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+HAS_SIMDJSON = importlib.util.find_spec("simdjson") is not None
+
+
+class TestJSONDecoder(unittest.TestCase):
+    FIELDS = ["Make", "Model", "ModelYear", "DisplacementL"]
+
+    def setUp(self):
+        with open("tests/responses/decode_vin_batch_reponse.json", "rb") as f:
+            self.content = f.read()
+        self.expected = json.loads(self.content)
+
+    def test_exceptions(self):
+        with self.assertRaises(TypeError):
+            JSONDecoder(json)
+        with self.assertRaises(ValueError):
+            JSONDecoder("ujson")
+        if not HAS_SIMDJSON:
+            with self.assertRaises(ImportError):
+                JSONDecoder("simdjson")
+
+    def test_backends(self):
+        self.assertEqual(JSONDecoder("json").backend, "json")
+        self.assertEqual(JSONDecoder().backend, "orjson" if HAS_ORJSON else "json")
+
+        backends = ["json"]
+        backends += ["orjson"] * HAS_ORJSON + ["simdjson"] * HAS_SIMDJSON
+        for backend in backends:
+            decoder = JSONDecoder(backend)
+            self.assertEqual(decoder.loads(self.content), self.expected)
+            self.assertEqual(decoder.loads_results(self.content, None), self.expected)
+
+            response = decoder.loads_results(self.content, iter(self.FIELDS))
+            self.assertEqual(response["Count"], self.expected["Count"])
+            self.assertEqual(
+                response["Results"],
+                [
+                    {field: result[field] for field in self.FIELDS}
+                    for result in self.expected["Results"]
+                ],
+            )
+
+    def test_simdjson_backend(self):
+        # stands in for pysimdjson, whose parsed documents act like dicts
+        parsers = []
+
+        class Parser:
+            def __init__(self):
+                parsers.append(self)
+
+            def parse(self, content):
+                return json.loads(content)
+
+        simdjson = types.ModuleType("simdjson")
+        simdjson.loads = json.loads
+        simdjson.Parser = Parser
+
+        with mock.patch.dict(sys.modules, {"simdjson": simdjson}):
+            decoder = JSONDecoder("simdjson")
+        self.assertEqual(decoder.loads_results(self.content, None), self.expected)
+        self.assertEqual(parsers, [])
+
+        response = decoder.loads_results(self.content, self.FIELDS)
+        self.assertEqual(response["Count"], self.expected["Count"])
+        self.assertEqual(
+            response["Results"],
+            [
+                {field: result[field] for field in self.FIELDS}
+                for result in self.expected["Results"]
+            ],
+        )
+        decoder.loads_results(self.content, self.FIELDS)
+        self.assertEqual(len(parsers), 1)
+
+        # each thread parses with its own parser
+        thread = threading.Thread(
+            target=decoder.loads_results, args=(self.content, self.FIELDS)
+        )
+        thread.start()
+        thread.join()
+        self.assertEqual(len(parsers), 2)
+
+    @mock.patch("requests.Session.post")
+    def test_decode_vins_fields(self, mock_post):
+        mock_post.return_value.content = self.content
+        mock_post.return_value.json.side_effect = lambda: json.loads(self.content)
+        vins = [Vin("5UXWX7C5*BA", 2011), Vin("5YJSA3DS*EF")]
+        fields = ["DisplacementL", "FuelTypePrimary"]
+
+        client = Client(json_backend="json")
+        vehicles = decode_vins(vins, client=client, fields=fields)
+
+        mock_post.return_value.json.assert_not_called()
+        self.assertEqual(list(vehicles[1].results_dict), fields)
+        self.assertEqual(vehicles[1].make, "TESLA")
+        full_parse = decode_vins(vins, client=Client(), fields=fields)
+        self.assertEqual(vehicles[1].results_dict, full_parse[1].results_dict)
+
+        # a cache needs whole results, so they are all parsed and stored
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = SQLiteCache(os.path.join(tmp_dir, "cache.sqlite"))
+            client = Client(cache=cache, json_backend="json")
+            vehicles = decode_vins(vins, client=client, fields=fields)
+            self.assertEqual(list(vehicles[1].results_dict), fields)
+            cached = client.cache_get(vins[1]._decode_path())
+            self.assertEqual(cached["Results"][0], self.expected["Results"][1])
+            cache.close()
+
+        with self.assertRaises(TypeError):
+            decode_vins(vins, client=Client(json_backend="json"), fields="Make")
+
+
+if __name__ == "__main__":
+    unittest.main()
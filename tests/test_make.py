@@ -2,8 +2,20 @@ import unittest
 from unittest import mock
 from unittest.mock import patch
 import json
+import os
+import tempfile
+import requests
 from requests import Session
-from pvaw.make import get_makes, Make
+from pvaw.constants import DEFAULT_TIMEOUT
+from pvaw.client import Client
+from pvaw.make import (
+    get_makes,
+    get_makes_bulk,
+    Make,
+    MakeYears,
+    MakeCatalog,
+    BulkMakesError,
+)
 
 
 class TestMake(unittest.TestCase):
@@ -31,7 +43,7 @@ class TestMake(unittest.TestCase):
         with self.assertRaises(ValueError):
             get_makes(model_year=1999)
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_make_by_manufacturer_name(self, mock_get):
         with open("tests/responses/get_makes_for_manufacturer_name_response.json") as f:
             expected_response = json.load(f)
@@ -41,7 +53,8 @@ class TestMake(unittest.TestCase):
         makes = get_makes("honda")
 
         self.assertTrue(
-            mock.call(self.TEST_MANUFACTURER_NAME_MAKES_URL) in mock_get.mock_calls
+            mock.call(self.TEST_MANUFACTURER_NAME_MAKES_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
         )
 
         for make in makes:
@@ -73,7 +86,7 @@ class TestMake(unittest.TestCase):
         str(first)
         first._repr_html_()
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_make_by_manufacturer_id(self, mock_get):
         with open("tests/responses/get_makes_for_manufacturer_id_response.json") as f:
             expected_response = json.load(f)
@@ -83,7 +96,8 @@ class TestMake(unittest.TestCase):
         makes = get_makes(988)
 
         self.assertTrue(
-            mock.call(self.TEST_MANUFACTURER_ID_MAKES_URL) in mock_get.mock_calls
+            mock.call(self.TEST_MANUFACTURER_ID_MAKES_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
         )
 
         for make in makes:
@@ -95,7 +109,7 @@ class TestMake(unittest.TestCase):
         self.assertEqual(first.make_name, "HONDA")
         self.assertEqual(first.manufacturer, "HONDA OF AMERICA MFG., INC.")
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_make_by_manufacturer_name_and_year(self, mock_get):
         with open(
             "tests/responses/get_makes_for_manufacturer_name_and_year_response.json"
@@ -107,7 +121,9 @@ class TestMake(unittest.TestCase):
         makes = get_makes("honda", 2004)
 
         self.assertTrue(
-            mock.call(self.TEST_MANUFACTURER_NAME_AND_YEAR_MAKES_URL)
+            mock.call(
+                self.TEST_MANUFACTURER_NAME_AND_YEAR_MAKES_URL, timeout=DEFAULT_TIMEOUT
+            )
             in mock_get.mock_calls
         )
 
@@ -120,7 +136,7 @@ class TestMake(unittest.TestCase):
         self.assertEqual(first.make_name, "HONDA")
         self.assertEqual(first.manufacturer, "HONDA MOTOR CO., LTD")
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_make_by_vehicle_type(self, mock_get):
         with open("tests/responses/get_makes_for_vehicle_type_response.json") as f:
             expected_response = json.load(f)
@@ -130,7 +146,8 @@ class TestMake(unittest.TestCase):
         makes = get_makes(vehicle_type="car")
 
         self.assertTrue(
-            mock.call(self.TEST_VEHICLE_TYPE_MAKES_URL) in mock_get.mock_calls
+            mock.call(self.TEST_VEHICLE_TYPE_MAKES_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
         )
 
         for make in makes:
@@ -141,3 +158,149 @@ class TestMake(unittest.TestCase):
         self.assertEqual(first.make_id, 440)
         self.assertEqual(first.make_name, "ASTON MARTIN")
         self.assertEqual(first.vehicle_type, "Passenger Car")
+
+    def catalog_response(self, url, timeout=None):
+        if "GetMakesForVehicleType" in url:
+            name = "get_makes_for_vehicle_type_response"
+        elif "GetMakesForManufacturerAndYear" in url:
+            name = "get_makes_for_manufacturer_name_and_year_response"
+        else:
+            name = "get_makes_for_manufacturer_name_response"
+        with open(f"tests/responses/{name}.json") as f:
+            response = mock.Mock()
+            response.json.return_value = json.load(f)
+            return response
+
+    @mock.patch("requests.Session.get")
+    def test_make_catalog(self, mock_get):
+        mock_get.side_effect = self.catalog_response
+
+        catalog = MakeCatalog.build(
+            ["honda"], years=range(2004, 2006), vehicle_types=["car"], client=Client()
+        )
+
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertTrue(
+            mock.call(
+                "https://vpic.nhtsa.dot.gov/api/vehicles/GetMakesForManufacturerAndYear/honda?year=2005&format=json",
+                timeout=DEFAULT_TIMEOUT,
+            )
+            in mock_get.mock_calls
+        )
+        self.assertEqual(len(catalog), 161 + 2 * 16)
+        self.assertEqual(catalog.years, [2004, 2005])
+
+        makes = catalog.get_makes("honda", 2004)
+        self.assertEqual(len(makes), 16)
+        self.assertTrue(isinstance(makes[0], Make))
+        self.assertEqual(makes[1].manufacturer, "HONDA OF AMERICA MFG., INC.")
+        self.assertEqual(len(catalog.get_makes("Honda Of America")), 2)
+        self.assertEqual(len(catalog.get_makes(988, "2005")), 2)
+        self.assertEqual(len(catalog.get_makes("honda", 2006)), 0)
+        self.assertEqual(len(catalog.get_makes(vehicle_type="car")), 161)
+        self.assertEqual(len(catalog.get_makes(vehicle_type="truck")), 0)
+        self.assertEqual(
+            catalog.get_makes(vehicle_type="car", make_id=441)[0].make_name, "TESLA"
+        )
+        self.assertEqual(len(catalog.get_makes()), 161 + 16)
+        # repeated questions hand back the same Make objects
+        self.assertIs(catalog.get_makes("honda", 2004)[0], makes[0])
+        self.assertEqual(mock_get.call_count, 3)
+
+        with self.assertRaises(ValueError):
+            catalog.get_makes(model_year=2004)
+        with self.assertRaises(TypeError):
+            catalog.get_makes(10.0)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "makes.json.gz")
+            catalog.save(path)
+            loaded = MakeCatalog.load(path)
+        self.assertEqual(len(loaded), len(catalog))
+        self.assertEqual(
+            loaded.get_makes(988, 2004).get_results(),
+            catalog.get_makes(988, 2004).get_results(),
+        )
+
+        with self.assertRaises(FileNotFoundError):
+            MakeCatalog.load("missing.json.gz")
+
+    @mock.patch("requests.Session.get")
+    def test_make_catalog_manufacturer_ids(self, mock_get):
+        mock_get.side_effect = self.catalog_response
+
+        catalog = MakeCatalog.build([988], vehicle_types=[], client=Client())
+
+        mock_get.assert_called_once_with(
+            self.TEST_MANUFACTURER_ID_MAKES_URL, timeout=DEFAULT_TIMEOUT
+        )
+        self.assertEqual(len(catalog.get_makes(988)), 17)
+        self.assertEqual(len(catalog.get_makes("988")), 17)
+        self.assertEqual(len(catalog.get_makes("HONDA MOTOR")), 6)
+
+    def bulk_response(self, url, timeout=None):
+        manufacturer, year = url.split("/")[-1].split("?year=")
+        year = int(year.split("&")[0])
+        if manufacturer == "acura" and year == 2005:
+            raise requests.ConnectionError("connection reset")
+        results = [
+            {"MakeId": 474, "MakeName": "HONDA", "MfrId": 988, "MfrName": "HONDA"}
+        ]
+        if year >= 2004:
+            results.append(
+                {"MakeId": 475, "MakeName": "ACURA", "MfrId": 988, "MfrName": "HONDA"}
+            )
+        response = mock.Mock()
+        response.json.return_value = {"Count": len(results), "Results": results}
+        return response
+
+    @mock.patch("requests.Session.get")
+    def test_get_makes_bulk(self, mock_get):
+        mock_get.side_effect = self.bulk_response
+
+        makes = get_makes_bulk(["honda", 988], range(2003, 2006), client=Client())
+
+        self.assertEqual(mock_get.call_count, 6)
+        self.assertTrue(
+            mock.call(
+                "https://vpic.nhtsa.dot.gov/api/vehicles/GetMakesForManufacturerAndYear/988?year=2003&format=json",
+                timeout=DEFAULT_TIMEOUT,
+            )
+            in mock_get.mock_calls
+        )
+        self.assertEqual(len(makes), 2)
+        self.assertTrue(isinstance(makes[0], MakeYears))
+        self.assertEqual(makes.get(474).model_years, [2003, 2004, 2005])
+        self.assertEqual(makes.get(475).make_name, "ACURA")
+        self.assertEqual(makes.get(475).model_years, [2004, 2005])
+        self.assertEqual(
+            list(makes.get_df().columns),
+            ["make_id", "make_name", "manufacturer", "model_years"],
+        )
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.Session.get")
+    def test_get_makes_bulk_errors(self, mock_get, mock_sleep):
+        mock_get.side_effect = self.bulk_response
+
+        with self.assertRaises(BulkMakesError) as cm:
+            get_makes_bulk(["acura", "honda"], ["2004", "2005"], client=Client())
+
+        self.assertEqual(len(cm.exception.errors), 1)
+        query, error = cm.exception.errors[0]
+        self.assertEqual(query, ("acura", 2005))
+        self.assertTrue(isinstance(error, requests.ConnectionError))
+        self.assertEqual(cm.exception.results.get(475).model_years, [2004, 2005])
+        self.assertTrue(str(cm.exception).startswith("1 of 4 queries failed"))
+
+        with self.assertRaises(TypeError):
+            get_makes_bulk("honda", [2004])
+        with self.assertRaises(TypeError):
+            get_makes_bulk(["honda"], [2004.0])
+        with self.assertRaises(ValueError):
+            get_makes_bulk(["honda"], [1900])
+        with self.assertRaises(TypeError):
+            get_makes_bulk([10.0], [2004])
+        with self.assertRaises(ValueError):
+            get_makes_bulk(["honda"], [2004], max_workers=0)
+        self.assertEqual(len(get_makes_bulk([], [2004])), 0)
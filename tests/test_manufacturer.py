@@ -2,11 +2,18 @@ import unittest
 from unittest import mock
 from unittest.mock import patch
 import json
+import requests
 from requests import Session
+from pvaw.constants import DEFAULT_TIMEOUT
+from pvaw.client import Client
 from pvaw.manufacturer import (
     Manufacturer,
+    BulkManufacturersError,
     get_manufacturer_details,
+    get_manufacturer_details_bulk,
+    iter_manufacturer_details,
     get_manufacturers,
+    iter_manufacturers,
 )
 
 
@@ -31,7 +38,7 @@ class TestManufacturer(unittest.TestCase):
         with self.assertRaises(TypeError):
             get_manufacturer_details(1.0)
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_get_manufacturers(self, mock_get):
         with open("tests/responses/get_manufacturers_response.json") as f:
             expected_response = json.load(f)
@@ -41,7 +48,8 @@ class TestManufacturer(unittest.TestCase):
         manufacturers = get_manufacturers(page=3)
 
         self.assertTrue(
-            mock.call(self.TEST_GET_MANUFACTURERS_URL) in mock_get.mock_calls
+            mock.call(self.TEST_GET_MANUFACTURERS_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
         )
 
         for m in manufacturers:
@@ -79,7 +87,7 @@ class TestManufacturer(unittest.TestCase):
         str(first)
         first._repr_html_()
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_get_manufacturers_with_m_type(self, mock_get):
         with open("tests/responses/get_manufacturers_with_m_type_response.json") as f:
             expected_response = json.load(f)
@@ -91,7 +99,9 @@ class TestManufacturer(unittest.TestCase):
         print(mock_get.mock_calls)
 
         self.assertTrue(
-            mock.call(self.TEST_GET_MANUFACTURERS_WITH_M_TYPE_URL)
+            mock.call(
+                self.TEST_GET_MANUFACTURERS_WITH_M_TYPE_URL, timeout=DEFAULT_TIMEOUT
+            )
             in mock_get.mock_calls
         )
 
@@ -106,7 +116,7 @@ class TestManufacturer(unittest.TestCase):
 
         self.assertTrue("Trailer" in first.vehicle_types)
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_get_manufacturer_details_from_name(self, mock_get):
         with open(
             "tests/responses/get_manufacturer_details_from_name_response.json"
@@ -118,7 +128,10 @@ class TestManufacturer(unittest.TestCase):
         manufacturers = get_manufacturer_details("honda")
 
         self.assertTrue(
-            mock.call(self.TEST_GET_MANUFACTURER_DETAILS_FROM_NAME_URL)
+            mock.call(
+                self.TEST_GET_MANUFACTURER_DETAILS_FROM_NAME_URL,
+                timeout=DEFAULT_TIMEOUT,
+            )
             in mock_get.mock_calls
         )
         for m in manufacturers:
@@ -138,7 +151,7 @@ class TestManufacturer(unittest.TestCase):
 
         self.assertTrue("Multipurpose Passenger Vehicle (MPV)" in first.vehicle_types)
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_get_manufacturer_details_from_id(self, mock_get):
         with open(
             "tests/responses/get_manufacturer_details_from_id_response.json"
@@ -150,7 +163,9 @@ class TestManufacturer(unittest.TestCase):
         manufacturers = get_manufacturer_details(987)
 
         self.assertTrue(
-            mock.call(self.TEST_GET_MANUFACTURER_DETAILS_FROM_ID_URL)
+            mock.call(
+                self.TEST_GET_MANUFACTURER_DETAILS_FROM_ID_URL, timeout=DEFAULT_TIMEOUT
+            )
             in mock_get.mock_calls
         )
 
@@ -169,4 +184,152 @@ class TestManufacturer(unittest.TestCase):
 
         self.assertTrue("Passenger Car" in first.vehicle_types)
 
-        self.assertTrue("Multipurpose Passenger Vehicle (MPV)" in first.vehicle_types)
\ No newline at end of file
+        self.assertTrue("Multipurpose Passenger Vehicle (MPV)" in first.vehicle_types)
+
+    @staticmethod
+    def paged_response(url, timeout=None):
+        with open("tests/responses/get_manufacturers_response.json") as f:
+            page_response = json.load(f)
+
+        page = int(url.split("page=")[1])
+        response = mock.Mock()
+        if page <= 3:
+            for results_dict in page_response["Results"]:
+                results_dict["Mfr_ID"] += page * 10000
+            response.json.return_value = page_response
+        else:
+            response.json.return_value = {"Results": []}
+        return response
+
+    def test_iter_manufacturers_exceptions(self):
+        with self.assertRaises(TypeError):
+            iter_manufacturers(1)
+        with self.assertRaises(TypeError):
+            iter_manufacturers(prefetch=1.0)
+        with self.assertRaises(ValueError):
+            iter_manufacturers(prefetch=-1)
+
+    @mock.patch("requests.Session.get")
+    def test_iter_manufacturers(self, mock_get):
+        mock_get.side_effect = self.paged_response
+
+        manufacturers = iter_manufacturers(m_type="Completed Vehicle", prefetch=2)
+        mock_get.assert_not_called()
+
+        ids = [m.id for m in manufacturers]
+
+        self.assertEqual(len(ids), 3 * 96)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids[0], 11178)
+        self.assertTrue(
+            mock.call(
+                "https://vpic.nhtsa.dot.gov/api/vehicles/getallmanufacturers?format=json&ManufacturerType=Completed%20Vehicle&page=4",
+                timeout=DEFAULT_TIMEOUT,
+            )
+            in mock_get.mock_calls
+        )
+
+    @mock.patch("requests.Session.get")
+    def test_iter_manufacturers_early_exit(self, mock_get):
+        mock_get.side_effect = self.paged_response
+
+        manufacturers = iter_manufacturers(prefetch=1)
+        first = next(manufacturers)
+        manufacturers.close()
+
+        self.assertTrue(isinstance(first, Manufacturer))
+        self.assertTrue(mock_get.call_count <= 3)
+
+    @staticmethod
+    def details_response(url, timeout=None):
+        name_or_id = url.split("/")[-1].split("?")[0]
+        if name_or_id == "acura":
+            raise requests.ConnectionError("connection reset")
+        if name_or_id == "987":
+            path = "tests/responses/get_manufacturer_details_from_id_response.json"
+        else:
+            path = "tests/responses/get_manufacturer_details_from_name_response.json"
+        with open(path) as f:
+            response = mock.Mock()
+            response.json.return_value = json.load(f)
+        return response
+
+    @mock.patch("requests.Session.get")
+    def test_get_manufacturer_details_bulk(self, mock_get):
+        mock_get.side_effect = self.details_response
+
+        details = get_manufacturer_details_bulk(
+            [987, "honda", "Honda "], client=Client()
+        )
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertTrue(
+            mock.call(
+                self.TEST_GET_MANUFACTURER_DETAILS_FROM_NAME_URL,
+                timeout=DEFAULT_TIMEOUT,
+            )
+            in mock_get.mock_calls
+        )
+        self.assertEqual(list(details), [987, "honda", "Honda "])
+        self.assertEqual(len(details["honda"]), 13)
+        self.assertEqual(len(details[987]), 1)
+        self.assertTrue(isinstance(details[987][0], Manufacturer))
+        self.assertTrue(details[987][0] is details["honda"][0])
+        self.assertTrue(details["honda"] is not details["Honda "])
+        self.assertEqual(details["Honda "][0].common_name, "Honda")
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.Session.get")
+    def test_get_manufacturer_details_bulk_errors(self, mock_get, mock_sleep):
+        mock_get.side_effect = self.details_response
+
+        with self.assertRaises(BulkManufacturersError) as cm:
+            get_manufacturer_details_bulk(["acura", "honda"], client=Client())
+
+        self.assertEqual(len(cm.exception.errors), 1)
+        name, error = cm.exception.errors[0]
+        self.assertEqual(name, "acura")
+        self.assertTrue(isinstance(error, requests.ConnectionError))
+        self.assertEqual(list(cm.exception.results), ["honda"])
+        self.assertTrue(str(cm.exception).startswith("1 of 2 lookups failed"))
+
+        with self.assertRaises(TypeError):
+            get_manufacturer_details_bulk("honda")
+        with self.assertRaises(TypeError):
+            get_manufacturer_details_bulk(["honda", 1.0])
+        with self.assertRaises(ValueError):
+            get_manufacturer_details_bulk(["honda"], max_workers=0)
+        self.assertEqual(get_manufacturer_details_bulk([]), {})
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.Session.get")
+    def test_iter_manufacturer_details(self, mock_get, mock_sleep):
+        mock_get.side_effect = self.details_response
+
+        names = (name for name in ["honda", "acura", 987, "HONDA"])
+        details = dict(
+            iter_manufacturer_details(
+                names, client=Client(), max_workers=1, on_error="skip"
+            )
+        )
+
+        self.assertEqual(set(details), {"honda", 987, "HONDA"})
+        self.assertTrue(details["HONDA"][0] is details[987][0])
+        self.assertEqual(
+            sum(
+                call
+                == mock.call(
+                    self.TEST_GET_MANUFACTURER_DETAILS_FROM_NAME_URL,
+                    timeout=DEFAULT_TIMEOUT,
+                )
+                for call in mock_get.mock_calls
+            ),
+            1,
+        )
+
+        with self.assertRaises(requests.ConnectionError):
+            list(iter_manufacturer_details(["honda", "acura"], client=Client()))
+        with self.assertRaises(TypeError):
+            iter_manufacturer_details(987)
+        with self.assertRaises(ValueError):
+            iter_manufacturer_details(["honda"], on_error="ignore")
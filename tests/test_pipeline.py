@@ -0,0 +1,287 @@
+import unittest
+from unittest import mock
+import csv
+import json
+import os
+import tempfile
+import time
+from pvaw.arrow import open_results
+from pvaw.client import Client
+from pvaw.pipeline import decode_file, read_vins, _iter_batches
+from pvaw.validation import compute_check_digit
+from pvaw.vin import BatchVinDecodeError
+from tests import batch_response, decoded_result, make_batch_response
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.client = Client()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def write_lines(self, name, lines):
+        with open(self.path(name), "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return self.path(name)
+
+    def vin_lines(self, count):
+        vins = [f"1HGCM82603{i:07d}" for i in range(count)]
+        return [vin[:8] + compute_check_digit(vin) + vin[9:] for vin in vins]
+
+    def test_read_vins(self):
+        lines_path = self.write_lines(
+            "vins.txt", ["1HGCM82633A004352,2003", "", "5YJSA3DS*EF"]
+        )
+        self.assertEqual(
+            list(read_vins(lines_path)),
+            [("1HGCM82633A004352", "2003"), ("5YJSA3DS*EF", None)],
+        )
+
+        csv_path = self.write_lines(
+            "vins.csv", ["id,VIN,year", "1,5YJSA3DS*EF,2014", "2,1HGCM82633A004352,"]
+        )
+        self.assertEqual(
+            list(read_vins(csv_path, vin_column="VIN", model_year_column="year")),
+            [("5YJSA3DS*EF", "2014"), ("1HGCM82633A004352", None)],
+        )
+        with self.assertRaises(ValueError):
+            list(read_vins(csv_path))
+
+    def test_exceptions(self):
+        input_path = self.write_lines("vins.txt", self.vin_lines(1))
+        with self.assertRaises(ValueError):
+            decode_file(input_path, self.path("out.xlsx"), client=self.client)
+        with self.assertRaises(ValueError):
+            decode_file(input_path, self.path("out.csv"), on_error="ignore")
+        with self.assertRaises(ValueError):
+            decode_file(input_path, self.path("out.csv"), batch_size=51)
+
+    @mock.patch("requests.Session.post")
+    def test_decode_file_csv(self, mock_post):
+        mock_post.side_effect = batch_response
+        lines = (
+            self.vin_lines(120)
+            + self.vin_lines(5)
+            + ["TOOLONGVIN12345678", "1HGCM82633A004352,1900", "1HGCM82643A004352"]
+        )
+        input_path = self.write_lines("vins.txt", lines)
+
+        stats = decode_file(
+            input_path,
+            self.path("out.csv"),
+            rejects_path=self.path("rejects.csv"),
+            client=self.client,
+            fields=["VIN", "Make", "ModelYear"],
+        )
+
+        self.assertEqual(stats.read, 128)
+        self.assertEqual(stats.duplicates, 5)
+        self.assertEqual(stats.invalid, 3)
+        self.assertEqual(stats.decoded, 120)
+        self.assertEqual(mock_post.call_count, 3)
+
+        with open(self.path("out.csv")) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["VIN"] for row in rows], self.vin_lines(120))
+        self.assertEqual(set(rows[0].keys()), {"VIN", "Make", "ModelYear"})
+
+        with open(self.path("rejects.csv")) as f:
+            rejects = list(csv.DictReader(f))
+        self.assertEqual(
+            [r["vin"] for r in rejects],
+            ["TOOLONGVIN12345678", "1HGCM82633A004352", "1HGCM82643A004352"],
+        )
+        self.assertIn("check digit", rejects[2]["reason"])
+
+    def test_rejects_bounded(self):
+        records = [("", None)] * 25 + [(v, None) for v in self.vin_lines(3)]
+        batches = list(_iter_batches(iter(records), 50, True, True, max_rejects=10))
+
+        self.assertEqual([len(b.rejects) for b in batches], [10, 10, 5])
+        self.assertEqual([len(b.vins) for b in batches], [0, 0, 3])
+
+    @mock.patch("requests.Session.post")
+    def test_resume(self, mock_post):
+        input_path = self.write_lines("vins.txt", self.vin_lines(200))
+        output_path = self.path("out.jsonl")
+        checkpoint_path = self.path("checkpoint.json")
+
+        def crash_on_third(path, post_fields, timeout=None):
+            if mock_post.call_count == 3:
+                raise ConnectionError("connection reset")
+            return batch_response(path, post_fields)
+
+        mock_post.side_effect = crash_on_third
+        with self.assertRaises(Exception):
+            decode_file(
+                input_path,
+                output_path,
+                checkpoint_path=checkpoint_path,
+                client=self.client,
+                max_workers=1,
+                checkpoint_every=1,
+            )
+
+        with open(checkpoint_path) as f:
+            self.assertEqual(json.load(f)["batches"], 2)
+
+        mock_post.reset_mock()
+        mock_post.side_effect = batch_response
+        # the input would be split into different batches
+        with self.assertRaisesRegex(ValueError, "batch_size, deduplicate"):
+            decode_file(
+                input_path,
+                output_path,
+                checkpoint_path=checkpoint_path,
+                batch_size=40,
+                deduplicate=False,
+            )
+        mock_post.assert_not_called()
+
+        stats = decode_file(
+            input_path,
+            output_path,
+            checkpoint_path=checkpoint_path,
+            client=self.client,
+            max_workers=1,
+            checkpoint_every=1,
+        )
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(stats.decoded, 200)
+        self.assertEqual(stats.batches, 4)
+        with open(output_path) as f:
+            vins = [json.loads(line)["VIN"] for line in f]
+        self.assertEqual(vins, self.vin_lines(200))
+
+        # a completed run is not decoded again
+        mock_post.reset_mock()
+        stats = decode_file(input_path, output_path, checkpoint_path=checkpoint_path)
+        mock_post.assert_not_called()
+        self.assertEqual(stats.decoded, 200)
+
+    @mock.patch("requests.Session.post")
+    def test_failure_cancels_queued_batches(self, mock_post):
+        def fail_first(path, post_fields, timeout=None):
+            if self.vin_lines(1)[0] in post_fields["data"]:
+                raise ConnectionError("connection reset")
+            time.sleep(0.05)
+            return batch_response(path, post_fields)
+
+        mock_post.side_effect = fail_first
+        input_path = self.write_lines("vins.txt", self.vin_lines(200))
+
+        with self.assertRaises(BatchVinDecodeError):
+            decode_file(
+                input_path,
+                self.path("out.csv"),
+                client=self.client,
+                batch_size=10,
+                max_workers=2,
+            )
+        # the batches still queued when the first one failed are never sent
+        self.assertTrue(mock_post.call_count <= 3)
+
+    @mock.patch("requests.Session.post")
+    def test_skip_failed_batches(self, mock_post):
+        def fail_second(path, post_fields, timeout=None):
+            if self.vin_lines(51)[50] in post_fields["data"]:
+                raise ConnectionError("connection reset")
+            return batch_response(path, post_fields)
+
+        mock_post.side_effect = fail_second
+        input_path = self.write_lines("vins.txt", self.vin_lines(120))
+
+        stats = decode_file(
+            input_path,
+            self.path("out.csv"),
+            rejects_path=self.path("rejects.csv"),
+            client=self.client,
+            on_error="skip",
+        )
+        self.assertEqual(stats.decoded, 70)
+        self.assertEqual(stats.failed, 50)
+        with open(self.path("rejects.csv")) as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 50)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    @mock.patch("requests.Session.post")
+    def test_decode_file_parquet(self, mock_post):
+        mock_post.side_effect = batch_response
+        input_path = self.write_lines("vins.txt", self.vin_lines(120))
+
+        decode_file(
+            input_path,
+            self.path("out.parquet"),
+            checkpoint_path=self.path("checkpoint.json"),
+            client=self.client,
+            raw=False,
+            checkpoint_every=2,
+        )
+
+        table = pq.read_table(self.path("out.parquet"))
+        self.assertEqual(table.num_rows, 120)
+        self.assertEqual(len(os.listdir(self.path("out.parquet"))), 2)
+        self.assertEqual(
+            sorted(table.column("full_or_partial_vin").to_pylist()),
+            sorted(self.vin_lines(120)),
+        )
+        view = open_results(self.path("out.parquet"))
+        vin = self.vin_lines(1)[0]
+        self.assertEqual(view.get(vin)["full_or_partial_vin"], vin)
+
+        # other files in the output directory are left alone on resume
+        with open(self.path("out.parquet/part-notes.txt"), "w") as f:
+            f.write("notes")
+        os.remove(self.path("checkpoint.json"))
+        decode_file(
+            input_path,
+            self.path("out.parquet"),
+            checkpoint_path=self.path("checkpoint.json"),
+            client=self.client,
+            raw=False,
+        )
+        self.assertTrue(os.path.exists(self.path("out.parquet/part-notes.txt")))
+        self.assertEqual(len(open_results(self.path("out.parquet"))), 120)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    @mock.patch("requests.Session.post")
+    def test_decode_file_feather(self, mock_post):
+        mock_post.side_effect = make_batch_response(
+            lambda vin, model_year: decoded_result(vin, model_year, Trim="  ")
+        )
+        input_path = self.write_lines("vins.txt", self.vin_lines(120))
+
+        decode_file(
+            input_path,
+            self.path("out.arrow"),
+            client=self.client,
+            checkpoint_every=2,
+        )
+
+        self.assertEqual(len(os.listdir(self.path("out.arrow"))), 2)
+        view = open_results(self.path("out.arrow"))
+        self.assertEqual(len(view), 120)
+        self.assertEqual(view[0]["Make"], "HONDA")
+        self.assertEqual(
+            sorted(view.column("VIN").to_pylist()), sorted(self.vin_lines(120))
+        )
+        # the parts are written like pvaw.ArrowWriter files
+        vin = self.vin_lines(1)[0]
+        self.assertEqual(view.get(vin)["VIN"], vin)
+        self.assertIsNone(view[0]["Trim"])
+        self.assertEqual(view.get_df().loc[vin, "Make"], "HONDA")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+from unittest import mock
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+import requests
+from pvaw.client import Client
+from pvaw.constants import DEFAULT_TIMEOUT
+from pvaw.ratelimit import (
+    RateLimiter,
+    SQLiteRateLimiter,
+    RetryPolicy,
+    parse_retry_after,
+)
+from pvaw.wmi import decode_wmi
+
+
+def make_response(status_code, body=None, headers=None):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = body
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(str(status_code))
+    return response
+
+
+class TestRateLimit(unittest.TestCase):
+    TEST_WMI_URL = "https://vpic.nhtsa.dot.gov/api/vehicles/DecodeWMI/1FD?format=json"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open("tests/responses/decode_3_digit_wmi_response.json") as f:
+            self.wmi_response = json.load(f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_exceptions(self):
+        with self.assertRaises(TypeError):
+            RateLimiter("10")
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+        with self.assertRaises(ValueError):
+            RateLimiter(10, decrease=2)
+        with self.assertRaises(ValueError):
+            RetryPolicy(retries=-1)
+        with self.assertRaises(TypeError):
+            Client(rate_limiter=10)
+        with self.assertRaises(TypeError):
+            Client(retry=3)
+
+    def test_token_bucket(self):
+        limiter = RateLimiter(10, burst=5)
+        waits = [limiter.reserve() for _ in range(7)]
+        self.assertEqual(waits[:5], [0] * 5)
+        self.assertAlmostEqual(waits[5], 0.1, delta=0.01)
+        self.assertAlmostEqual(waits[6], 0.2, delta=0.01)
+
+        with mock.patch("time.sleep") as mock_sleep:
+            limiter.acquire()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.3, delta=0.01)
+
+    def test_adaptive_rate(self):
+        limiter = RateLimiter(10, min_rate=2, increase=1)
+        limiter.throttled()
+        self.assertEqual(limiter.rate, 5)
+        limiter.throttled()
+        limiter.throttled()
+        self.assertEqual(limiter.rate, 2)
+        for _ in range(20):
+            limiter.succeeded()
+        self.assertEqual(limiter.rate, 10)
+
+    def test_sqlite_rate_limiter(self):
+        path = os.path.join(self.tmp_dir.name, "limits.db")
+        # separate instances stand in for separate worker processes
+        limiters = [SQLiteRateLimiter(path, 10, burst=4) for _ in range(2)]
+        waits = []
+
+        def reserve(limiter):
+            for _ in range(5):
+                waits.append(limiter.reserve())
+
+        threads = [threading.Thread(target=reserve, args=(l,)) for l in limiters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(waits)[:4], [0] * 4)
+        self.assertAlmostEqual(max(waits), 0.6, delta=0.05)
+
+        limiters[0].throttled()
+        self.assertEqual(limiters[1].rate, 5)
+        limiters[1].succeeded()
+        self.assertEqual(limiters[0].rate, 5.1)
+
+        for limiter in limiters:
+            limiter.close()
+
+    def test_retry_policy(self):
+        policy = RetryPolicy(retries=2, backoff=1, max_backoff=3)
+        self.assertTrue(policy.should_retry(0))
+        self.assertTrue(policy.should_retry(1, 503))
+        self.assertFalse(policy.should_retry(1, 404))
+        self.assertFalse(policy.should_retry(2, 503))
+
+        delays = [policy.delay(4) for _ in range(100)]
+        self.assertTrue(all(0 <= d <= 3 for d in delays))
+        self.assertGreaterEqual(policy.delay(0, "7"), 7)
+        self.assertEqual(policy.delay(0, "600"), 120)
+
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertAlmostEqual(
+            parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2
+        )
+
+    @mock.patch("time.sleep")
+    @mock.patch("requests.Session.get")
+    def test_client_retries(self, mock_get, mock_sleep):
+        limiter = RateLimiter(1000)
+        client = Client(rate_limiter=limiter)
+        mock_get.side_effect = [
+            requests.ConnectionError("connection reset"),
+            make_response(429, headers={"Retry-After": "5"}),
+            make_response(200, self.wmi_response),
+        ]
+
+        wmi_info = decode_wmi("1FD", client=client)
+
+        self.assertEqual(wmi_info.manufacturer, "FORD MOTOR COMPANY, USA")
+        self.assertEqual(
+            mock_get.mock_calls,
+            [mock.call(self.TEST_WMI_URL, timeout=DEFAULT_TIMEOUT)] * 3,
+        )
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertGreaterEqual(mock_sleep.call_args[0][0], 5)
+        self.assertLess(limiter.rate, 1000)
+
+        mock_get.side_effect = [make_response(503)] * 4
+        with self.assertRaises(requests.HTTPError):
+            decode_wmi("1FD", client=client)
+        self.assertEqual(mock_get.call_count, 7)
+
+        mock_get.side_effect = [make_response(404)]
+        with self.assertRaises(requests.HTTPError):
+            decode_wmi("1FD", client=Client(retry=RetryPolicy(retries=0)))
+        self.assertEqual(mock_get.call_count, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+import unittest
+import json
+import math
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pvaw.results import Results, ResultsList
+from pvaw.schema import apply_schema, SCHEMA, INTEGER, FLOAT, CATEGORY
+from pvaw.make import Make
+import pandas as pd
+from pvaw.vin import Vin, Vehicle
+
+
+class TestResults(unittest.TestCase):
+    def setUp(self):
+        with open("tests/responses/decode_vin_batch_reponse.json") as f:
+            self.results = json.load(f)["Results"]
+        self.vehicles = ResultsList(
+            [
+                Vehicle(Vin("5UXWX7C5*BA", 2011), self.results[0]),
+                Vehicle(Vin("5YJSA3DS*EF"), self.results[1]),
+            ]
+        )
+
+    def test_get_df(self):
+        df = self.vehicles.get_df()
+        self.assertEqual(list(df.index), ["5UXWX7C5*BA,2011", "5YJSA3DS*EF"])
+        self.assertEqual(
+            list(df.columns),
+            [
+                "model_year",
+                "make",
+                "manufacturer",
+                "model",
+                "full_or_partial_vin",
+                "vehicle_type",
+            ],
+        )
+        self.assertEqual(df.loc["5YJSA3DS*EF", "make"], "TESLA")
+
+    def test_get_df_raw(self):
+        df = self.vehicles.get_df(raw=True, drop_na=False)
+        self.assertEqual(df.shape, (2, len(self.results[0])))
+        self.assertEqual(list(df.columns), list(self.results[0].keys()))
+
+        # blank and whitespace-only values become NaN
+        blank_fields = [k for k, v in self.results[0].items() if not v.strip()]
+        self.assertTrue(blank_fields)
+        for field in blank_fields:
+            self.assertTrue(math.isnan(df.loc["5UXWX7C5*BA,2011", field]))
+
+        dropped = self.vehicles.get_df(raw=True)
+        for field in dropped.columns:
+            self.assertFalse(dropped[field].isna().any())
+        self.assertTrue(set(blank_fields).isdisjoint(dropped.columns))
+
+    def test_single_result(self):
+        vehicle = self.vehicles[0]
+        df = vehicle.get_df(raw=True)
+        self.assertEqual(list(df.index), ["5UXWX7C5*BA,2011"])
+        self.assertEqual(df.iloc[0]["Make"], "BMW")
+
+        series = vehicle.get_series(raw=False)
+        self.assertEqual(series["make"], "BMW")
+
+    def test_blank_to_nan(self):
+        series = self.vehicles[0].get_series(raw=True)
+        blank_fields = [k for k, v in self.results[0].items() if not v.strip()]
+        self.assertTrue(series[blank_fields].isna().all())
+
+        # lists can't be hashed, so these are checked cell by cell
+        results = ResultsList(
+            [
+                Results("a", {"Name": " ", "VehicleTypes": [], "Id": 1}),
+                Results("b", {"Name": "B", "VehicleTypes": [{}], "Id": ""}),
+            ]
+        )
+        df = results.get_df(raw=True, drop_na=False)
+        self.assertTrue(pd.isna(df.loc["a", "Name"]))
+        self.assertTrue(pd.isna(df.loc["b", "Id"]))
+        self.assertEqual(df.loc["a", "VehicleTypes"], [])
+        self.assertEqual(df.loc["a", "Id"], 1)
+
+    def test_empty(self):
+        self.assertEqual(len(ResultsList([]).get_df()), 0)
+
+    def test_typed_df(self):
+        df = self.vehicles.get_df(raw=True, drop_na=False, typed=True)
+        self.assertEqual(str(df["ModelYear"].dtype), INTEGER)
+        self.assertEqual(str(df["Doors"].dtype), INTEGER)
+        self.assertEqual(str(df["DisplacementL"].dtype), FLOAT)
+        self.assertEqual(str(df["Make"].dtype), CATEGORY)
+        self.assertEqual(str(df["BodyClass"].dtype), CATEGORY)
+        self.assertEqual(df.loc["5UXWX7C5*BA,2011", "ModelYear"], 2011)
+        self.assertEqual(df.loc["5UXWX7C5*BA,2011", "DisplacementL"], 3.0)
+        self.assertTrue(pd.isna(df.loc["5UXWX7C5*BA,2011", "CurbWeightLB"]))
+
+        df = self.vehicles.get_df(typed=True)
+        self.assertEqual(str(df["model_year"].dtype), INTEGER)
+        self.assertEqual(str(df["make"].dtype), CATEGORY)
+
+        with open("tests/responses/get_makes_for_vehicle_type_response.json") as f:
+            makes = ResultsList([Make(d) for d in json.load(f)["Results"]])
+        df = makes.get_df(raw=True, typed=True)
+        self.assertEqual(str(df["MakeId"].dtype), INTEGER)
+        self.assertEqual(str(df["VehicleTypeName"].dtype), CATEGORY)
+
+    def test_apply_schema(self):
+        df = pd.DataFrame(
+            {
+                "Doors": ["4", "2.5", None],
+                "Seats": ["5", "None", ""],
+                "Other": ["a", "b", "c"],
+            }
+        )
+        typed = apply_schema(df)
+        self.assertEqual(str(typed["Doors"].dtype), FLOAT)
+        self.assertEqual(str(typed["Seats"].dtype), INTEGER)
+        self.assertEqual(typed["Seats"].isna().sum(), 2)
+        self.assertTrue(typed["Other"].equals(df["Other"]))
+
+        typed = apply_schema(df, {"Other": CATEGORY})
+        self.assertEqual(str(typed["Other"].dtype), CATEGORY)
+        self.assertTrue(typed["Doors"].equals(df["Doors"]))
+        self.assertEqual(SCHEMA["ModelYear"], INTEGER)
+
+    def test_lazy_pandas_import(self):
+        code = (
+            "import sys, json, pvaw\n"
+            "from pvaw.vin import Vin, Vehicle\n"
+            "with open('tests/responses/decode_vin_response.json') as f:\n"
+            "    vehicle = Vehicle(Vin('5UXWX7C5*BA'), json.load(f)['Results'][0])\n"
+            "str(vehicle)\n"
+            "print('pandas' in sys.modules, 'numpy' in sys.modules)\n"
+            "vehicle.get_df()\n"
+            "print('pandas' in sys.modules)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout.split()
+        self.assertEqual(output, ["False", "False", "True"])
+
+    def test_slots(self):
+        vehicle = self.vehicles[0]
+        self.assertFalse(hasattr(vehicle, "__dict__"))
+        with self.assertRaises(AttributeError):
+            vehicle.color = "red"
+        self.assertEqual(
+            list(vehicle.get_key_attributes()), list(Vehicle.KEY_ATTRIBUTES)
+        )
+
+        other = Vehicle(Vin("5UXWX7C5*BA"), json.loads(json.dumps(self.results[0])))
+        self.assertIs(other.make, vehicle.make)
+        self.assertIs(other.vehicle_type, vehicle.vehicle_type)
+
+    def test_fields(self):
+        vehicle = Vehicle(Vin("5YJSA3DS*EF"), self.results[1], fields=["Make", "Doors"])
+        self.assertEqual(vehicle.results_dict, {"Make": "TESLA", "Doors": "5"})
+        self.assertEqual(len(self.results[1]), len(self.vehicles[1].results_dict))
+        self.assertEqual(vehicle.get_df(raw=True).columns.tolist(), ["Make", "Doors"])
+
+        vehicle = Vehicle(Vin("5YJSA3DS*EF"), self.results[1], fields=())
+        self.assertEqual(vehicle.results_dict, {})
+        self.assertEqual(vehicle.model, "Model S")
+        self.assertEqual(vehicle.get_df().loc["5YJSA3DS*EF", "make"], "TESLA")
+
+        with self.assertRaises(TypeError):
+            Vehicle(Vin("5YJSA3DS*EF"), self.results[1], fields="Make")
+
+    def test_iteration(self):
+        pairs = [(a.make, b.make) for a in self.vehicles for b in self.vehicles]
+        self.assertEqual(
+            pairs,
+            [("BMW", "BMW"), ("BMW", "TESLA"), ("TESLA", "BMW"), ("TESLA", "TESLA")],
+        )
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            counts = list(pool.map(lambda _: len(list(self.vehicles)), range(100)))
+        self.assertEqual(counts, [2] * 100)
+
+    def test_lookup(self):
+        vehicles = ResultsList(
+            [
+                Vehicle(Vin(f"5YJSA3DS*E{i}"), dict(self.results[1], VIN=str(i)))
+                for i in range(1000)
+            ]
+        )
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            found = list(
+                pool.map(vehicles.get, [f"5YJSA3DS*E{i}" for i in range(1000)])
+            )
+        self.assertEqual(found, vehicles.results_list)
+        self.assertIsNone(vehicles.get("5UXWX7C5*BA"))
+        self.assertTrue("5YJSA3DS*E7" in vehicles)
+
+        extra = Vehicle(Vin("5UXWX7C5*BA"), self.results[0])
+        vehicles.results_list.append(extra)
+        self.assertIs(vehicles.get("5UXWX7C5*BA"), extra)
+
+        copied = pickle.loads(pickle.dumps(vehicles))
+        self.assertEqual(copied.get("5YJSA3DS*E7").full_or_partial_vin, "7")
+
+    def test_filter_group_by(self):
+        combined = ResultsList.concat(self.vehicles, self.vehicles)
+        self.assertEqual(len(combined), 4)
+        self.assertIs(combined[2], self.vehicles[0])
+        self.assertEqual(len(self.vehicles + self.vehicles), 4)
+
+        merged = ResultsList.merge(self.vehicles, combined)
+        self.assertEqual(merged.results_list, self.vehicles.results_list)
+
+        bmws = combined.filter(make="BMW")
+        self.assertEqual(len(bmws), 2)
+        self.assertEqual(len(combined.filter(lambda v: v.model_year > 2012)), 2)
+        self.assertEqual(
+            len(combined.filter(lambda v: v.model_year < 2012, make="TESLA")), 0
+        )
+
+        groups = combined.group_by("make")
+        self.assertEqual(list(groups), ["BMW", "TESLA"])
+        self.assertEqual(len(groups["TESLA"]), 2)
+        groups = combined.group_by(lambda v: v.model_year // 10 * 10)
+        self.assertEqual(list(groups), [2010])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from unittest import mock
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pvaw.client import Client
+from pvaw.singleflight import SingleFlight, AsyncSingleFlight
+from pvaw.wmi import decode_wmi
+
+
+class TestSingleFlight(unittest.TestCase):
+    def wait_for_waiters(self, single_flight, count):
+        deadline = time.time() + 5
+        while single_flight.coalesced < count and time.time() < deadline:
+            time.sleep(0.001)
+
+    def test_threads(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return {"Results": [{"Make": "BMW"}]}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(single_flight.do, "key", fetch) for _ in range(8)]
+            self.wait_for_waiters(single_flight, 7)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((single_flight.calls, single_flight.coalesced), (1, 7))
+        self.assertEqual(len(single_flight), 0)
+        self.assertTrue(all(r == {"Results": [{"Make": "BMW"}]} for r in results))
+        self.assertEqual(len(set(map(id, results))), 8)
+
+        self.assertEqual(single_flight.do("key", lambda: 2), 2)
+        self.assertEqual(single_flight.calls, 2)
+
+    def test_threads_error(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ConnectionError("connection reset")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(single_flight.do, "key", fail) for _ in range(4)]
+            self.wait_for_waiters(single_flight, 3)
+            release.set()
+            for future in futures:
+                with self.assertRaises(ConnectionError):
+                    future.result()
+        self.assertEqual(len(single_flight), 0)
+
+    def test_asyncio(self):
+        async def main():
+            single_flight = AsyncSingleFlight()
+            release = asyncio.Event()
+            calls = []
+
+            async def fetch():
+                calls.append(1)
+                await release.wait()
+                return {"Make": "BMW"}
+
+            tasks = [
+                asyncio.ensure_future(single_flight.do("key", fetch)) for _ in range(5)
+            ]
+            await asyncio.sleep(0)
+            tasks[0].cancel()
+            release.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            return single_flight, calls, results
+
+        single_flight, calls, results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((single_flight.calls, single_flight.coalesced), (1, 4))
+        self.assertTrue(isinstance(results[0], asyncio.CancelledError))
+        self.assertEqual(results[1:], [{"Make": "BMW"}] * 4)
+        self.assertEqual(len(single_flight), 0)
+
+    @mock.patch("requests.Session.get")
+    def test_client(self, mock_get):
+        with open("tests/responses/decode_3_digit_wmi_response.json") as f:
+            response = json.load(f)
+        release = threading.Event()
+
+        def slow_get(url, timeout=None):
+            release.wait(5)
+            result = mock.Mock()
+            result.json.return_value = json.loads(json.dumps(response))
+            return result
+
+        mock_get.side_effect = slow_get
+        client = Client()
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            futures = [
+                pool.submit(decode_wmi, wmi, client=client)
+                for wmi in ["1FD", "1fd"] * 3
+            ]
+            self.wait_for_waiters(client.single_flight, 5)
+            release.set()
+            wmi_infos = [f.result() for f in futures]
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(client.single_flight.coalesced, 5)
+        self.assertEqual([w.wmi for w in wmi_infos], ["1FD", "1fd"] * 3)
+
+        release.set()
+        decode_wmi("1FD", client=Client(coalesce=False))
+        self.assertIsNone(Client(coalesce=False).single_flight)
+        self.assertEqual(mock_get.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+from unittest import mock
+import numpy as np
+from pvaw.constants import DEFAULT_TIMEOUT
+from pvaw.validation import (
+    compute_check_digit,
+    vin_errors,
+    is_valid_vin,
+    infer_model_year,
+    validate_vins,
+    infer_model_years,
+)
+from pvaw.vin import Vin, decode_vins
+from tests import batch_response
+
+
+class TestValidation(unittest.TestCase):
+    TEST_BATCH_VIN_URL = "https://vpic.nhtsa.dot.gov/api/vehicles/DecodeVINValuesBatch/"
+    TEST_VINS = [
+        "1HGCM82633A004352",
+        "1HGCM82643A004352",
+        "1hgcm82633a004352",
+        "5YJSA1E23FF101307",
+        "WBA3A5C50CF256651",
+        "WBA3A5C5ICF256651",
+        "1HGCM8261UA004352",
+        "5YJSA3DS*EF",
+        "5UXWX7C5*BA",
+        "1HGCM82633A00435",
+        "",
+    ]
+
+    def test_check_digit(self):
+        self.assertEqual(compute_check_digit("1HGCM82633A004352"), "3")
+        self.assertEqual(compute_check_digit("1M8GDM9AXKP042788"), "X")
+
+        self.assertEqual(vin_errors("1HGCM82633A004352"), [])
+        self.assertEqual(
+            vin_errors("1HGCM82643A004352"), ["check digit is '4' but should be '3'"]
+        )
+        self.assertEqual(vin_errors("1HGCM82643A004352", check_digit=False), [])
+        # the check digit isn't used outside North America
+        self.assertTrue(is_valid_vin("WBA3A5C50CF256651"))
+
+    def test_vin_errors(self):
+        with self.assertRaises(TypeError):
+            vin_errors(1)
+        self.assertEqual(vin_errors("5YJSA3DS*EF"), [])
+        self.assertEqual(
+            vin_errors("WBA3A5C5ICF25665O"), ["invalid characters 'I', 'O'"]
+        )
+        self.assertEqual(
+            vin_errors("1HGCM8261UA004352"), ["invalid model year code 'U'"]
+        )
+        self.assertEqual(
+            vin_errors("1HGCM82633A0043521"), ["longer than 17 characters"]
+        )
+        self.assertEqual(vin_errors(""), ["empty"])
+
+    def test_infer_model_year(self):
+        self.assertEqual(infer_model_year("1HGCM82633A004352"), 2003)
+        self.assertEqual(infer_model_year("5YJSA1E23FF101307"), 2015)
+        self.assertEqual(infer_model_year("1M8GDM9AXKP042788"), 1989)
+        self.assertIsNone(infer_model_year("5YJSA3DS*EF"))
+        self.assertIsNone(infer_model_year("1HGCM8261UA004352"))
+
+    def test_vectorized(self):
+        valid = validate_vins(self.TEST_VINS)
+        self.assertEqual(valid.dtype, np.bool_)
+        # partial and wildcard VINs follow the same rules as vin_errors
+        self.assertEqual(valid.tolist(), [is_valid_vin(v) for v in self.TEST_VINS])
+        self.assertEqual(
+            valid.tolist(),
+            [True, False, True, True, True, False, False, True, True, True, False],
+        )
+        self.assertEqual(
+            validate_vins(np.array(self.TEST_VINS), check_digit=False).tolist(),
+            [is_valid_vin(v, check_digit=False) for v in self.TEST_VINS],
+        )
+        partial = ["5UXWX7C5*BA", "5UXWX7C5I", "5UXWX7C5*BA0000000", "*"]
+        self.assertEqual(
+            validate_vins(partial).tolist(), [is_valid_vin(v) for v in partial]
+        )
+        self.assertEqual(validate_vins(partial).tolist(), [True, False, False, True])
+        self.assertEqual(
+            validate_vins(v for v in self.TEST_VINS).tolist(), valid.tolist()
+        )
+        with self.assertRaises(TypeError):
+            validate_vins("1HGCM82633A004352")
+
+        self.assertEqual(
+            infer_model_years(self.TEST_VINS).tolist(),
+            [infer_model_year(v) or 0 for v in self.TEST_VINS],
+        )
+        self.assertEqual(
+            infer_model_years(v for v in self.TEST_VINS).tolist(),
+            infer_model_years(self.TEST_VINS).tolist(),
+        )
+
+    @mock.patch("requests.Session.post")
+    def test_decode_vins_invalid(self, mock_post):
+        mock_post.side_effect = batch_response
+        vin_list = [Vin("1HGCM82633A004352"), Vin("1HGCM82643A004352")]
+
+        with self.assertRaises(ValueError):
+            decode_vins(vin_list, invalid="flag")
+        with self.assertRaises(ValueError):
+            decode_vins(vin_list, invalid="raise")
+        mock_post.assert_not_called()
+
+        vehicles = decode_vins(vin_list, invalid="drop")
+        mock_post.assert_called_once_with(
+            self.TEST_BATCH_VIN_URL,
+            {"format": "json", "data": "1HGCM82633A004352"},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        self.assertEqual(len(vehicles), 1)
+        self.assertEqual(vehicles[0].full_or_partial_vin, "1HGCM82633A004352")
+
+        self.assertEqual(
+            vin_list[1].validate(), ["check digit is '4' but should be '3'"]
+        )
+        self.assertFalse(vin_list[1].is_valid())
+        self.assertTrue(vin_list[1].is_valid(check_digit=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,9 @@ from unittest import mock
 from unittest.mock import patch
 import json
 from requests import Session
-from pvaw.vin import Vin, decode_vins, Vehicle
+from pvaw.constants import DEFAULT_TIMEOUT
+from pvaw.vin import Vin, decode_vins, Vehicle, BatchVinDecodeError
+from tests import make_batch_response
 
 
 class TestVin(unittest.TestCase):
@@ -27,7 +29,7 @@ class TestVin(unittest.TestCase):
         with self.assertRaises(ValueError):
             Vin("5UXWX7C5*BA", 1941)
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_decode_vin(self, mock_get):
         with open("tests/responses/decode_vin_response.json") as f:
             expected_response = json.load(f)
@@ -36,7 +38,10 @@ class TestVin(unittest.TestCase):
 
         vehicle = self.TEST_VIN.decode()
 
-        self.assertTrue(mock.call(self.TEST_VIN_DECODE_URL) in mock_get.mock_calls)
+        self.assertTrue(
+            mock.call(self.TEST_VIN_DECODE_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
+        )
 
         self.assertEqual(vehicle.results_dict, expected_response["Results"][0])
         self.assertEqual(vehicle.model_year, 2011)
@@ -64,7 +69,7 @@ class TestVin(unittest.TestCase):
         str(vehicle)
         vehicle._repr_html_()
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_decode_vin_model_year(self, mock_get):
         with open("tests/responses/decode_vin_response_with_year.json") as f:
             expected_response = json.load(f)
@@ -74,7 +79,8 @@ class TestVin(unittest.TestCase):
         vehicle = self.TEST_MODEL_YEAR_VIN.decode()
 
         self.assertTrue(
-            mock.call(self.TEST_VIN_DECODE_WITH_YEAR_URL) in mock_get.mock_calls
+            mock.call(self.TEST_VIN_DECODE_WITH_YEAR_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
         )
 
         self.assertEqual(vehicle.results_dict, expected_response["Results"][0])
@@ -95,7 +101,7 @@ class TestVin(unittest.TestCase):
         with self.assertRaises(ValueError):
             decode_vins([])
 
-    @mock.patch("requests.post")
+    @mock.patch("requests.Session.post")
     def test_decode_vins(self, mock_post):
         with open("tests/responses/decode_vin_batch_reponse.json") as f:
             expected_response = json.load(f)
@@ -104,7 +110,11 @@ class TestVin(unittest.TestCase):
         vehicles = decode_vins([self.TEST_MODEL_YEAR_VIN, self.TEST_VIN_2])
 
         self.assertTrue(
-            mock.call(self.TEST_BATCH_VIN_URL, self.TEST_BATCH_VIN_POST)
+            mock.call(
+                self.TEST_BATCH_VIN_URL,
+                self.TEST_BATCH_VIN_POST,
+                timeout=DEFAULT_TIMEOUT,
+            )
             in mock_post.mock_calls
         )
         # testing iteration
@@ -154,6 +164,75 @@ class TestVin(unittest.TestCase):
         str(vehicle_1)
         vehicle_1._repr_html_()
 
+    @staticmethod
+    def batch_response(path, post_fields, timeout=None):
+        with open("tests/responses/decode_vin_batch_reponse.json") as f:
+            template = json.load(f)["Results"][0]
+        return make_batch_response(lambda vin, model_year: dict(template, VIN=vin))(
+            path, post_fields, timeout
+        )
+
+    def test_decode_vins_batch_options_exceptions(self):
+        with self.assertRaises(TypeError):
+            decode_vins([self.TEST_VIN], batch_size=10.0)
+        with self.assertRaises(ValueError):
+            decode_vins([self.TEST_VIN], batch_size=51)
+        with self.assertRaises(ValueError):
+            decode_vins([self.TEST_VIN], max_workers=0)
+
+    @mock.patch("requests.Session.post")
+    def test_decode_vins_chunking(self, mock_post):
+        mock_post.side_effect = self.batch_response
+
+        vin_list = [Vin(f"1HGCM8263{i:08d}") for i in range(120)]
+        vin_list += vin_list[:10]
+
+        vehicles = decode_vins(vin_list, max_workers=3)
+
+        self.assertEqual(mock_post.call_count, 3)
+        for c in mock_post.call_args_list:
+            self.assertTrue(len(c[0][1]["data"].split(";")) <= 50)
+
+        self.assertEqual(len(vehicles), len(vin_list))
+        for vin, vehicle in zip(vin_list, vehicles):
+            self.assertEqual(vehicle.full_or_partial_vin, vin.full_or_partial_vin)
+        self.assertIs(vehicles[0], vehicles[120])
+
+    @mock.patch("requests.Session.post")
+    def test_decode_vins_partial_failure(self, mock_post):
+        def side_effect(path, post_fields, timeout=None):
+            if "1HGCM826300000060" in post_fields["data"]:
+                raise ConnectionError("connection reset")
+            return self.batch_response(path, post_fields)
+
+        mock_post.side_effect = side_effect
+
+        vin_list = [Vin(f"1HGCM8263{i:08d}") for i in range(120)]
+
+        with self.assertRaises(BatchVinDecodeError) as cm:
+            decode_vins(vin_list)
+
+        self.assertEqual(len(cm.exception.errors), 1)
+        failed_batch, error = cm.exception.errors[0]
+        self.assertEqual(len(failed_batch), 50)
+        self.assertTrue(isinstance(error, BatchVinDecodeError))
+        self.assertEqual(len(cm.exception.results), 70)
+
+    @mock.patch("requests.Session.post")
+    @mock.patch("requests.Session.get")
+    def test_decode_fields(self, mock_get, mock_post):
+        with open("tests/responses/decode_vin_response.json") as f:
+            mock_get.return_value.json.return_value = json.load(f)
+        with open("tests/responses/decode_vin_batch_reponse.json") as f:
+            mock_post.return_value.json.return_value = json.load(f)
+
+        vehicle = self.TEST_VIN.decode(fields=["Model", "Doors"])
+        self.assertEqual(vehicle.results_dict, {"Model": "X3", "Doors": "4"})
+
+        vehicles = decode_vins([self.TEST_MODEL_YEAR_VIN, self.TEST_VIN_2], fields=[])
+        self.assertEqual([v.results_dict for v in vehicles], [{}, {}])
+        self.assertEqual([v.make for v in vehicles], ["BMW", "TESLA"])
+
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,9 +1,14 @@
+import gzip
 import unittest
 from unittest import mock
 from unittest.mock import patch
 import json
 from requests import Session
-from pvaw.wmi import decode_wmi, get_wmis, WMIInfo
+from pvaw.constants import DEFAULT_TIMEOUT
+import os
+import tempfile
+from pvaw.client import Client
+from pvaw.wmi import decode_wmi, get_wmis, WMIInfo, WMIIndex
 
 
 class TestWMI(unittest.TestCase):
@@ -25,7 +30,7 @@ class TestWMI(unittest.TestCase):
         with self.assertRaises(TypeError):
             get_wmis(1)
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_decode_wmi_3_digit(self, mock_get):
         with open("tests/responses/decode_3_digit_wmi_response.json") as f:
             expected_response = json.load(f)
@@ -34,7 +39,8 @@ class TestWMI(unittest.TestCase):
 
         wmi_info = decode_wmi("1FD")
         self.assertTrue(
-            mock.call(self.TEST_3_DIGIT_WMI_DECODE_URL) in mock_get.mock_calls
+            mock.call(self.TEST_3_DIGIT_WMI_DECODE_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
         )
 
         self.assertEqual(wmi_info.wmi, "1FD")
@@ -58,7 +64,7 @@ class TestWMI(unittest.TestCase):
         str(wmi_info)
         wmi_info._repr_html_()
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_decode_wmi_6_digit(self, mock_get):
         with open("tests/responses/decode_6_digit_wmi_response.json") as f:
             expected_response = json.load(f)
@@ -67,14 +73,15 @@ class TestWMI(unittest.TestCase):
 
         wmi_info = decode_wmi("1G9340")
         self.assertTrue(
-            mock.call(self.TEST_6_DIGIT_WMI_DECODE_URL) in mock_get.mock_calls
+            mock.call(self.TEST_6_DIGIT_WMI_DECODE_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
         )
 
         self.assertEqual(wmi_info.wmi, "1G9340")
         self.assertEqual(wmi_info.manufacturer, "GRYPHON BIKES & CHOPPERS")
         self.assertEqual(wmi_info.vehicle_type, "Motorcycle")
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_get_wmis(self, mock_get):
         with open("tests/responses/get_wmis_response.json") as f:
             expected_response = json.load(f)
@@ -83,7 +90,10 @@ class TestWMI(unittest.TestCase):
 
         wmi_infos = get_wmis("honda")
 
-        self.assertTrue(mock.call(self.TEST_GET_WMIS_URL) in mock_get.mock_calls)
+        self.assertTrue(
+            mock.call(self.TEST_GET_WMIS_URL, timeout=DEFAULT_TIMEOUT)
+            in mock_get.mock_calls
+        )
 
         for w in wmi_infos:
             self.assertTrue(isinstance(w, WMIInfo))
@@ -115,3 +125,111 @@ class TestWMI(unittest.TestCase):
         wmi_infos._repr_html_()
         str(first)
         first._repr_html_()
+
+    @staticmethod
+    def index_response(url, timeout=None):
+        response = mock.Mock()
+        if "getallmanufacturers" in url and "page=1" in url:
+            with open("tests/responses/get_manufacturers_response.json") as f:
+                response.json.return_value = json.load(f)
+        elif "GetWMIsForManufacturer/1178?" in url:
+            with open("tests/responses/get_wmis_response.json") as f:
+                response.json.return_value = json.load(f)
+        else:
+            response.json.return_value = {"Results": []}
+        return response
+
+    @mock.patch("requests.Session.get")
+    def test_wmi_index(self, mock_get):
+        mock_get.side_effect = self.index_response
+
+        index = WMIIndex.build(client=Client())
+
+        self.assertTrue(
+            mock.call(
+                "https://vpic.nhtsa.dot.gov/api/vehicles/getallmanufacturers?format=json&page=2",
+                timeout=DEFAULT_TIMEOUT,
+            )
+            in mock_get.mock_calls
+        )
+        self.assertEqual(len(index), 44)
+        self.assertTrue("jhm" in index)
+
+        wmi_info = index.lookup("JHM")
+        self.assertTrue(isinstance(wmi_info, WMIInfo))
+        self.assertEqual(wmi_info.manufacturer, "HONDA MOTOR CO., LTD")
+        self.assertEqual(wmi_info.vehicle_type, "Passenger Car")
+        self.assertEqual(index.lookup_vin("JHMCM56557C404453").wmi, "JHM")
+        self.assertIsNone(index.lookup("1FD"))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "wmis.json.gz")
+            index.save(path)
+            loaded = WMIIndex.load(path)
+        self.assertEqual(len(loaded), len(index))
+        self.assertEqual(loaded.lookup("JHM").results_dict, wmi_info.results_dict)
+
+        # files saved with fields that are no longer kept still load
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "wmis.json.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "fields": ["WMI", "Name", "VehicleType", "Country", "Id"],
+                        "rows": [
+                            ["JHM", "HONDA MOTOR CO., LTD", "Passenger Car", "", 1]
+                        ],
+                    },
+                    f,
+                )
+            loaded = WMIIndex.load(path)
+        self.assertEqual(loaded.lookup("JHM").results_dict, wmi_info.results_dict)
+
+        with self.assertRaises(FileNotFoundError):
+            WMIIndex.load("missing.json.gz")
+
+    def test_wmi_index_six_characters(self):
+        index = WMIIndex(
+            [
+                {"WMI": "1G9", "Name": "SMALL", "VehicleType": "Trailer"},
+                {"WMI": "1G9340", "Name": "SMALLER", "VehicleType": "Trailer"},
+            ]
+        )
+        self.assertEqual(index.lookup_vin("1G9AB12C0DX340123").manufacturer, "SMALLER")
+        self.assertEqual(index.lookup_vin("1G9AB12C0DX999123").manufacturer, "SMALL")
+
+    @mock.patch("requests.Session.get")
+    def test_decode_wmi_with_index(self, mock_get):
+        with open("tests/responses/decode_3_digit_wmi_response.json") as f:
+            mock_get.return_value.json.return_value = json.load(f)
+
+        index = WMIIndex(
+            [
+                {
+                    "WMI": "JHM",
+                    "Name": "HONDA MOTOR CO., LTD",
+                    "VehicleType": "Passenger Car",
+                }
+            ]
+        )
+        client = Client(wmi_index=index)
+
+        wmi_info = decode_wmi("JHM", client=client)
+        self.assertEqual(wmi_info.manufacturer, "HONDA MOTOR CO., LTD")
+        mock_get.assert_not_called()
+
+        index_info = wmi_info
+        wmi_info = decode_wmi("1FD", client=client)
+        self.assertEqual(wmi_info.manufacturer, "FORD MOTOR COMPANY, USA")
+        self.assertEqual(mock_get.call_count, 1)
+
+        # index hits have the same fields as DecodeWMI results
+        self.assertEqual(list(index_info.get_results()), list(wmi_info.get_results()))
+        self.assertEqual(index_info.get_results()["Make"], "")
+        self.assertEqual(
+            list(index_info.get_df(raw=True, drop_na=False).columns),
+            list(wmi_info.get_df(raw=True, drop_na=False).columns),
+        )
+
+        with self.assertRaises(TypeError):
+            Client(wmi_index={})